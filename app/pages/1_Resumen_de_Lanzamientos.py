@@ -4,12 +4,10 @@ from datetime import date
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-import pandas as pd
 import streamlit as st
-import sqlite3 as sql
 from matplotlib import rcParams
 
-from src import charts
+from src import app_data
 from src import toolkit
 
 st.set_page_config(page_title="Resumen de Lanzamientos")
@@ -23,22 +21,18 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-connection = sql.connect('data/taylor_swift.db')
-cursor = connection.cursor()
-
 rcParams, custom_params = toolkit.chart_params(rcParams)
 
-# Creating temporary table to be used throughout
-temp_table = toolkit.sql_to_string('release_temp_table.sql')
-cursor.executescript(temp_table)
+# Derived tables are materialized once when the database is built
+app_data.check_analytics()
 
 today = date(2024, 5, 5)
 today_format = today.strftime("%B %d, %Y")
 
 
 def main():
-    sidebar()
-    content()
+    artist = sidebar()
+    content(app_data.db_version(), artist)
 
 def sidebar():
     with st.sidebar:
@@ -48,24 +42,18 @@ def sidebar():
         <p style="text-align: center;">Los datos fueron actualizados por última vez el <b>{}</b>.</p>
         
         """.format(today_format), unsafe_allow_html=True)
+    return app_data.select_artist()
 
 @st.cache_data
-def content():
+def content(data_version, artist):
+    """Page content, cached per database version (data_version) and catalog artist."""
     st.markdown("""
     ## Formatos de Lanzamiento de Canciones
 
     Taylor Swift actualmente tiene más de 350 canciones en su discografía: muchas han sido lanzadas en sus álbumes de estudio, pero una cantidad significativa ha sido lanzada en otros formatos. Para visualizar mejor su discografía, he categorizado sus canciones en cuatro grupos basados en el formato de lanzamiento: canciones en sus álbumes de estudio (incluyendo versiones deluxe), canciones en sus álbumes regrabados, canciones en álbumes de otros artistas (sin incluir bandas sonoras) y cualquier otro formato de lanzamiento misceláneo como EPs, sencillos promocionales o lanzamientos de bandas sonoras.
     """)
     
-    release_formats = toolkit.sql_to_string('release_formats.sql')
-    
-    formats = pd.read_sql(release_formats, connection)
-    formats_table = formats.set_index('classification')
-
-    formats_fig, formats_ax = charts.formats_pie(custom_params, formats, 'total_songs', 'classification', 'Song Release Formats', 
-                                             ['#f6fff8', '#eaf4f4', '#cce3de', '#a4c3b2'], True, 'release_formats.png', True, formats)
-    
-    st.pyplot(formats_fig)
+    app_data.show_chart('release_formats', custom_params, artist=artist)
 
     with st.expander("Ver discusión"):
         st.write("""
@@ -80,13 +68,8 @@ def content():
     1. Grafico las distribuciones de frecuencia para los años de lanzamiento, los meses de lanzamiento y los días de lanzamiento de forma independiente, para ver en qué años, meses y días Taylor ha lanzado la mayor parte de su música.
     2. Grafico los meses de lanzamiento en función de los días de lanzamiento para encontrar las fechas más comunes en las que Taylor tiende a lanzar música.
     """)
-    release_dates_split = toolkit.sql_to_string('release_dates_split.sql')
-    releases = pd.read_sql(release_dates_split, connection)
-
-    releases_fig, releases_ax = charts.release_hist(custom_params, releases, 'year', 'month', 'day', 'Frequency Distributions of Song Release Dates', 
-                                             'Release Years', 'Release Months', 'Release Days', 'Year', 'Month', 'Day of Month', 'Song Count', 
-                                             ['#d00000', '#e85d04', '#faa307'], ['#6a040f'], True, 'release_dates_distribution.png')
-    st.pyplot(releases_fig)
+    
+    app_data.show_chart('release_dates_distribution', custom_params, artist=artist)
 
     with st.expander("Ver discusión"):
         st.write("""
@@ -94,15 +77,8 @@ def content():
 
             En cuanto a los meses más productivos, Taylor tiende a lanzar sus canciones en octubre, con casi un tercio de su catálogo completo lanzado en ese mes. Otros meses de alta actividad son noviembre, abril y julio, con 60, 59 y 41 canciones lanzadas respectivamente. No suele lanzar música en febrero, junio o enero, el primero solo tiene 3 lanzamientos de canciones y los dos últimos tienen 5 lanzamientos de canciones cada uno. Taylor también tiende a lanzar canciones más tarde en el mes, la mayoría se lanzan entre el día 19 y el día 27 del mes. También tiende a lanzar canciones los días 12, 7, 9 y 11 del mes, dentro de las primeras dos semanas del mes.
             """)
-
-    month_day_distribution = toolkit.sql_to_string('month_day_distribution.sql')
-    month_day = pd.read_sql(month_day_distribution, connection)
-    dates = month_day.sort_values(by=['count'], ascending=False)
-    dates = dates[['date', 'count']].head(10)
-
-    freq_dates_fig, freq_dates_ax = charts.date_scatter(custom_params, month_day, 'month', 'day', 'count', 'Most Frequent Release Dates', 
-                                                        'Month', 'Day of Month', True, 'most_frequent_dates.png', True, dates)
-    st.pyplot(freq_dates_fig)
+    
+    app_data.show_chart('most_frequent_dates', custom_params, artist=artist)
 
     with st.expander("Ver discusión"):
         st.write("""
@@ -111,5 +87,3 @@ def content():
 
 if __name__ == '__main__':
     main()
-
-connection.close()
\ No newline at end of file
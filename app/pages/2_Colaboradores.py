@@ -4,12 +4,10 @@ from datetime import date
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-import pandas as pd
 import streamlit as st
-import sqlite3 as sql
 from matplotlib import rcParams
 
-from src import charts
+from src import app_data
 from src import toolkit
 
 st.set_page_config(page_title="Colaboradores")
@@ -23,28 +21,17 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-connection = sql.connect('data/taylor_swift.db')
-cursor = connection.cursor()
-
-eras = toolkit.eras_order()
-
-credits = {
-    'writer': '#6D466B',
-    'producer': '#58A4B0',
-    'artist': '#FF6B6C'}
-
 rcParams, custom_params = toolkit.chart_params(rcParams)
 
-# Creating several temporary tables to be used throughout
-temp_tables = toolkit.sql_to_string('collab_temp_tables.sql')
-cursor.executescript(temp_tables)
+# Derived tables are materialized once when the database is built
+app_data.check_analytics()
 
 today = date(2024, 5, 5)
 today_format = today.strftime("%B %d, %Y")
 
 def main():
-    sidebar()
-    content()
+    artist = sidebar()
+    content(app_data.db_version(), artist)
 
 def sidebar():
     with st.sidebar:
@@ -54,9 +41,11 @@ def sidebar():
         <p style="text-align: center;">Los datos fueron actualizados por última vez el <b>{}</b>.</p>
         
         """.format(today_format), unsafe_allow_html=True)
+    return app_data.select_artist()
 
 @st.cache_data
-def content():
+def content(data_version, artist):
+    """Page content, cached per database version (data_version) and catalog artist."""
     st.markdown("""
     ## Eras más colaborativas
     
@@ -66,24 +55,7 @@ def content():
     2. Cuento el número *total* de escritores, productores y artistas por canción antes de resumir por era. Luego calculo la cantidad promedio de escritores, productores y artistas por canción para cada era, así como las medias generales para cada tipo de músico por canción. Finalmente, comparo los promedios de las eras con las medias generales para determinar cuáles son las eras más y menos colaborativas.
     """)
     
-    unique_credit_per_era = toolkit.sql_to_string('unique_credit_per_era.sql')
-    
-    unique_credit = pd.read_sql(unique_credit_per_era, connection)
-    toolkit.abbreviate_ttpd(unique_credit['era'])
-    toolkit.sort_cat_column(unique_credit, 'era', eras)
-    
-    # Pivoting dataframe for chart table
-    unique_credit_pivot = unique_credit.pivot(columns='era', index='type', values='unique_count')
-    unique_credit_pivot.sort_values('type', ascending=False, inplace=True)
-    
-    # Calculating overall means for type
-    avg_per_type_unique = unique_credit.groupby('type')['unique_count'].mean().sort_values(ascending=False)
-    
-    credits_total_fig, credits_total_ax = charts.credit_chart(credits, custom_params, 'bar', unique_credit, 'era', 'unique_count', 'type', 
-                        avg_per_type_unique, 'Total Unique Musicial Credits per Era',
-                        'Album/Song Era', '# per Era (Count)', 'Credit Type', True,
-                        True, 'unique_credits_per_era.png', True, unique_credit_pivot)
-    st.pyplot(credits_total_fig)
+    app_data.show_chart('unique_credits_per_era', custom_params, artist=artist)
     
     with st.expander("Ver discusión"):
         st.write("""
@@ -96,24 +68,7 @@ def content():
             Teniendo en cuenta estos problemas, llegué a mi segundo enfoque: calcular el promedio de cada tipo de músico por canción individual y comparar los promedios generales por era.
         """)
     
-    avg_credit_per_song = toolkit.sql_to_string('avg_credit_per_song.sql')
-    
-    avg_credit = pd.read_sql(avg_credit_per_song, connection)
-    toolkit.abbreviate_ttpd(avg_credit['era'])
-    toolkit.sort_cat_column(avg_credit, 'era', eras)
-    
-    # Pivoting dataframe for chart table
-    avg_credit_pivot = avg_credit.pivot(columns='era', index='type', values='avg_per_song')
-    avg_credit_pivot.sort_values('type', ascending=False, inplace=True)
-    
-    # Calculating overall means for type-per-song
-    avg_per_type = avg_credit.groupby('type')['avg_per_song'].mean().sort_values(ascending=False)
-    
-    avg_credits_fig, avg_credits_ax = charts.credit_chart(credits, custom_params, 'line', avg_credit, 'era', 'avg_per_song', 'type', 
-                        avg_per_type, 'Average Number of Musicial Credits per Song by Era',
-                        'Album/Song Era', '# per Song (Average)', 'Credit Type', True,
-                        True, 'avg_credits_per_song.png', True, avg_credit_pivot)
-    st.pyplot(avg_credits_fig)
+    app_data.show_chart('avg_credits_per_song', custom_params, artist=artist)
     
     with st.expander("See discussion"):
         st.write("""
@@ -132,21 +87,7 @@ def content():
     Por brevedad, clasifico a cada colaborador de Taylor según el número total de canciones en las que trabajaron en toda su discografía, siendo el #1 el que más canciones trabajó, y selecciono a los doce músicos con los rangos más altos (habría seleccionado diez, pero hay un empate de cuatro vías y quiero incluirlos a todos).
     """)
     
-    most_frequent_collabs = toolkit.sql_to_string('most_frequent_collaborators.sql')
-    
-    freq_collabs = pd.read_sql(most_frequent_collabs, connection)
-    toolkit.abbreviate_ttpd(freq_collabs['era'])
-    toolkit.sort_cat_column(freq_collabs, 'era', eras)
-    
-    collab_totals = freq_collabs.loc[:,('collaborator', 'total_songs')]
-    collab_totals.drop_duplicates('collaborator', inplace=True)
-    collab_totals.sort_values('collaborator', inplace=True)
-    collab_totals.set_index('collaborator', inplace=True)
-    
-    freq_collabs_fig, freq_collabs_ax = charts.collab_heatmap(custom_params, freq_collabs, 'era', 'collaborator', 'songs', 'sum', 
-                   'Most Frequent Collaborators per Era', 'Album/Song Era', 'Collaborator Name', 
-                   True, True, 'most_frequent_collabs_per_era.png', table_bool=True, table_df=collab_totals)
-    st.pyplot(freq_collabs_fig)
+    app_data.show_chart('most_frequent_collabs_per_era', custom_params, artist=artist)
     
     with st.expander("See discussion"):
         st.write("""
@@ -155,7 +96,13 @@ def content():
             Mientras tanto, el colaborador número 2, Nathan Chapman, deja de trabajar con Taylor poco después de que ella haga la transición de la música country al pop, solo trabajando en 1 canción durante "1989" a pesar de ser acreditado varias veces en sus álbumes anteriores. Curiosamente, no regresa para producir las canciones en las versiones regrabadas de "Fearless", "Speak Now" y "Red". Esto a pesar de que varios colaboradores de los álbumes originales regresan para las versiones regrabadas, como Liz Rose para "Fearless (Taylor's Version)" y Max Martin y Shellback para "1989 (Taylor's Version)". En cambio, Christopher Rowe, el colaborador número 3 de Taylor, parece intervenir para hacer la mayor parte de las colaboraciones en las versiones regrabadas, a pesar de no haber trabajado con Taylor antes de "Fearless (Taylor's Version)".
             """)
 
+    st.markdown("""
+    ## Red de colaboradores
+
+    Los colaboradores de Taylor también trabajan entre ellos. En esta red, cada círculo es uno de los quince colaboradores más frecuentes (con el número total de canciones en las que trabajó) y cada línea une a dos colaboradores que trabajaron juntos en al menos una canción; cuanto más gruesa es la línea, más canciones comparten.
+    """)
+
+    app_data.show_chart('collaborator_network', custom_params, artist=artist)
+
 if __name__ == '__main__':
     main()
-
-connection.close()
\ No newline at end of file
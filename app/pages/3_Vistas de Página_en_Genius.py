@@ -4,12 +4,10 @@ from datetime import date
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-import pandas as pd
 import streamlit as st
-import sqlite3 as sql
 from matplotlib import rcParams
 
-from src import charts
+from src import app_data
 from src import toolkit
 
 st.set_page_config(page_title="Vistas de Página en Genius")
@@ -23,23 +21,17 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-connection = sql.connect('data/taylor_swift.db')
-cursor = connection.cursor()
-
-eras = toolkit.eras_order()
-
 rcParams, custom_params = toolkit.chart_params(rcParams)
 
-# Creating temporary table to be used throughout
-temp_table = toolkit.sql_to_string('views_temp_table.sql')
-cursor.executescript(temp_table)
+# Derived tables are materialized once when the database is built
+app_data.check_analytics()
 
 today = date(2024, 5, 5)
 today_format = today.strftime("%B %d, %Y")
 
 def main():
-    sidebar()
-    content()
+    artist = sidebar()
+    content(app_data.db_version(), artist)
 
 def sidebar():
     with st.sidebar:
@@ -49,9 +41,11 @@ def sidebar():
         <p style="text-align: center;">Los datos fueron actualizados por última vez el <b>{}</b>.</p>
         
         """.format(today_format), unsafe_allow_html=True)
+    return app_data.select_artist()
 
 @st.cache_data
-def content():
+def content(data_version, artist):
+    """Page content, cached per database version (data_version) and catalog artist."""
     st.markdown("""
     ## Vistas de páginas en Genius
 
@@ -60,20 +54,8 @@ def content():
     1. Sumo el número total de vistas de página para cada canción y las comparo entre sí para ver cuál es la más popular, así como trazo la distribución de frecuencia de las vistas de página en la discografía de Taylor.
     2. Represento gráficamente la distribución de las vistas de página mediante un diagrama de caja para comparar las medianas, medias y cualquier valor atípico que potencialmente influya en las conclusiones del enfoque anterior.
     """)
-    df_views = pd.read_sql('SELECT * FROM song_views', connection)
     
-    views_totals = toolkit.sql_to_string('views_totals.sql')
-    era_views = pd.read_sql(views_totals, connection)
-    toolkit.abbreviate_ttpd(era_views['era'])
-    toolkit.abbreviate_ttpd(df_views['era'])
-    toolkit.sort_cat_column(era_views, 'era', eras)
-    toolkit.sort_cat_column(df_views, 'era', eras)
-
-    views_fig, views_ax = charts.views_plots(custom_params, era_views, 'total_views', 'era', df_views, 'views', 
-                                             'Song Page Views on Genius', 'Total Page Views per Era', 'Frequency Distribution of Page Views',
-                                             'Total Page Views', 'Page Views', 'Album/Song Era', 'Song Count', ['#858ae3', '#613dc1'], 
-                                             ['#4e148c', '#2c0735'], True, 'total_page_views_distribution.png')
-    st.pyplot(views_fig)
+    app_data.show_chart('total_page_views_distribution', custom_params, artist=artist)
 
     with st.expander("Ver discusión"):
         st.write("""
@@ -81,10 +63,8 @@ def content():
 
             Hay algunos problemas con este enfoque, como se ilustra en el histograma adjunto: los datos están sesgados hacia la derecha, con la mayoría de las páginas de canciones teniendo menos de 1 millón de vistas. Debido a esto, es probable que estos totales estén influenciados por valores atípicos, o canciones individuales con una gran cantidad de vistas. Para contrarrestar esto, trazamos las distribuciones y vemos cómo se comparan las medianas entre sí.
             """)
-
-    view_box_fig, view_box_ax = charts.views_box(custom_params, df_views,'views', 'era', 'Genius Song Page View Distribution per Album/Song Category', 
-                                                 'Page Views', 'Album/Song Era', '#7D7C78', '#3A3633', True, 'page_view_box_distribution.png')
-    st.pyplot(view_box_fig)
+    
+    app_data.show_chart('page_view_box_distribution', custom_params, artist=artist)
 
     with st.expander("Ver discusión"):
         st.write("""
@@ -97,5 +77,3 @@ def content():
 
 if __name__ == '__main__':
     main()
-
-connection.close()
\ No newline at end of file
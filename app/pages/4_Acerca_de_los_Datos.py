@@ -4,9 +4,10 @@ from datetime import date
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-import pandas as pd
 import streamlit as st
 
+from src import columnar
+
 st.set_page_config(page_title="Acerca de los Datos")
 
 st.markdown(
@@ -50,7 +51,7 @@ def content():
     st.markdown("""
     """)
 
-    df = pd.read_pickle('data/taylor_swift_clean.pkl')
+    df = columnar.read_columnar('data/taylor_swift_clean.parquet')
 
     st.dataframe(df.sample(100))
     st.markdown("""
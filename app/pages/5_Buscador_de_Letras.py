@@ -0,0 +1,104 @@
+import os
+import sys
+from datetime import date
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import streamlit as st
+
+from src import app_data
+from src import lyric_analytics
+from src import lyrics_search
+
+st.set_page_config(page_title="Buscador de Letras")
+
+st.markdown(
+    """
+    <style>
+        section.main > div {max-width:65rem}
+    </style>
+    """,
+    unsafe_allow_html=True
+)
+
+# The lyrics index is built with the other derived tables
+app_data.check_analytics()
+
+today = date(2024, 5, 5)
+today_format = today.strftime("%B %d, %Y")
+
+# {'option shown': search mode in lyrics_search}
+search_modes = {'Frase exacta': 'phrase',
+                'Prefijo de palabras': 'prefix',
+                'Palabras cercanas': 'near'}
+
+def main():
+    sidebar()
+    content()
+    lyric_reports(app_data.db_version())
+
+def sidebar():
+    with st.sidebar:
+        st.image('assets/img/TheTorturedPoetsDepartment.jpg')
+        st.markdown("""
+        <h3 style="text-align: center;">Discografía de Taylor Swift - Canciones</h3>
+        <p style="text-align: center;">Los datos fueron actualizados por última vez el <b>{}</b>.</p>
+
+        """.format(today_format), unsafe_allow_html=True)
+
+def content():
+    st.markdown("""
+    ## Buscador de Letras
+
+    Busca cualquier verso en la discografía de Taylor Swift. La búsqueda puede ser por una frase exacta, por el comienzo de las palabras (por ejemplo, "danc" encuentra "dancing" y "dancin'") o por palabras que aparecen cerca unas de otras en el mismo verso. Los resultados muestran la canción, el álbum, la era y el número de línea de cada verso.
+    """)
+
+    text = st.text_input('Buscar en las letras', placeholder='por ejemplo: blue eyes')
+    mode = st.radio('Tipo de búsqueda', list(search_modes.keys()), horizontal=True)
+    distance = 10
+    if search_modes[mode] == 'near':
+        distance = st.slider('Distancia máxima entre palabras', min_value=1, max_value=20, value=10)
+
+    if text.strip() == '':
+        return
+
+    results = lyrics_search.search(app_data.read_sql, text, search_modes[mode], distance, limit=200)
+    if len(results) == 0:
+        st.info('No se encontraron versos para "{}".'.format(text))
+        return
+
+    st.caption('{} versos encontrados, los más relevantes primero.'.format(len(results)))
+    results = results.rename(columns={'song_title': 'Canción',
+                                      'album_title': 'Álbum',
+                                      'era': 'Era',
+                                      'line_number': 'Línea',
+                                      'song_lyric': 'Verso'})
+    st.dataframe(results, hide_index=True)
+
+@st.cache_data
+def lyric_reports(data_version):
+    """Lyric analytics section, cached per database version (data_version)."""
+    reports = lyric_analytics.load_reports(app_data.db_name)
+
+    st.markdown("""
+    ## Análisis de Letras
+
+    Todas las letras se dividen en palabras una sola vez y se cuentan por canción y por era. Las palabras más características de cada era son las que más aparecen en esa era y menos en las demás (TF-IDF), sin contar palabras comunes como "the" o "you".
+    """)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown('#### Palabras más frecuentes')
+        st.dataframe(reports['word_frequencies'].head(15).rename(columns={'word': 'Palabra', 'count': 'Veces', 'songs': 'Canciones'}),
+                     hide_index=True)
+    with col2:
+        st.markdown('#### Frases de dos palabras más frecuentes')
+        st.dataframe(reports['bigrams'].head(15).rename(columns={'ngram': 'Frase', 'count': 'Veces'}), hide_index=True)
+
+    st.markdown('#### Palabras más características por era')
+    top_terms = reports['era_top_terms']
+    top_terms = top_terms[top_terms['rank'] <= 5].groupby('era', sort=False)['word'].agg(', '.join)
+    st.dataframe(top_terms.reset_index().rename(columns={'era': 'Era', 'word': 'Palabras'}), hide_index=True)
+
+if __name__ == '__main__':
+    main()
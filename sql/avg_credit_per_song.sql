@@ -3,33 +3,41 @@ The following query is written to work in a SQLite database, specifically throug
 Depending on SQL dialect and database engine, this query may need to be modified.
 */
 
--- Calculate average number of writers/prodcuers/artists per song per era
+-- Calculate average number of writers/prodcuers/artists per song per era for one catalog (artist parameter)
+WITH catalog_eras AS (
+    SELECT
+        *
+    FROM
+        credit_counts_per_era
+    WHERE
+        artist = ?
+)
 SELECT
     era,
-    "writer" AS type,
+    'writer' AS type,
     ROUND(
         CAST(total_writers AS REAL) / total_songs,
         2
     ) AS avg_per_song
 FROM
-    credit_counts_per_era
+    catalog_eras
 UNION
 SELECT
     era,
-    "producer" AS type,
+    'producer' AS type,
     ROUND(
         CAST(total_producers AS REAL) / total_songs,
         2
     ) AS avg_per_song
 FROM
-    credit_counts_per_era
+    catalog_eras
 UNION
 SELECT
     era,
-    "artist" AS type,
+    'artist' AS type,
     ROUND(
         CAST(total_artists AS REAL) / total_songs,
         2
     ) AS avg_per_song
 FROM
-    credit_counts_per_era;
\ No newline at end of file
+    catalog_eras;
\ No newline at end of file
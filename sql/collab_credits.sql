@@ -0,0 +1,42 @@
+/* 
+The following query is written to work in a SQLite database, specifically through the sqlite3 Python module.
+Depending on SQL dialect and database engine, this query may need to be modified.
+*/
+
+-- Every credit (writer, producer, artist) with its song, catalog artist, and era, one row per credit
+-- Used to build the collaborator graph (see src/collab_graph.py)
+SELECT
+    s.song_id AS song_id,
+    c.artist AS artist,
+    a.category AS era,
+    w.song_writer AS collaborator,
+    'writer' AS role
+FROM
+    writers w
+    JOIN songs s ON w.song_id = s.song_id
+    JOIN albums a ON s.album_id = a.album_id
+    JOIN catalogs c ON a.catalog_id = c.catalog_id
+UNION ALL
+SELECT
+    s.song_id AS song_id,
+    c.artist AS artist,
+    a.category AS era,
+    p.song_producer AS collaborator,
+    'producer' AS role
+FROM
+    producers p
+    JOIN songs s ON p.song_id = s.song_id
+    JOIN albums a ON s.album_id = a.album_id
+    JOIN catalogs c ON a.catalog_id = c.catalog_id
+UNION ALL
+SELECT
+    s.song_id AS song_id,
+    c.artist AS artist,
+    a.category AS era,
+    sa.song_artist AS collaborator,
+    'artist' AS role
+FROM
+    artists sa
+    JOIN songs s ON sa.song_id = s.song_id
+    JOIN albums a ON s.album_id = a.album_id
+    JOIN catalogs c ON a.catalog_id = c.catalog_id;
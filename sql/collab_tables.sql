@@ -0,0 +1,172 @@
+/* 
+The following query is written to work in a SQLite database, specifically through the sqlite3 Python module.
+Depending on SQL dialect and database engine, this query may need to be modified.
+*/
+
+-- Table of total amounts of unique writers/producers/artists per catalog and era
+-- Used in section "Most Collaborative Eras - Unique collaborators Per Era"
+DROP 
+    TABLE IF EXISTS unique_credits_per_era;
+CREATE TABLE unique_credits_per_era (
+    artist TEXT,
+    era TEXT,
+    unique_writers INTEGER,
+    unique_producers INTEGER,
+    unique_artists INTEGER
+);
+INSERT INTO unique_credits_per_era 
+SELECT 
+    c.artist AS artist,
+    a.category AS era,
+    COUNT(DISTINCT w.song_writer) as unique_writers,
+    COUNT(DISTINCT p.song_producer) as unique_producers,
+    COUNT(DISTINCT sa.song_artist) as unique_artists
+FROM 
+    albums a
+    JOIN catalogs c ON a.catalog_id = c.catalog_id
+    LEFT JOIN songs s ON a.album_id = s.album_id
+    LEFT JOIN writers w ON s.song_id = w.song_id
+    LEFT JOIN producers p ON s.song_id = p.song_id
+    LEFT JOIN artists sa ON s.song_id = sa.song_id
+GROUP BY
+    c.artist, a.category;
+
+-- Table of total number of credits (writers, producers, artists) per song
+-- Used in section "Most Collaborative Eras - Average collaborators Per Song By Era"
+DROP 
+    TABLE IF EXISTS credit_counts_per_song;
+CREATE TABLE credit_counts_per_song (
+    album_id INTEGER,
+    song_title TEXT,
+    writers INTEGER,
+    producers INTEGER,
+    artists INTEGER
+);
+INSERT INTO credit_counts_per_song
+SELECT
+    s.album_id AS album_id,
+    s.song_title AS song_title,
+    COUNT(DISTINCT w.song_writer) AS writers,
+    COUNT(DISTINCT p.song_producer) AS producers,
+    COUNT(DISTINCT sa.song_artist) AS artists
+FROM
+    songs s
+    JOIN writers w ON s.song_id = w.song_id
+    JOIN producers p ON s.song_id = p.song_id
+    JOIN artists sa ON s.song_id = sa.song_id
+GROUP BY
+    s.song_id;
+
+-- Table of total songs and total number of credits (writers, producers, artists) per catalog and era
+-- Used in section "Most Collaborative Eras - Average Musicians Per Song By Era"
+DROP 
+    TABLE IF EXISTS credit_counts_per_era;
+CREATE TABLE credit_counts_per_era (
+    artist TEXT,
+    era TEXT,
+    total_songs INTEGER,
+    total_writers INTEGER,
+    total_producers INTEGER,
+    total_artists INTEGER
+);
+INSERT INTO credit_counts_per_era
+SELECT
+    c.artist AS artist,
+    a.category AS era,
+    COUNT(DISTINCT song_title) AS total_songs,
+    SUM(cc.writers) AS total_writers,
+    SUM(cc.producers) AS total_producers,
+    SUM(cc.artists) AS total_artists
+FROM
+    credit_counts_per_song cc
+    JOIN albums a ON cc.album_id = a.album_id
+    JOIN catalogs c ON a.catalog_id = c.catalog_id
+GROUP BY
+    c.artist, a.category;
+
+-- Table of collaborators and the songs they worked on, regardless of contribution
+-- Used in section "Frequent Collaborators"
+DROP 
+    TABLE IF EXISTS collaborators_per_song;
+CREATE TABLE collaborators_per_song (
+    artist TEXT,
+    era TEXT,
+    song_title TEXT,
+    collaborator TEXT,
+    songs_worked_on INTEGER
+);
+INSERT INTO collaborators_per_song
+WITH collaborators as (
+    SELECT 
+        c.artist AS artist,
+        a.category AS era,
+        s.song_id as song_id,
+        s.song_title as song_title,
+        w.song_writer AS collaborator
+    FROM 
+        albums a
+        JOIN catalogs c ON a.catalog_id = c.catalog_id
+        JOIN songs s ON a.album_id = s.album_id
+        JOIN writers w ON s.song_id = w.song_id
+    UNION ALL
+    SELECT 
+        c.artist AS artist,
+        a.category AS era,
+        s.song_id as song_id,
+        s.song_title as song_title,
+        p.song_producer AS collaborator
+    FROM 
+        albums a
+        JOIN catalogs c ON a.catalog_id = c.catalog_id
+        JOIN songs s ON a.album_id = s.album_id
+        JOIN producers p ON s.song_id = p.song_id
+    UNION ALL
+    SELECT 
+        c.artist AS artist,
+        a.category AS era,
+        s.song_id as song_id,
+        s.song_title as song_title,
+        sa.song_artist AS collaborator
+    FROM 
+        albums a
+        JOIN catalogs c ON a.catalog_id = c.catalog_id
+        JOIN songs s ON a.album_id = s.album_id
+        JOIN artists sa ON s.song_id = sa.song_id
+    ORDER BY
+        c.artist, a.category, s.song_title
+)
+SELECT
+    artist,
+    era,
+    song_title,
+    collaborator,
+    1 AS songs_worked_on
+FROM
+    collaborators
+GROUP BY
+    artist, era, song_id, collaborator;
+
+-- Table of collaborators and their totals songs worked on per catalog and era, removing the catalog's own artist
+-- Used in section "Frequent Collaborators"
+DROP 
+    TABLE IF EXISTS collaborators_per_era;
+CREATE TABLE collaborators_per_era (
+    artist TEXT,
+    era TEXT,
+    collaborator TEXT,
+    songs INTEGER,
+    total_songs INTEGER
+);
+INSERT INTO collaborators_per_era
+SELECT
+    artist,
+    era,
+    collaborator,
+    SUM(songs_worked_on) AS songs,
+    SUM(COUNT(*)) OVER (PARTITION BY artist, collaborator) AS total_songs
+FROM
+    collaborators_per_song
+WHERE
+    collaborator != artist
+GROUP BY
+    artist, era, collaborator
\ No newline at end of file
@@ -0,0 +1,119 @@
+/*
+The following query is written to work in a SQLite database, specifically through the sqlite3 Python module.
+Depending on SQL dialect and database engine, this query may need to be modified.
+*/
+
+-- Schema of the discography database, (re)created by convert_to_db
+-- Songs and albums get integer surrogate keys that every other table joins on;
+-- the title columns are kept for readability and older queries
+-- Every album belongs to one artist's catalog, so several catalogs can share a database
+DROP
+    VIEW IF EXISTS catalog_songs;
+DROP
+    TABLE IF EXISTS build_info;
+DROP
+    TABLE IF EXISTS lyrics_fts;
+DROP
+    TABLE IF EXISTS lyrics;
+DROP
+    TABLE IF EXISTS tags;
+DROP
+    TABLE IF EXISTS producers;
+DROP
+    TABLE IF EXISTS writers;
+DROP
+    TABLE IF EXISTS artists;
+DROP
+    TABLE IF EXISTS songs;
+DROP
+    TABLE IF EXISTS albums;
+DROP
+    TABLE IF EXISTS catalogs;
+
+CREATE TABLE catalogs (
+    catalog_id INTEGER PRIMARY KEY,
+    artist TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE albums (
+    album_id INTEGER PRIMARY KEY,
+    catalog_id INTEGER NOT NULL REFERENCES catalogs (catalog_id),
+    album_title TEXT NOT NULL,
+    album_url TEXT,
+    category TEXT NOT NULL
+);
+
+CREATE TABLE songs (
+    song_id INTEGER PRIMARY KEY,
+    album_id INTEGER NOT NULL REFERENCES albums (album_id),
+    song_title TEXT NOT NULL,
+    album_title TEXT,
+    album_track_number TEXT,
+    song_url TEXT,
+    song_release_date TIMESTAMP,
+    song_page_views INTEGER
+);
+
+CREATE TABLE artists (
+    song_id INTEGER NOT NULL REFERENCES songs (song_id),
+    song_title TEXT,
+    song_artist TEXT
+);
+
+CREATE TABLE writers (
+    song_id INTEGER NOT NULL REFERENCES songs (song_id),
+    song_title TEXT,
+    song_writer TEXT
+);
+
+CREATE TABLE producers (
+    song_id INTEGER NOT NULL REFERENCES songs (song_id),
+    song_title TEXT,
+    song_producer TEXT
+);
+
+CREATE TABLE tags (
+    song_id INTEGER NOT NULL REFERENCES songs (song_id),
+    song_title TEXT,
+    song_tag TEXT
+);
+
+CREATE TABLE lyrics (
+    lyric_id INTEGER PRIMARY KEY,
+    song_id INTEGER NOT NULL REFERENCES songs (song_id),
+    song_title TEXT,
+    song_lyric TEXT,
+    lyric_order INTEGER
+);
+
+-- Version stamps written when the analytics tables are materialized
+CREATE TABLE build_info (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+-- Indexes on join columns and category
+CREATE UNIQUE INDEX albums_title_url_idx ON albums (catalog_id, album_title, album_url);
+CREATE INDEX albums_category_idx ON albums (category);
+CREATE INDEX songs_album_id_idx ON songs (album_id);
+CREATE INDEX songs_title_idx ON songs (song_title);
+CREATE INDEX artists_song_id_idx ON artists (song_id, song_artist);
+CREATE INDEX writers_song_id_idx ON writers (song_id, song_writer);
+CREATE INDEX producers_song_id_idx ON producers (song_id, song_producer);
+CREATE INDEX tags_song_id_idx ON tags (song_id);
+CREATE INDEX lyrics_song_id_idx ON lyrics (song_id, lyric_order);
+
+-- Songs with their artist and era, for running the same analysis across catalogs
+CREATE VIEW catalog_songs AS
+SELECT
+    c.artist AS artist,
+    a.category AS era,
+    a.album_title AS album_title,
+    s.song_id AS song_id,
+    s.song_title AS song_title,
+    s.song_release_date AS song_release_date,
+    s.song_page_views AS song_page_views
+FROM
+    songs s
+    JOIN albums a ON s.album_id = a.album_id
+    JOIN catalogs c ON a.catalog_id = c.catalog_id;
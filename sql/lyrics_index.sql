@@ -0,0 +1,16 @@
+/* 
+The following query is written to work in a SQLite database, specifically through the sqlite3 Python module.
+Depending on SQL dialect and database engine, this query may need to be modified.
+*/
+
+-- Full-text index (FTS5) of lyric lines, stored as an external content table over lyrics
+-- Used throughout "Lyrics Search" app page (see src/lyrics_search.py)
+DROP 
+    TABLE IF EXISTS lyrics_fts;
+CREATE VIRTUAL TABLE lyrics_fts USING fts5(
+    song_lyric,
+    content = 'lyrics',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+INSERT INTO lyrics_fts (lyrics_fts) VALUES ('rebuild');
+INSERT INTO lyrics_fts (lyrics_fts) VALUES ('optimize');
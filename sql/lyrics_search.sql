@@ -0,0 +1,25 @@
+/* 
+The following query is written to work in a SQLite database, specifically through the sqlite3 Python module.
+Depending on SQL dialect and database engine, this query may need to be modified.
+*/
+
+-- Lyric lines matching an FTS5 query (first parameter), best matches first, up to a limit (second parameter)
+-- Used throughout "Lyrics Search" app page
+SELECT
+    s.song_title AS song_title,
+    a.album_title AS album_title,
+    a.category AS era,
+    l.lyric_order AS line_number,
+    l.song_lyric AS song_lyric
+FROM
+    lyrics_fts
+    JOIN lyrics l ON l.rowid = lyrics_fts.rowid
+    JOIN songs s ON s.song_id = l.song_id
+    JOIN albums a ON a.album_id = s.album_id
+WHERE
+    lyrics_fts MATCH ?
+ORDER BY
+    lyrics_fts.rank,
+    s.song_id,
+    l.lyric_order
+LIMIT ?;
@@ -3,7 +3,7 @@ The following query is written to work in a SQLite database, specifically throug
 Depending on SQL dialect and database engine, this query may need to be modified.
 */
 
--- Counts number of songs released for each month/day combo
+-- Counts number of songs released for each month/day combo in one catalog (artist parameter)
 SELECT
     release_month AS month,
     release_day AS day,
@@ -11,5 +11,7 @@ SELECT
     COUNT(*) AS count
 FROM
     release_info
+WHERE
+    artist = ?
 GROUP BY
     release_month, release_day;
\ No newline at end of file
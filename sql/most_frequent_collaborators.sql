@@ -3,7 +3,7 @@ The following query is written to work in a SQLite database, specifically throug
 Depending on SQL dialect and database engine, this query may need to be modified.
 */
 
--- Rank all collaborators by total songs worked on return most frequent
+-- Rank all collaborators of one catalog (artist parameter) by total songs worked on return most frequent
 WITH collaborators_ranked AS (
     SELECT
         era,
@@ -13,6 +13,8 @@ WITH collaborators_ranked AS (
         DENSE_RANK() OVER (ORDER BY total_songs DESC) AS rank
     FROM
         collaborators_per_era
+    WHERE
+        artist = ?
 )
 SELECT
     *
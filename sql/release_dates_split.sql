@@ -3,11 +3,13 @@ The following query is written to work in a SQLite database, specifically throug
 Depending on SQL dialect and database engine, this query may need to be modified.
 */
 
--- Table of release dates split into separate columns
+-- Table of release dates split into separate columns for one catalog (artist parameter)
 SELECT
     song_title,
     release_year AS year,
     release_month AS month,
     release_day AS day
 FROM
-    release_info;
\ No newline at end of file
+    release_info
+WHERE
+    artist = ?;
\ No newline at end of file
@@ -3,11 +3,13 @@ The following query is written to work in a SQLite database, specifically throug
 Depending on SQL dialect and database engine, this query may need to be modified.
 */
 
--- Summarizes songs counts by release formats
+-- Summarizes songs counts by release formats for one catalog (artist parameter)
 SELECT
     classification,
     COUNT(*) AS total_songs
 FROM
     release_info
+WHERE
+    artist = ?
 GROUP BY
     classification;
\ No newline at end of file
@@ -3,11 +3,12 @@ The following query is written to work in a SQLite database, specifically throug
 Depending on SQL dialect and database engine, this query may need to be modified.
 */
 
--- Temp table of release classifications and broken down release dates
+-- Table of release classifications and broken down release dates
 -- Used throughout "Release Overview" app page
 DROP 
-    TABLE IF EXISTS temp.release_info;
-CREATE TABLE temp.release_info (
+    TABLE IF EXISTS release_info;
+CREATE TABLE release_info (
+    artist TEXT,
     era TEXT,
     song_title TEXT,
     classification TEXT,
@@ -15,8 +16,9 @@ CREATE TABLE temp.release_info (
     release_day INTEGER,
     release_year INTEGER
 );
-INSERT INTO temp.release_info
+INSERT INTO release_info
 SELECT
+    c.artist AS artist,
     a.category AS era,
     s.song_title AS song_title,
     CASE
@@ -30,4 +32,5 @@ SELECT
     strftime('%Y', s.song_release_date) AS release_year
 FROM
     songs s
-    LEFT JOIN albums a ON s.album_title = a.album_title;
\ No newline at end of file
+    LEFT JOIN albums a ON s.album_id = a.album_id
+    LEFT JOIN catalogs c ON a.catalog_id = c.catalog_id;
\ No newline at end of file
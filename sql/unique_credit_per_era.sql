@@ -3,25 +3,33 @@ The following query is written to work in a SQLite database, specifically throug
 Depending on SQL dialect and database engine, this query may need to be modified.
 */
 
--- Restructures unique_credits_per_era for visualization
+-- Restructures unique_credits_per_era of one catalog (artist parameter) for visualization
+WITH catalog_eras AS (
+    SELECT
+        *
+    FROM
+        unique_credits_per_era
+    WHERE
+        artist = ?
+)
 SELECT
     era,
-    "writer" AS type,
+    'writer' AS type,
     unique_writers AS unique_count
 FROM
-    unique_credits_per_era
+    catalog_eras
 UNION
 SELECT
     era,
-    "producer" AS type,
+    'producer' AS type,
     unique_producers AS unique_count
 FROM
-    unique_credits_per_era
+    catalog_eras
 UNION
 SELECT
     era,
-    "artist" AS type,
+    'artist' AS type,
     unique_artists AS unique_count
 
 FROM
-    unique_credits_per_era;
\ No newline at end of file
+    catalog_eras;
\ No newline at end of file
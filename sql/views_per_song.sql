@@ -0,0 +1,14 @@
+/* 
+The following query is written to work in a SQLite database, specifically through the sqlite3 Python module.
+Depending on SQL dialect and database engine, this query may need to be modified.
+*/
+
+-- Page views of every song in one catalog (artist parameter)
+SELECT
+    era,
+    song_title,
+    views
+FROM
+    song_views
+WHERE
+    artist = ?;
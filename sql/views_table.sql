@@ -3,20 +3,23 @@ The following query is written to work in a SQLite database, specifically throug
 Depending on SQL dialect and database engine, this query may need to be modified.
 */
 
--- Temp table of songs, their categories, and their page views
+-- Table of songs, their categories, and their page views
 -- Used throughout "Genius Page Views" app page
 DROP 
-    TABLE IF EXISTS temp.song_views;
-CREATE TABLE temp.song_views (
+    TABLE IF EXISTS song_views;
+CREATE TABLE song_views (
+    artist TEXT,
     era TEXT,
     song_title TEXT,
     views INTEGER
 );
-INSERT INTO temp.song_views
+INSERT INTO song_views
 SELECT
+    c.artist AS artist,
     a.category AS era,
     s.song_title AS song_title,
     s.song_page_views AS views
 FROM
     albums a
-    LEFT JOIN songs s ON a.album_title = s.album_title;
\ No newline at end of file
+    JOIN catalogs c ON a.catalog_id = c.catalog_id
+    LEFT JOIN songs s ON a.album_id = s.album_id;
\ No newline at end of file
@@ -3,11 +3,13 @@ The following query is written to work in a SQLite database, specifically throug
 Depending on SQL dialect and database engine, this query may need to be modified.
 */
 
--- Summarizes page views by era
+-- Summarizes page views by era for one catalog (artist parameter)
 SELECT
     era,
     SUM(views) as total_views
 FROM
     song_views
+WHERE
+    artist = ?
 GROUP BY
     era;
\ No newline at end of file
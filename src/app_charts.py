@@ -0,0 +1,243 @@
+"""Builds the app's charts and pre-renders them as image assets.
+
+   Every chart shown in the app is defined once here from the database.
+   build_assets renders all of them for every catalog into
+   figures/assets/<key>/<artist>/ as PNG, SVG, and Vega-Lite JSON, where
+   the key hashes the data version together with the chart code, so the
+   pages can serve files instead of re-running matplotlib (see
+   app_data.show_chart).
+
+   Each chart function takes a backend module, charts (matplotlib Figure)
+   or chart_specs (Vega-Lite spec), and the artist of the catalog to
+   draw, and returns what that backend builds. The charts in graph_charts
+   also take the catalog's collab_graph, so callers can build it once.
+
+   Run 'python -m src.app_charts' from the project root after
+   rebuilding the database.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import sqlite3 as sql
+from functools import lru_cache
+
+import matplotlib
+import pandas as pd
+
+from . import chart_specs
+from . import charts
+from . import collab_graph
+from . import toolkit
+
+asset_root = 'figures/assets'
+asset_formats = ['png', 'svg']
+
+credits = {
+    'writer': '#6D466B',
+    'producer': '#58A4B0',
+    'artist': '#FF6B6C'}
+
+def release_formats(read_sql, custom_params, backend=charts, artist=toolkit.default_artist):
+    """Pie chart of song counts per release format."""
+    formats = read_sql(toolkit.sql_to_string('release_formats.sql'), params=(artist,))
+    fig, ax = backend.formats_pie(custom_params, formats, 'total_songs', 'classification', 'Song Release Formats',
+                                  ['#f6fff8', '#eaf4f4', '#cce3de', '#a4c3b2'], table_bool=True, table_df=formats)
+    return fig
+
+def release_dates(read_sql, custom_params, backend=charts, artist=toolkit.default_artist):
+    """Histograms of release years, months, and days."""
+    releases = read_sql(toolkit.sql_to_string('release_dates_split.sql'), params=(artist,))
+    fig, ax = backend.release_hist(custom_params, releases, 'year', 'month', 'day', 'Frequency Distributions of Song Release Dates',
+                                   'Release Years', 'Release Months', 'Release Days', 'Year', 'Month', 'Day of Month', 'Song Count',
+                                   ['#d00000', '#e85d04', '#faa307'], ['#6a040f'])
+    return fig
+
+def release_month_day(read_sql, custom_params, backend=charts, artist=toolkit.default_artist):
+    """Scatter plot of release months against release days."""
+    month_day = read_sql(toolkit.sql_to_string('month_day_distribution.sql'), params=(artist,))
+    dates = month_day.sort_values(by=['count'], ascending=False)
+    dates = dates[['date', 'count']].head(10)
+    fig, ax = backend.date_scatter(custom_params, month_day, 'month', 'day', 'count', 'Most Frequent Release Dates',
+                                   'Month', 'Day of Month', table_bool=True, table_df=dates)
+    return fig
+
+def unique_credits(read_sql, custom_params, backend=charts, artist=toolkit.default_artist):
+    """Bar chart of unique writers/producers/artists per era."""
+    unique_credit = read_sql(toolkit.sql_to_string('unique_credit_per_era.sql'), params=(artist,))
+    toolkit.abbreviate_ttpd(unique_credit['era'])
+    toolkit.sort_cat_column(unique_credit, 'era', toolkit.eras_order(unique_credit['era']))
+
+    # Pivoting dataframe for chart table
+    unique_credit_pivot = unique_credit.pivot(columns='era', index='type', values='unique_count')
+    unique_credit_pivot.sort_values('type', ascending=False, inplace=True)
+
+    # Calculating overall means for type
+    avg_per_type_unique = unique_credit.groupby('type')['unique_count'].mean().sort_values(ascending=False)
+
+    fig, ax = backend.credit_chart(credits, custom_params, 'bar', unique_credit, 'era', 'unique_count', 'type',
+                                   avg_per_type_unique, 'Total Unique Musicial Credits per Era',
+                                   'Album/Song Era', '# per Era (Count)', 'Credit Type', True,
+                                   table_bool=True, table_df=unique_credit_pivot)
+    return fig
+
+def avg_credits(read_sql, custom_params, backend=charts, artist=toolkit.default_artist):
+    """Line chart of average writers/producers/artists per song by era."""
+    avg_credit = read_sql(toolkit.sql_to_string('avg_credit_per_song.sql'), params=(artist,))
+    toolkit.abbreviate_ttpd(avg_credit['era'])
+    toolkit.sort_cat_column(avg_credit, 'era', toolkit.eras_order(avg_credit['era']))
+
+    # Pivoting dataframe for chart table
+    avg_credit_pivot = avg_credit.pivot(columns='era', index='type', values='avg_per_song')
+    avg_credit_pivot.sort_values('type', ascending=False, inplace=True)
+
+    # Calculating overall means for type-per-song
+    avg_per_type = avg_credit.groupby('type')['avg_per_song'].mean().sort_values(ascending=False)
+
+    fig, ax = backend.credit_chart(credits, custom_params, 'line', avg_credit, 'era', 'avg_per_song', 'type',
+                                   avg_per_type, 'Average Number of Musicial Credits per Song by Era',
+                                   'Album/Song Era', '# per Song (Average)', 'Credit Type', True,
+                                   table_bool=True, table_df=avg_credit_pivot)
+    return fig
+
+def catalog_graph(read_sql, artist, graph=None):
+    """Returns given graph, or the collab_graph of artist's catalog built from read_sql."""
+    if graph is None:
+        graph = collab_graph.catalog(collab_graph.load_graph(read_sql), artist)
+    return graph
+
+def frequent_collaborators(read_sql, custom_params, backend=charts, artist=toolkit.default_artist, graph=None):
+    """Heatmap of songs per era for the most frequent collaborators."""
+    freq_collabs = collab_graph.most_frequent(catalog_graph(read_sql, artist, graph))
+    toolkit.abbreviate_ttpd(freq_collabs['era'])
+    toolkit.sort_cat_column(freq_collabs, 'era', toolkit.eras_order(freq_collabs['era']))
+
+    collab_totals = freq_collabs.loc[:,('collaborator', 'total_songs')]
+    collab_totals.drop_duplicates('collaborator', inplace=True)
+    collab_totals.sort_values('collaborator', inplace=True)
+    collab_totals.set_index('collaborator', inplace=True)
+
+    fig, ax = backend.collab_heatmap(custom_params, freq_collabs, 'era', 'collaborator', 'songs', 'sum',
+                                     'Most Frequent Collaborators per Era', 'Album/Song Era', 'Collaborator Name',
+                                     True, table_bool=True, table_df=collab_totals)
+    return fig
+
+def collaborator_network(read_sql, custom_params, backend=charts, artist=toolkit.default_artist, graph=None):
+    """Network of the most frequent collaborators and the songs they share."""
+    nodes, edges = collab_graph.network(catalog_graph(read_sql, artist, graph), k=15)
+    fig, ax = backend.collab_network(custom_params, nodes, edges, 'collaborator', 'songs', 'shared_songs',
+                                     'Most Frequent Collaborators and Their Shared Songs', '#F5A6C6', '#7A3B69')
+    return fig
+
+def views_totals(read_sql, custom_params, backend=charts, artist=toolkit.default_artist):
+    """Bar chart of page views per era next to the page view histogram."""
+    df_views = read_sql(toolkit.sql_to_string('views_per_song.sql'), params=(artist,))
+    era_views = read_sql(toolkit.sql_to_string('views_totals.sql'), params=(artist,))
+    toolkit.abbreviate_ttpd(era_views['era'])
+    toolkit.abbreviate_ttpd(df_views['era'])
+    toolkit.sort_cat_column(era_views, 'era', toolkit.eras_order(era_views['era']))
+    toolkit.sort_cat_column(df_views, 'era', toolkit.eras_order(df_views['era']))
+
+    fig, ax = backend.views_plots(custom_params, era_views, 'total_views', 'era', df_views, 'views',
+                                  'Song Page Views on Genius', 'Total Page Views per Era', 'Frequency Distribution of Page Views',
+                                  'Total Page Views', 'Page Views', 'Album/Song Era', 'Song Count', ['#858ae3', '#613dc1'],
+                                  ['#4e148c', '#2c0735'])
+    return fig
+
+def views_box(read_sql, custom_params, backend=charts, artist=toolkit.default_artist):
+    """Box plots of page views per era."""
+    df_views = read_sql(toolkit.sql_to_string('views_per_song.sql'), params=(artist,))
+    toolkit.abbreviate_ttpd(df_views['era'])
+    toolkit.sort_cat_column(df_views, 'era', toolkit.eras_order(df_views['era']))
+
+    fig, ax = backend.views_box(custom_params, df_views,'views', 'era', 'Genius Song Page View Distribution per Album/Song Category',
+                                'Page Views', 'Album/Song Era', '#7D7C78', '#3A3633')
+    return fig
+
+# {'asset name': chart function}, names match the PNGs in figures/charts
+app_charts = {'release_formats': release_formats,
+              'release_dates_distribution': release_dates,
+              'most_frequent_dates': release_month_day,
+              'unique_credits_per_era': unique_credits,
+              'avg_credits_per_song': avg_credits,
+              'most_frequent_collabs_per_era': frequent_collaborators,
+              'collaborator_network': collaborator_network,
+              'total_page_views_distribution': views_totals,
+              'page_view_box_distribution': views_box}
+
+# Charts drawn from the collaborator graph, which take it as graph
+graph_charts = ['most_frequent_collabs_per_era', 'collaborator_network']
+
+@lru_cache(maxsize=8)
+def asset_key(data_version):
+    """Returns directory name for the assets of given data version.
+
+       Hashes the data version together with the source of the chart
+       modules, so changing either renders a fresh set of assets.
+    """
+    key_hash = hashlib.sha256(data_version.encode('utf-8'))
+    for module_file in [charts.__file__, chart_specs.__file__, __file__]:
+        with open(module_file, 'rb') as file:
+            key_hash.update(file.read())
+    return key_hash.hexdigest()[:16]
+
+def artist_dir(artist):
+    """Returns directory name for the assets of given catalog artist."""
+    return re.sub(r'[^\w-]+', '_', artist).strip('_')
+
+def asset_path(name, data_version, file_format='png', artist=toolkit.default_artist):
+    """Returns path of given chart asset for given data version and catalog."""
+    return os.path.join(asset_root, asset_key(data_version), artist_dir(artist), '{}.{}'.format(name, file_format))
+
+def build_assets(db_name='data/taylor_swift.db', keep_old=False):
+    """Renders every app chart of every catalog to PNG, SVG, and JSON spec for the database's data version.
+
+       Assets go into a new directory named by asset_key, which is swapped
+       in once complete. The collaborator graph is built once for all
+       charts. Directories from older versions are removed unless keep_old
+       is True. Returns the asset directory. Raises LookupError if the
+       database's build_info is missing or outdated.
+    """
+    connection = sql.connect(db_name)
+    build_info = toolkit.db_build_info(connection)
+    # Same check as app_data.check_analytics, the charts read the derived tables
+    if build_info.get('analytics_version') != toolkit.analytics_version or 'data_version' not in build_info:
+        connection.close()
+        raise LookupError('{} lacks the current derived tables; rebuild them with '
+                          'discog_mods.build_analytics(\'{}\')'.format(db_name, db_name))
+    data_version = build_info['data_version']
+    read_sql = lambda sql_text, params=None: pd.read_sql(sql_text, connection, params=params)
+    artists = read_sql('SELECT artist FROM catalogs ORDER BY catalog_id')['artist']
+
+    matplotlib.use('Agg')
+    rcParams, custom_params = toolkit.chart_params(matplotlib.rcParams)
+
+    asset_dir = os.path.join(asset_root, asset_key(data_version))
+    temp_dir = asset_dir + '.tmp'
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    os.makedirs(temp_dir)
+    graph = collab_graph.load_graph(read_sql)
+    for artist in artists:
+        artist_path = os.path.join(temp_dir, artist_dir(artist))
+        os.makedirs(artist_path)
+        graph_options = {'graph': collab_graph.catalog(graph, artist)}
+        for name, chart in app_charts.items():
+            options = graph_options if name in graph_charts else {}
+            fig = chart(read_sql, custom_params, artist=artist, **options)
+            for file_format in asset_formats:
+                charts.save_figure(fig, os.path.join(artist_path, '{}.{}'.format(name, file_format)))
+            spec = chart(read_sql, custom_params, chart_specs, artist, **options)
+            chart_specs.save_spec(spec, os.path.join(artist_path, '{}.json'.format(name)))
+    connection.close()
+
+    shutil.rmtree(asset_dir, ignore_errors=True)
+    os.replace(temp_dir, asset_dir)
+    if keep_old == False:
+        for old_dir in os.listdir(asset_root):
+            if old_dir != os.path.basename(asset_dir):
+                shutil.rmtree(os.path.join(asset_root, old_dir), ignore_errors=True)
+    return asset_dir
+
+if __name__ == '__main__':
+    print(build_assets())
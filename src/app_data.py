@@ -0,0 +1,180 @@
+"""Shared, cached database access for the Streamlit app pages."""
+
+import json
+import os
+import queue
+import sqlite3 as sql
+from urllib.request import pathname2url
+
+import pandas as pd
+import streamlit as st
+
+from . import app_charts
+from . import chart_specs
+from . import charts
+from . import collab_graph
+from . import db_storage
+from . import pandas_analytics
+from . import toolkit
+
+db_name = 'data/taylor_swift.db'
+pool_size = 4
+
+# 'matplotlib' serves PNGs, 'vega-lite' sends JSON specs the browser renders
+chart_backend = os.environ.get('APP_CHART_BACKEND', 'matplotlib')
+
+# 'sqlite' reads chart data from the database, 'pandas' computes it from the
+# discography in memory (see pandas_analytics)
+analytics_engine = os.environ.get('APP_ANALYTICS_ENGINE', 'sqlite')
+
+def db_version(db_file=db_name):
+    """Returns (modification time, size) of given database file.
+
+       Changes whenever convert_to_db swaps in a new database, so it is
+       used to key every cached connection and query result.
+    """
+    stat = os.stat(db_file)
+    return stat.st_mtime_ns, stat.st_size
+
+@st.cache_resource(max_entries=2)
+def connection_pool(db_file, version):
+    """Returns queue of read-only connections shared by every session.
+
+       Connections are opened in SQLite URI mode with mode=ro, so pages
+       can't modify the database. A new pool is made for each database
+       version since connections keep reading the file they were opened on.
+    """
+    uri = 'file:{}?mode=ro'.format(pathname2url(os.path.abspath(db_file)))
+    pool = queue.Queue()
+    for _ in range(pool_size):
+        pool.put(sql.connect(uri, uri=True, check_same_thread=False))
+    return pool
+
+@st.cache_data(max_entries=128)
+def cached_query(sql_text, db_file, version, params=None):
+    """Runs query on a pooled connection and returns a dataframe.
+
+       Cached on SQL text, database file, database version, and query
+       parameters.
+    """
+    pool = connection_pool(db_file, version)
+    connection = pool.get()
+    try:
+        df = pd.read_sql(sql_text, connection, params=params)
+    finally:
+        pool.put(connection)
+    return df
+
+def read_sql(sql_text, db_file=db_name, params=None):
+    """Returns results of given SQL query against the app database.
+
+       params fills the query's ? placeholders. Results are cached across
+       sessions until the database changes, so each page hits SQLite once
+       per query and data version.
+    """
+    return cached_query(sql_text, db_file, db_version(db_file), params)
+
+@st.cache_data(max_entries=2)
+def cached_build_info(db_file, version):
+    """Reads build_info once per database version."""
+    pool = connection_pool(db_file, version)
+    connection = pool.get()
+    try:
+        build_info = toolkit.db_build_info(connection)
+    finally:
+        pool.put(connection)
+    return build_info
+
+def build_info(db_file=db_name):
+    """Returns build_info of the app database as a dictionary."""
+    return cached_build_info(db_file, db_version(db_file))
+
+def check_analytics(db_file=db_name):
+    """Stops the page if the database lacks the current derived tables."""
+    if build_info(db_file).get('analytics_version') != toolkit.analytics_version:
+        st.error('La base de datos está desactualizada; vuelva a generarla con discog_mods.convert_to_db.')
+        st.stop()
+
+@st.cache_resource(max_entries=2)
+def cached_reader(db_file, version):
+    """Returns pandas_analytics.sql_reader of the discography, read once per database version."""
+    return pandas_analytics.sql_reader(db_storage.read_db(db_file, with_artist=True))
+
+def chart_reader(db_file=db_name, engine=None):
+    """Returns function the app_charts functions read their data with.
+
+       engine defaults to analytics_engine: 'sqlite' queries the database
+       (read_sql), 'pandas' computes the same results from the discography
+       dataframe without running the queries.
+    """
+    engine = analytics_engine if engine is None else engine
+    if engine == 'pandas':
+        return cached_reader(db_file, db_version(db_file))
+    return lambda sql_text, params=None: read_sql(sql_text, db_file, params)
+
+def artists(db_file=db_name):
+    """Returns list of the catalog artists in the app database."""
+    return read_sql('SELECT artist FROM catalogs ORDER BY catalog_id', db_file)['artist'].tolist()
+
+def select_artist(db_file=db_name):
+    """Returns the catalog artist the pages show.
+
+       Databases with several catalogs get a sidebar select box, kept in
+       st.session_state['artist'] across reruns; otherwise the only
+       catalog is returned. Defaults to toolkit.default_artist.
+    """
+    options = artists(db_file)
+    if len(options) < 2:
+        return options[0] if options else toolkit.default_artist
+    index = options.index(toolkit.default_artist) if toolkit.default_artist in options else 0
+    return st.sidebar.selectbox('Artista', options, index=index, key='artist')
+
+@st.cache_resource(max_entries=2)
+def cached_graph(db_file, version):
+    """Builds collab_graph of every catalog once per database version."""
+    return collab_graph.load_graph(chart_reader(db_file))
+
+@st.cache_resource(max_entries=8)
+def cached_catalog_graph(db_file, version, artist):
+    """Returns collab_graph of given artist's catalog, made once per database version."""
+    return collab_graph.catalog(cached_graph(db_file, version), artist)
+
+def draw_chart(name, custom_params, backend, artist, db_file=db_name):
+    """Returns given chart from app_charts, passing graph_charts the cached graph."""
+    options = {}
+    if name in app_charts.graph_charts:
+        options['graph'] = cached_catalog_graph(db_file, db_version(db_file), artist)
+    return app_charts.app_charts[name](chart_reader(db_file), custom_params, backend, artist, **options)
+
+@st.cache_data(max_entries=32)
+def cached_spec(name, db_file, version, artist=toolkit.default_artist):
+    """Builds Vega-Lite spec of given chart and catalog once per database version."""
+    return draw_chart(name, None, chart_specs, artist, db_file)
+
+def show_chart(name, custom_params, backend=None, artist=toolkit.default_artist):
+    """Shows given chart from app_charts for given catalog artist in the page.
+
+       With the matplotlib backend, serves the pre-rendered PNG for the
+       current data version when it exists, otherwise renders the chart
+       live from the database. With the vega-lite backend, sends the chart
+       as a Vega-Lite spec (pre-rendered JSON when it exists) for the
+       browser to draw. backend defaults to chart_backend.
+    """
+    backend = chart_backend if backend is None else backend
+    data_version = build_info().get('data_version', '')
+    if backend == 'vega-lite':
+        path = app_charts.asset_path(name, data_version, 'json', artist)
+        if os.path.exists(path):
+            with open(path, 'r') as file:
+                spec = json.load(file)
+        else:
+            spec = cached_spec(name, db_name, db_version(), artist)
+        st.vega_lite_chart(spec=spec, theme=None)
+        return
+
+    path = app_charts.asset_path(name, data_version, artist=artist)
+    if os.path.exists(path):
+        st.image(path)
+    else:
+        fig = draw_chart(name, custom_params, charts, artist)
+        st.pyplot(fig)
@@ -0,0 +1,102 @@
+"""Scrapes the discographies of several artists into one database.
+
+   A manifest CSV lists one catalog per row: the artist and the CSV files
+   the single-artist notebook uses for that artist (album list, and
+   optionally songs to drop, songs to add, and a cleaning rules file). Catalogs are scraped in a
+   pool of processes, each one fetching pages in its own thread pool, and
+   then loaded into one database with a catalogs table (one row per
+   artist) that every album references.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from . import discog_mods
+from . import fetcher
+from . import genius_scrape
+from . import page_cache
+
+manifest_columns = ['artist', 'album_list', 'songs_to_drop', 'songs_to_add', 'cleaning_rules']
+
+def read_manifest(csv_name):
+    """Returns list of catalog entries (dicts) from given manifest CSV.
+
+       The CSV needs artist and album_list columns; songs_to_drop,
+       songs_to_add, and cleaning_rules (see
+       discog_mods.read_cleaning_rules) are optional, and empty cells skip
+       that step.
+    """
+    manifest = pd.read_csv(csv_name, dtype=str, keep_default_na=False)
+    missing = [column for column in ['artist', 'album_list'] if column not in manifest.columns]
+    if missing != []:
+        raise KeyError('Manifest {} is missing columns: {}'.format(csv_name, ', '.join(missing)))
+    manifest = manifest.reindex(columns=manifest_columns, fill_value='')
+    if manifest['artist'].duplicated().any():
+        raise ValueError('Manifest {} lists an artist more than once'.format(csv_name))
+    return manifest.to_dict('records')
+
+def _init_worker(requests_per_second, cache_options):
+    # Every process has its own rate limiter and cache settings
+    fetcher.set_rate_limit(requests_per_second)
+    page_cache.configure(**cache_options)
+
+def ingest_catalog(entry, max_workers=4):
+    """Scrapes one manifest entry into a discography dataframe.
+
+       Runs the same steps as the data collection notebook for the
+       entry's artist and adds an artist column as the first column. The
+       cleaning rules file runs after songs_to_drop and songs_to_add.
+    """
+    albums = genius_scrape.create_dict_from_file(entry['album_list'])
+    df = genius_scrape.create_discography(entry['artist'], albums, max_workers)
+    if entry.get('songs_to_drop'):
+        df = discog_mods.drop_songs_from_file(df, entry['songs_to_drop'], drop_duplicates=True)
+    if entry.get('songs_to_add'):
+        df = discog_mods.add_songs_from_file(df, entry['songs_to_add'], max_workers)
+    if entry.get('cleaning_rules'):
+        df = discog_mods.apply_cleaning_rules(df, entry['cleaning_rules'], max_workers)
+    df = df.reset_index(drop=True)
+    df.insert(0, 'artist', entry['artist'])
+    return df
+
+def ingest_catalogs(manifest, processes=4, max_workers=4, requests_per_second=10):
+    """Scrapes every catalog in manifest into one discography dataframe.
+
+       Args:
+           manifest: str (manifest CSV) or list of entries from read_manifest
+           processes: int, default 4, catalogs scraped at the same time;
+                      1 scrapes them one after another in this process
+           max_workers: int, default 4, threads fetching pages per catalog
+           requests_per_second: float, default 10, total requests per host
+                                for all processes, split evenly among them
+
+       Rows keep the order of the manifest, whatever order catalogs finish in.
+    """
+    if isinstance(manifest, str):
+        manifest = read_manifest(manifest)
+    processes = max(1, min(processes, len(manifest)))
+
+    rate = requests_per_second / processes if requests_per_second else requests_per_second
+    if processes == 1:
+        # Scraping in this process, so the caller's rate limit is put back afterwards
+        with fetcher.rate_limited(rate):
+            frames = [ingest_catalog(entry, max_workers) for entry in manifest]
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(rate, dict(page_cache.settings))) as executor:
+            frames = list(executor.map(ingest_catalog, manifest, [max_workers] * len(manifest)))
+
+    if frames == []:
+        return pd.DataFrame(columns=['artist'] + genius_scrape.discography_columns)
+    return pd.concat(frames, ignore_index=True)
+
+def build_catalog_db(manifest, db_name, processes=4, max_workers=4, requests_per_second=10):
+    """Scrapes every catalog in manifest and converts them to one SQLite database.
+
+       See ingest_catalogs for the arguments. Returns the discography
+       dataframe that was loaded.
+    """
+    df = ingest_catalogs(manifest, processes, max_workers, requests_per_second)
+    discog_mods.convert_to_db(df, db_name)
+    return df
@@ -0,0 +1,327 @@
+"""Builds charts as Vega-Lite specifications.
+
+   Alternate backend for the functions in charts.py: same names and
+   arguments, but each returns a Vega-Lite spec (a JSON-ready dict with
+   the data inlined) instead of a matplotlib Figure. The browser renders
+   the spec (e.g. with st.vega_lite_chart), so the server only builds and
+   ships JSON. custom_params is accepted for compatibility and ignored.
+"""
+
+import json
+import os
+
+vega_lite_schema = 'https://vega.github.io/schema/vega-lite/v5.json'
+
+background = '#EDECE8'
+
+config = {'background': background,
+          'font': 'Lato',
+          'view': {'stroke': None},
+          'title': {'fontWeight': 'bold', 'fontSize': 16, 'anchor': 'middle'},
+          'axis': {'titleFontWeight': 'bold', 'grid': False, 'ticks': True},
+          'legend': {'titleFontWeight': 'bold'}}
+
+# Axis labels in millions, like the ticker formatters in charts.py
+millions_axis = {'labelExpr': "format(datum.value / 1000000, '.0f') + 'M'"}
+
+def records(df):
+    """Returns rows of given dataframe as JSON-safe dictionaries."""
+    return json.loads(df.to_json(orient='records', date_format='iso'))
+
+def sort_order(df, column):
+    """Returns category order of given column, or None if it isn't categorical."""
+    if hasattr(df[column], 'cat'):
+        return [str(category) for category in df[column].cat.categories]
+    return None
+
+def chart_spec(title, body, width=None, height=None):
+    """Wraps given Vega-Lite view/composition in a top-level spec."""
+    spec = {'$schema': vega_lite_schema,
+            'title': title,
+            'config': config}
+    if width is not None:
+        spec['width'] = width
+    if height is not None:
+        spec['height'] = height
+    spec.update(body)
+    return spec
+
+def table_spec(table_df, columns=None, row_colors=None, index_title=None):
+    """Builds a simple values table as a grid of text marks.
+
+       Args:
+           table_df: formatted df, shown like the matplotlib chart tables
+           columns: list, default None, column labels (defaults to table_df's)
+           row_colors: list, default None, colors for row labels
+           index_title: str, default None, header of the index column;
+                        None leaves the index out
+    """
+    columns = [str(column) for column in (columns or table_df.columns)]
+    cells = []
+    for row, (index, values) in enumerate(zip(table_df.index, table_df.values)):
+        if index_title is not None:
+            color = row_colors[row] if row_colors else 'black'
+            cells.append({'row': row, 'column': index_title, 'value': str(index), 'color': color})
+        for column, value in zip(columns, values):
+            cells.append({'row': row, 'column': column, 'value': str(value), 'color': 'black'})
+    column_order = ([index_title] if index_title is not None else []) + columns
+    return {'data': {'values': cells},
+            'mark': {'type': 'text', 'fontSize': 11},
+            'encoding': {'x': {'field': 'column', 'type': 'nominal', 'sort': column_order,
+                               'axis': {'orient': 'top', 'title': None, 'labelAngle': 0,
+                                        'labelFontWeight': 'bold', 'domain': False, 'ticks': False}},
+                         'y': {'field': 'row', 'type': 'ordinal', 'axis': None},
+                         'text': {'field': 'value'},
+                         'color': {'field': 'color', 'type': 'nominal', 'scale': None}}}
+
+def save_spec(spec, output):
+    """Saves spec as JSON to given output.
+
+       Args:
+           spec: dict, Vega-Lite spec
+           output: None (nothing is saved), file path, or text file-like
+                   object such as io.StringIO
+    """
+    if output is None:
+        return
+    if hasattr(output, 'write'):
+        json.dump(spec, output)
+    else:
+        with open(output, 'w') as file:
+            json.dump(spec, file)
+
+def _save(spec, save_png, png_name, output):
+    if save_png == True:
+        output = 'figures/charts/{}.json'.format(os.path.splitext(png_name)[0])
+    save_spec(spec, output)
+
+def credit_chart(color_dict, custom_params, plot_type, df, x_values, y_values,
+                 hues, avg_series, title, x_label, y_label, legend_title, rotate_x,
+                 save_png=False, png_name=None, table_bool=False, table_df=None, output=None):
+    """Build musician credit chart spec based on given arguments.
+
+       Args match charts.credit_chart; save_png writes the spec as JSON
+       next to where the PNG would go. Returns (spec, None).
+    """
+    color = {'field': hues, 'type': 'nominal', 'title': legend_title,
+             'scale': {'domain': list(color_dict.keys()), 'range': list(color_dict.values())}}
+    x = {'field': x_values, 'type': 'nominal', 'sort': sort_order(df, x_values), 'title': x_label,
+         'axis': {'labelAngle': -20 if rotate_x == True else 0}}
+    y = {'field': y_values, 'type': 'quantitative', 'title': y_label}
+
+    if plot_type == 'bar':
+        main = {'mark': 'bar', 'encoding': {'x': x, 'y': y, 'color': color, 'xOffset': {'field': hues}}}
+    else:
+        main = {'mark': {'type': 'line', 'point': True}, 'encoding': {'x': x, 'y': y, 'color': color}}
+    main['data'] = {'values': records(df)}
+
+    averages = [{hues: collab_type, 'avg': avg} for collab_type, avg in avg_series.items()]
+    avg_lines = {'data': {'values': averages},
+                 'mark': {'type': 'rule', 'strokeDash': [6, 4], 'opacity': 0.5},
+                 'encoding': {'y': {'field': 'avg', 'type': 'quantitative'}, 'color': color}}
+
+    body = {'layer': [main, avg_lines], 'width': 900, 'height': 280}
+    if table_bool == True:
+        table = table_spec(table_df, row_colors=list(color_dict.values()), index_title=legend_title)
+        table.update({'width': 900, 'height': 20 * len(table_df)})
+        body = {'vconcat': [body, table]}
+    spec = chart_spec(title, body)
+
+    _save(spec, save_png, png_name, output)
+    return spec, None
+
+def collab_heatmap(custom_params, df, x_values, y_values, value_field, aggfunc, title, x_label, y_label,
+                   rotate_x, save_png=False, png_name=None, table_bool=False, table_df=None, output=None):
+    """Build collaborator heatmap spec based on given arguments.
+
+       Args match charts.collab_heatmap. Returns (spec, None).
+    """
+    df_pivot = df.pivot_table(index=y_values, columns=x_values, values=value_field, fill_value=0,
+                              aggfunc=aggfunc, observed=False)
+    df_pivot.sort_values(y_values, inplace=True)
+    df_cells = df_pivot.reset_index().melt(id_vars=y_values, value_name=value_field)
+    df_cells[x_values] = df_cells[x_values].astype(str)
+
+    encoding = {'x': {'field': x_values, 'type': 'nominal', 'sort': [str(x) for x in df_pivot.columns],
+                      'title': x_label, 'axis': {'labelAngle': -40 if rotate_x == True else 0}},
+                'y': {'field': y_values, 'type': 'nominal', 'sort': list(df_pivot.index), 'title': y_label}}
+    heatmap = {'data': {'values': records(df_cells)},
+               'encoding': encoding,
+               'layer': [{'mark': {'type': 'rect', 'stroke': '#FFFFFF', 'strokeWidth': 1.5},
+                          'encoding': {'color': {'field': value_field, 'type': 'quantitative',
+                                                 'scale': {'scheme': 'purplered'}, 'legend': None}}},
+                         {'mark': 'text',
+                          'encoding': {'text': {'field': value_field, 'type': 'quantitative'},
+                                       'color': {'condition': {'test': 'datum.{} > {}'.format(value_field, df_cells[value_field].max() / 2),
+                                                               'value': 'white'},
+                                                 'value': 'black'}}}],
+               'width': 800, 'height': 25 * len(df_pivot)}
+
+    body = heatmap
+    if table_bool == True:
+        table = table_spec(table_df, columns=['Totals'])
+        table.update({'width': 60, 'height': 25 * len(df_pivot)})
+        body = {'hconcat': [heatmap, table]}
+    spec = chart_spec(title, body)
+
+    _save(spec, save_png, png_name, output)
+    return spec, None
+
+def formats_pie(custom_params, df, wedge_values, wedge_labels, title, colors_list,
+                save_png=False, png_name=None, table_bool=False, table_df=None, output=None):
+    """Build release formats pie chart spec based on given arguments.
+
+       Args match charts.formats_pie. Returns (spec, None).
+    """
+    pie = {'data': {'values': records(df)},
+           'transform': [{'joinaggregate': [{'op': 'sum', 'field': wedge_values, 'as': 'total'}]},
+                         {'calculate': 'datum.{} / datum.total'.format(wedge_values), 'as': 'share'}],
+           'encoding': {'theta': {'field': wedge_values, 'type': 'quantitative', 'stack': True},
+                        'color': {'field': wedge_labels, 'type': 'nominal', 'legend': None,
+                                  'scale': {'domain': list(df[wedge_labels]), 'range': colors_list}}},
+           'layer': [{'mark': {'type': 'arc', 'stroke': '#132a13'}},
+                     {'mark': {'type': 'text', 'radius': 90, 'fontSize': 11},
+                      'encoding': {'text': {'field': 'share', 'type': 'quantitative', 'format': '.1%'},
+                                   'color': {'value': 'black'}}}],
+           'width': 300, 'height': 300}
+
+    body = pie
+    if table_bool == True:
+        table = table_spec(table_df, columns=['For', 'Songs Released'])
+        table.update({'width': 300, 'height': 25 * len(table_df)})
+        body = {'hconcat': [pie, table]}
+    spec = chart_spec(title, body)
+
+    _save(spec, save_png, png_name, output)
+    return spec, None
+
+def _count_bars(x_values, title, x_label, y_label, color, edgecolor):
+    return {'title': title,
+            'encoding': {'x': {'field': x_values, 'type': 'ordinal', 'title': x_label, 'axis': {'labelAngle': 0}},
+                         'y': {'aggregate': 'count', 'type': 'quantitative', 'title': y_label}},
+            'layer': [{'mark': {'type': 'bar', 'color': color, 'stroke': edgecolor}},
+                      {'mark': {'type': 'text', 'dy': -6, 'fontSize': 8, 'fontWeight': 'bold'},
+                       'encoding': {'text': {'aggregate': 'count', 'type': 'quantitative'}}}],
+            'width': 300, 'height': 300}
+
+def release_hist(custom_params, df, x1_values, x2_values, x3_values, suptitle, title1, title2, title3,
+                 x1_label, x2_label, x3_label, y_label, colors_list, edgecolors_list, save_png=False, png_name=None, output=None):
+    """Build spec of three release histograms based on given arguments.
+
+       Args match charts.release_hist. Returns (spec, None).
+    """
+    body = {'data': {'values': records(df[[x1_values, x2_values, x3_values]])},
+            'hconcat': [_count_bars(x1_values, title1, x1_label, y_label, colors_list[0], edgecolors_list[0]),
+                        _count_bars(x2_values, title2, x2_label, None, colors_list[1], edgecolors_list[0]),
+                        _count_bars(x3_values, title3, x3_label, None, colors_list[2], edgecolors_list[0])],
+            'resolve': {'scale': {'y': 'shared'}}}
+    spec = chart_spec(suptitle, body)
+
+    _save(spec, save_png, png_name, output)
+    return spec, None
+
+def date_scatter(custom_params, df, x_values, y_values, size_values, title, x_label,
+                 y_label, save_png=False, png_name=None, table_bool=False, table_df=None, output=None):
+    """Build release date scatter plot spec based on given arguments.
+
+       Args match charts.date_scatter. Returns (spec, None).
+    """
+    scatter = {'data': {'values': records(df)},
+               'mark': {'type': 'point', 'shape': 'diamond', 'filled': True, 'stroke': '#0d1b2a', 'strokeWidth': 0.5},
+               'encoding': {'x': {'field': x_values, 'type': 'quantitative', 'title': x_label},
+                            'y': {'field': y_values, 'type': 'quantitative', 'title': y_label},
+                            'size': {'field': size_values, 'type': 'quantitative', 'legend': None},
+                            'color': {'field': size_values, 'type': 'quantitative', 'legend': None,
+                                      'scale': {'scheme': 'yelloworangered'}},
+                            'tooltip': [{'field': x_values}, {'field': y_values}, {'field': size_values}]},
+               'width': 400, 'height': 350}
+
+    body = scatter
+    if table_bool == True:
+        table = table_spec(table_df, columns=['Date', 'Songs Released'])
+        table.update({'title': 'Top 10', 'width': 160, 'height': 25 * len(table_df)})
+        body = {'hconcat': [scatter, table]}
+    spec = chart_spec(title, body)
+
+    _save(spec, save_png, png_name, output)
+    return spec, None
+
+def views_plots(custom_params, bar_df, barx_values, bary_values, hist_df, histx_values, suptitle, title1, title2,
+                 x1_label, x2_label, y1_label, y2_label, colors_list, edgecolors_list, save_png=False, png_name=None, output=None):
+    """Build spec of page views per era and page view histogram.
+
+       Args match charts.views_plots. Returns (spec, None).
+    """
+    bars = {'title': title1,
+            'data': {'values': records(bar_df)},
+            'encoding': {'y': {'field': bary_values, 'type': 'nominal', 'sort': sort_order(bar_df, bary_values),
+                               'title': y1_label},
+                         'x': {'field': barx_values, 'type': 'quantitative', 'title': x1_label, 'axis': millions_axis}},
+            'layer': [{'mark': {'type': 'bar', 'color': colors_list[0], 'stroke': edgecolors_list[0]}},
+                      {'mark': {'type': 'text', 'align': 'left', 'dx': 3, 'fontSize': 9, 'fontWeight': 'bold'},
+                       'encoding': {'text': {'field': 'label'}},
+                       'transform': [{'calculate': "format(datum.{} / 1000000, '.2f') + 'M'".format(barx_values),
+                                      'as': 'label'}]}],
+            'width': 450, 'height': 350}
+    hist = {'title': title2,
+            'data': {'values': records(hist_df[[histx_values]])},
+            'mark': {'type': 'bar', 'color': colors_list[1], 'stroke': edgecolors_list[1]},
+            'encoding': {'x': {'field': histx_values, 'bin': {'maxbins': 30}, 'title': x2_label, 'axis': millions_axis},
+                         'y': {'aggregate': 'count', 'type': 'quantitative', 'title': y2_label}},
+            'width': 300, 'height': 350}
+    spec = chart_spec(suptitle, {'hconcat': [bars, hist]})
+
+    _save(spec, save_png, png_name, output)
+    return spec, None
+
+def views_box(custom_params, df, x_values, y_values, title, x_label, y_label, boxcolor, linecolor, save_png=False, png_name=None, output=None):
+    """Build spec of page view box plots based on given arguments.
+
+       Args match charts.views_box. Returns (spec, None).
+    """
+    body = {'data': {'values': records(df[[x_values, y_values]])},
+            'mark': {'type': 'boxplot', 'color': boxcolor,
+                     'median': {'color': linecolor}, 'rule': {'color': linecolor},
+                     'outliers': {'shape': 'diamond', 'color': linecolor, 'size': 10}},
+            'encoding': {'x': {'field': x_values, 'type': 'quantitative', 'title': x_label, 'axis': millions_axis},
+                         'y': {'field': y_values, 'type': 'nominal', 'sort': sort_order(df, y_values), 'title': y_label}},
+            'width': 900, 'height': 400}
+    spec = chart_spec(title, body)
+
+    _save(spec, save_png, png_name, output)
+    return spec, None
+
+def collab_network(custom_params, nodes_df, edges_df, node_labels, node_values, edge_values, title,
+                   node_color, edge_color, save_png=False, png_name=None, output=None):
+    """Build collaborator network spec based on given arguments.
+
+       Args match charts.collab_network. Returns (spec, None).
+    """
+    scale = {'domain': [-1.4, 1.4]}
+    x = {'field': 'x', 'type': 'quantitative', 'scale': scale, 'axis': None}
+    y = {'field': 'y', 'type': 'quantitative', 'scale': scale, 'axis': None}
+    edges = {'data': {'values': records(edges_df)},
+             'mark': {'type': 'rule', 'color': edge_color, 'opacity': 0.45},
+             'encoding': {'x': x, 'y': y, 'x2': {'field': 'x2'}, 'y2': {'field': 'y2'},
+                          'strokeWidth': {'field': edge_values, 'type': 'quantitative', 'legend': None,
+                                          'scale': {'range': [0.5, 7.5]}},
+                          'tooltip': [{'field': 'source'}, {'field': 'target'}, {'field': edge_values}]}}
+    nodes = {'data': {'values': records(nodes_df)},
+             'encoding': {'x': x, 'y': y},
+             'layer': [{'mark': {'type': 'circle', 'color': node_color, 'stroke': '#2c0735', 'opacity': 1},
+                        'encoding': {'size': {'field': node_values, 'type': 'quantitative', 'legend': None,
+                                              'scale': {'range': [200, 3000]}},
+                                     'tooltip': [{'field': node_labels}, {'field': node_values}]}},
+                       {'mark': {'type': 'text', 'fontWeight': 'bold', 'fontSize': 11},
+                        'encoding': {'x': {'field': 'label_x', 'type': 'quantitative', 'scale': scale, 'axis': None},
+                                     'y': {'field': 'label_y', 'type': 'quantitative', 'scale': scale, 'axis': None},
+                                     'text': {'field': node_labels}},
+                        'transform': [{'joinaggregate': [{'op': 'max', 'field': node_values, 'as': 'max_value'}]},
+                                      {'calculate': '1.12 + 0.12 * datum.{} / datum.max_value'.format(node_values),
+                                       'as': 'offset'},
+                                      {'calculate': 'datum.x * datum.offset', 'as': 'label_x'},
+                                      {'calculate': 'datum.y * datum.offset', 'as': 'label_y'}]}]}
+    spec = chart_spec(title, {'layer': [edges, nodes], 'width': 650, 'height': 650})
+
+    _save(spec, save_png, png_name, output)
+    return spec, None
@@ -1,13 +1,60 @@
-"""Builds charts in seaborn/matplotlib."""
+"""Builds charts in seaborn/matplotlib.
 
-import matplotlib.pyplot as plt
+   Charts are built as object-oriented Figures, not through pyplot, and
+   styled inside render_context, which restores every rcParam afterwards
+   and holds a lock so concurrent sessions don't race on matplotlib's
+   global settings. Nothing is written to disk unless an output is given.
+"""
+
+import threading
+from contextlib import contextmanager
+
+import matplotlib as mpl
 import seaborn as sns
 from matplotlib import ticker
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
 from matplotlib.font_manager import FontProperties
 
+_render_lock = threading.RLock()
+
+@contextmanager
+def render_context(custom_params, font_scale=1):
+    """Applies the chart theme for the duration of the with block.
+
+       The theme is set with sns.set_theme inside matplotlib.rc_context, so
+       rcParams go back to how they were on exit.
+    """
+    with _render_lock, mpl.rc_context():
+        sns.set_theme(style='white', rc=custom_params, font_scale=font_scale)
+        yield
+
+def new_figure(nrows=1, ncols=1, figsize=None, **kwargs):
+    """Returns new Figure and its axes like plt.subplots, without pyplot."""
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots(nrows, ncols, **kwargs)
+    return fig, ax
+
+def save_figure(fig, output, file_format=None):
+    """Saves figure to given output.
+
+       Args:
+           fig: matplotlib Figure
+           output: None (nothing is saved), file path, or binary file-like
+                   object such as io.BytesIO
+           file_format: str, default None, e.g. 'png' or 'svg'; inferred from
+                        the file name, PNG for file-like objects
+    """
+    if output is None:
+        return
+    if file_format is None and hasattr(output, 'write'):
+        file_format = 'png'
+    with _render_lock:
+        fig.savefig(output, format=file_format, bbox_inches='tight')
+
 def credit_chart(color_dict, custom_params, plot_type, df, x_values, y_values, 
                  hues, avg_series, title, x_label, y_label, legend_title, rotate_x, 
-                 save_png=False, png_name=None, table_bool=False, table_df=None):
+                 save_png=False, png_name=None, table_bool=False, table_df=None, output=None):
     """Build musician credit chart based on given arguments.
 
        Args:
@@ -28,55 +75,57 @@ def credit_chart(color_dict, custom_params, plot_type, df, x_values, y_values,
            png_name: str, default None, image name (must include .png)
            table_bool: bool, default False, includes values table
            table_df: formatted df, default None, needed for table 
+           output: default None, file path or buffer to save chart to (see save_figure)
     """
-    palette = sns.color_palette(color_dict.values())
-    sns.set_theme(style='white', rc=custom_params)
-    fig, ax = plt.subplots(figsize=(17, 5))
-    fig.patch.set_facecolor('#EDECE8')
+    with render_context(custom_params):
+        palette = sns.color_palette(color_dict.values())
+        fig, ax = new_figure(figsize=(17, 5))
+        fig.patch.set_facecolor('#EDECE8')
     
-    bbox_tup = ()
-    match plot_type:
-        case 'bar':
-            bbox_tup = (0, -0.4, 1, 0.2)
-        case 'line':
-            bbox_tup = (0.018, -0.4, .97, 0.2)
+        bbox_tup = ()
+        match plot_type:
+            case 'bar':
+                bbox_tup = (0, -0.4, 1, 0.2)
+            case 'line':
+                bbox_tup = (0.018, -0.4, .97, 0.2)
     
-    # Creating barplot and drawing average lines
-    if plot_type == 'bar':
-        sns.barplot(data=df, x=x_values, y=y_values, hue=hues, errorbar=None, ax=ax, palette=palette)
-    elif plot_type == 'line':
-        sns.lineplot(data=df, x=x_values, y=y_values, hue=hues, style=hues, 
-                 markers=True, dashes=False, ax=ax, palette=palette)
+        # Creating barplot and drawing average lines
+        if plot_type == 'bar':
+            sns.barplot(data=df, x=x_values, y=y_values, hue=hues, errorbar=None, ax=ax, palette=palette)
+        elif plot_type == 'line':
+            sns.lineplot(data=df, x=x_values, y=y_values, hue=hues, style=hues, 
+                     markers=True, dashes=False, ax=ax, palette=palette)
         
-    for (collab_type, avg) in avg_series.items():
-        ax.axhline(y=avg, color=color_dict[collab_type], linestyle='--', 
-                    label='{} (avg)'.format(collab_type), alpha=0.5)
-
-    if table_bool == True:
-        ax.table(cellText=table_df.values, cellLoc='center', 
-                  rowLabels=table_df.index, rowColours=list(color_dict.values()),
-                  bbox=bbox_tup)
-        ax.set_xlabel(x_label, fontweight='bold', fontsize='medium',
-               labelpad=80)
-    else:
-        ax.set_xlabel(x_label, fontweight='bold', fontsize='medium',
-               labelpad=5.5)
+        for (collab_type, avg) in avg_series.items():
+            ax.axhline(y=avg, color=color_dict[collab_type], linestyle='--', 
+                        label='{} (avg)'.format(collab_type), alpha=0.5)
+
+        if table_bool == True:
+            ax.table(cellText=table_df.values, cellLoc='center', 
+                      rowLabels=table_df.index, rowColours=list(color_dict.values()),
+                      bbox=bbox_tup)
+            ax.set_xlabel(x_label, fontweight='bold', fontsize='medium',
+                   labelpad=80)
+        else:
+            ax.set_xlabel(x_label, fontweight='bold', fontsize='medium',
+                   labelpad=5.5)
     
-    ax.set_title(title, 
-              fontweight='bold', fontsize='x-large')
-    ax.set_ylabel(y_label, fontweight='bold', fontsize='medium', 
-               labelpad=5.5)
-    ax.legend(title=legend_title)
-    if rotate_x == True:
-        ax.tick_params(axis='x', labelrotation=20)
+        ax.set_title(title, 
+                  fontweight='bold', fontsize='x-large')
+        ax.set_ylabel(y_label, fontweight='bold', fontsize='medium', 
+                   labelpad=5.5)
+        ax.legend(title=legend_title)
+        if rotate_x == True:
+            ax.tick_params(axis='x', labelrotation=20)
 
-    if save_png == True:
-        fig.savefig('figures/charts/{}'.format(png_name), bbox_inches='tight')
+        if save_png == True:
+            output = 'figures/charts/{}'.format(png_name)
+        save_figure(fig, output)
 
     return fig, ax
 
 def collab_heatmap(custom_params, df, x_values, y_values, value_field, aggfunc, title, x_label, y_label, 
-                   rotate_x, save_png=False, png_name=None, table_bool=False, table_df=None):
+                   rotate_x, save_png=False, png_name=None, table_bool=False, table_df=None, output=None):
     """Build collaborator heatmap based on given arguments.
 
        Args:
@@ -94,41 +143,43 @@ def collab_heatmap(custom_params, df, x_values, y_values, value_field, aggfunc,
            png_name: str, default None, image name (must include .png)
            table_bool: bool, default False, includes values table
            table_df: formatted df, default None, needed for table 
+           output: default None, file path or buffer to save chart to (see save_figure)
     """
-    sns.set_theme(style='white', rc=custom_params)
-    fig, ax = plt.subplots(figsize=(17, 10))
-    fig.patch.set_facecolor('#EDECE8')
+    with render_context(custom_params):
+        fig, ax = new_figure(figsize=(17, 10))
+        fig.patch.set_facecolor('#EDECE8')
 
-    df_pivot = df.pivot_table(index=y_values, columns=x_values, values=value_field, fill_value=0, 
-                              aggfunc=aggfunc, observed=False)
-    df_pivot.sort_values(y_values, inplace=True)
+        df_pivot = df.pivot_table(index=y_values, columns=x_values, values=value_field, fill_value=0, 
+                                  aggfunc=aggfunc, observed=False)
+        df_pivot.sort_values(y_values, inplace=True)
     
-    sns.heatmap(df_pivot, annot=True, linewidths=1.5, linecolor='#FFFFFF', ax=ax, cmap='PuRd', cbar=False)
-
-    if table_bool == True:
-        table = ax.table(cellText=table_df.values, cellLoc='center', 
-                  colLabels=['Totals'], edges='vertical',
-                  bbox=(1.01, 0.003, 0.06, 1.08))
-        for (row, col), cell in table.get_celld().items():
-            if (row == 0):
-                cell.set_text_props(fontproperties=FontProperties(weight='bold'))
+        sns.heatmap(df_pivot, annot=True, linewidths=1.5, linecolor='#FFFFFF', ax=ax, cmap='PuRd', cbar=False)
+
+        if table_bool == True:
+            table = ax.table(cellText=table_df.values, cellLoc='center', 
+                      colLabels=['Totals'], edges='vertical',
+                      bbox=(1.01, 0.003, 0.06, 1.08))
+            for (row, col), cell in table.get_celld().items():
+                if (row == 0):
+                    cell.set_text_props(fontproperties=FontProperties(weight='bold'))
         
-    ax.set_title(title, 
-              fontweight='bold', fontsize='x-large')
-    ax.set_xlabel(x_label, fontweight='bold', fontsize='medium',
-               labelpad=5.5)
-    ax.set_ylabel(y_label, fontweight='bold', fontsize='medium', 
-               labelpad=5.5)
-    if rotate_x == True:
-        ax.tick_params(axis='x', labelrotation=40)
+        ax.set_title(title, 
+                  fontweight='bold', fontsize='x-large')
+        ax.set_xlabel(x_label, fontweight='bold', fontsize='medium',
+                   labelpad=5.5)
+        ax.set_ylabel(y_label, fontweight='bold', fontsize='medium', 
+                   labelpad=5.5)
+        if rotate_x == True:
+            ax.tick_params(axis='x', labelrotation=40)
 
-    if save_png == True:
-        plt.savefig('figures/charts/{}'.format(png_name), bbox_inches='tight')
+        if save_png == True:
+            output = 'figures/charts/{}'.format(png_name)
+        save_figure(fig, output)
 
     return fig, ax
 
 def formats_pie(custom_params, df, wedge_values, wedge_labels, title, colors_list, 
-                save_png=False, png_name=None, table_bool=False, table_df=None):
+                save_png=False, png_name=None, table_bool=False, table_df=None, output=None):
     """Build collaborator heatmap based on given arguments.
 
        Args:
@@ -142,33 +193,36 @@ def formats_pie(custom_params, df, wedge_values, wedge_labels, title, colors_lis
            png_name: str, default None, image name (must include .png)
            table_bool: bool, default False, includes values table
            table_df: formatted df, default None, needed for table 
+           output: default None, file path or buffer to save chart to (see save_figure)
     """
-    sns.set_theme(style='white', rc=custom_params)
-    fig, ax = plt.subplots(figsize=(17, 5))
-    fig.patch.set_facecolor('#EDECE8')
-    ax.pie(df[wedge_values], autopct='%1.1f%%', colors=colors_list, 
-           wedgeprops={"edgecolor":"#132a13"}, textprops={"fontsize":9})
-    ax.set_title(title, fontweight='bold', fontsize='large', x=0.77)
-    if table_bool == True:
-        colors = []
-        for i, color in enumerate(colors_list):
-            row_color = [colors_list[i], 'white']
-            colors.append(row_color)
+    with render_context(custom_params):
+        fig, ax = new_figure(figsize=(17, 5))
+        fig.patch.set_facecolor('#EDECE8')
+        ax.pie(df[wedge_values], autopct='%1.1f%%', colors=colors_list, 
+               wedgeprops={"edgecolor":"#132a13"}, textprops={"fontsize":9})
+        ax.set_title(title, fontweight='bold', fontsize='large', x=0.77)
+        if table_bool == True:
+            # One row color per format in table_df, catalogs may lack some formats
+            colors = []
+            for color in colors_list[:len(table_df)]:
+                row_color = [color, 'white']
+                colors.append(row_color)
             
-        table = ax.table(cellText=table_df.values, cellLoc='center', colLabels=['For', 'Songs Released'],
-                  cellColours=colors, bbox=(1, 0.35, 0.5, 0.3))
-        for (row, col), cell in table.get_celld().items():
-            cell.set_text_props(fontproperties=FontProperties(size='large'))
-            if (row == 0):
-                cell.set_text_props(fontproperties=FontProperties(weight='bold'))
+            table = ax.table(cellText=table_df.values, cellLoc='center', colLabels=['For', 'Songs Released'],
+                      cellColours=colors, bbox=(1, 0.35, 0.5, 0.3))
+            for (row, col), cell in table.get_celld().items():
+                cell.set_text_props(fontproperties=FontProperties(size='large'))
+                if (row == 0):
+                    cell.set_text_props(fontproperties=FontProperties(weight='bold'))
                 
-    if save_png == True:
-        plt.savefig('figures/charts/{}'.format(png_name), bbox_inches='tight')
+        if save_png == True:
+            output = 'figures/charts/{}'.format(png_name)
+        save_figure(fig, output)
 
     return fig, ax
 
 def release_hist(custom_params, df, x1_values, x2_values, x3_values, suptitle, title1, title2, title3, 
-                 x1_label, x2_label, x3_label, y_label, colors_list, edgecolors_list, save_png=False, png_name=None):
+                 x1_label, x2_label, x3_label, y_label, colors_list, edgecolors_list, save_png=False, png_name=None, output=None):
     """Build three release histograms based on given arguments.
 
        Args:
@@ -189,46 +243,48 @@ def release_hist(custom_params, df, x1_values, x2_values, x3_values, suptitle, t
            edgecolors_list: list, edgecolors for three histograms
            save_png: bool, default False, saves chart to png
            png_name: str, default None, image name (must include .png)
+           output: default None, file path or buffer to save chart to (see save_figure)
     """
-    sns.set_theme(style='white', rc=custom_params)
-    fig, ax = plt.subplots(1, 3, figsize=(16, 6), sharey=True)
-    fig.patch.set_facecolor('#EDECE8')
-    fig.suptitle(suptitle, fontweight='bold', fontsize='x-large')
-    sns.histplot(df, x=x1_values, discrete=True, color=colors_list[0], edgecolor=edgecolors_list[0], alpha = 1, ax=ax[0], shrink=.8)
-    first_ticks = [one for one in range(min(df[x1_values]), max(df[x1_values])+1, 3)]
-    ax[0].set_xticks(first_ticks)
-    ax[0].set_title(title1, fontweight='bold', fontsize='medium')
-    ax[0].set_xlabel(x1_label, fontweight='bold', fontsize='medium',
-               labelpad=5.5)
-    ax[0].set_ylabel(y_label, fontweight='bold', fontsize='medium')
-    for c in ax[0].containers:
-        ax[0].bar_label(c, fontweight='bold', fontsize=6)
+    with render_context(custom_params):
+        fig, ax = new_figure(1, 3, figsize=(16, 6), sharey=True)
+        fig.patch.set_facecolor('#EDECE8')
+        fig.suptitle(suptitle, fontweight='bold', fontsize='x-large')
+        sns.histplot(df, x=x1_values, discrete=True, color=colors_list[0], edgecolor=edgecolors_list[0], alpha = 1, ax=ax[0], shrink=.8)
+        first_ticks = [one for one in range(min(df[x1_values]), max(df[x1_values])+1, 3)]
+        ax[0].set_xticks(first_ticks)
+        ax[0].set_title(title1, fontweight='bold', fontsize='medium')
+        ax[0].set_xlabel(x1_label, fontweight='bold', fontsize='medium',
+                   labelpad=5.5)
+        ax[0].set_ylabel(y_label, fontweight='bold', fontsize='medium')
+        for c in ax[0].containers:
+            ax[0].bar_label(c, fontweight='bold', fontsize=6)
     
-    sns.histplot(df, x=x2_values, discrete=True, color=colors_list[1], edgecolor=edgecolors_list[0], alpha = 1, ax=ax[1], shrink=.8)
-    second_ticks = [two for two in range(min(df[x2_values]), max(df[x2_values])+1, 3)]
-    ax[1].set_xticks(second_ticks)
-    ax[1].set_title(title2, fontweight='bold', fontsize='medium')
-    ax[1].set_xlabel(x2_label, fontweight='bold', fontsize='medium',
-               labelpad=5.5)
-    for c in ax[1].containers:
-        ax[1].bar_label(c, fontweight='bold', fontsize=6)
+        sns.histplot(df, x=x2_values, discrete=True, color=colors_list[1], edgecolor=edgecolors_list[0], alpha = 1, ax=ax[1], shrink=.8)
+        second_ticks = [two for two in range(min(df[x2_values]), max(df[x2_values])+1, 3)]
+        ax[1].set_xticks(second_ticks)
+        ax[1].set_title(title2, fontweight='bold', fontsize='medium')
+        ax[1].set_xlabel(x2_label, fontweight='bold', fontsize='medium',
+                   labelpad=5.5)
+        for c in ax[1].containers:
+            ax[1].bar_label(c, fontweight='bold', fontsize=6)
     
-    sns.histplot(df, x=x3_values, discrete=True, color=colors_list[2], edgecolor=edgecolors_list[0], alpha = 1, ax=ax[2], shrink=.8)
-    third_ticks = [three for three in range(min(df[x3_values]), max(df[x3_values])+1, 3)]
-    ax[2].set_xticks(third_ticks)
-    ax[2].set_title(title3, fontweight='bold', fontsize='medium')
-    ax[2].set_xlabel(x3_label, fontweight='bold', fontsize='medium',
-               labelpad=5.5)
-    for c in ax[2].containers:
-        ax[2].bar_label(c, fontweight='bold', fontsize=6)
+        sns.histplot(df, x=x3_values, discrete=True, color=colors_list[2], edgecolor=edgecolors_list[0], alpha = 1, ax=ax[2], shrink=.8)
+        third_ticks = [three for three in range(min(df[x3_values]), max(df[x3_values])+1, 3)]
+        ax[2].set_xticks(third_ticks)
+        ax[2].set_title(title3, fontweight='bold', fontsize='medium')
+        ax[2].set_xlabel(x3_label, fontweight='bold', fontsize='medium',
+                   labelpad=5.5)
+        for c in ax[2].containers:
+            ax[2].bar_label(c, fontweight='bold', fontsize=6)
     
-    if save_png == True:
-        plt.savefig('figures/charts/{}'.format(png_name), bbox_inches='tight')
+        if save_png == True:
+            output = 'figures/charts/{}'.format(png_name)
+        save_figure(fig, output)
 
     return fig, ax
 
 def date_scatter(custom_params, df, x_values, y_values, size_values, title, x_label, 
-                 y_label, save_png=False, png_name=None, table_bool=False, table_df=None):
+                 y_label, save_png=False, png_name=None, table_bool=False, table_df=None, output=None):
     """Build collaborator heatmap based on given arguments.
 
        Args:
@@ -244,39 +300,40 @@ def date_scatter(custom_params, df, x_values, y_values, size_values, title, x_la
            png_name: str, default None, image name (must include .png)
            table_bool: bool, default False, includes values table
            table_df: formatted df, default None, needed for table 
+           output: default None, file path or buffer to save chart to (see save_figure)
     """
-    fig, ax = plt.subplots(figsize=(7, 5))
-    fig.patch.set_facecolor('#EDECE8')
-    sns.scatterplot(df, x=x_values, y=y_values, size=size_values, hue=size_values, 
-                    palette='autumn_r', edgecolor='#0d1b2a', marker='h', legend=False)
-    sns.set_theme(style='white', rc=custom_params)
-    sns.set(font_scale = 0.8)
-    ax.set_title(title, fontweight='bold', fontsize='large', x=0.75)
-    ax.set_xlabel(x_label, fontweight='bold', fontsize='medium',
-           labelpad=5.5)
-    ax.set_ylabel(y_label, fontweight='bold', fontsize='medium', 
+    with render_context(custom_params, font_scale=0.8):
+        fig, ax = new_figure(figsize=(7, 5))
+        fig.patch.set_facecolor('#EDECE8')
+        sns.scatterplot(df, x=x_values, y=y_values, size=size_values, hue=size_values, 
+                        palette='autumn_r', edgecolor='#0d1b2a', marker='h', legend=False, ax=ax)
+        ax.set_title(title, fontweight='bold', fontsize='large', x=0.75)
+        ax.set_xlabel(x_label, fontweight='bold', fontsize='medium',
                labelpad=5.5)
-    if table_bool == True:
-        ax.text(15.6, 28, 'Top 10', fontweight='bold', fontsize='medium')
-        table = ax.table(cellText=table_df.values, cellLoc='center',
-                         colLabels=['Date', 'Songs Released'], bbox=(1.1, 0.15, 0.4, 0.7))
+        ax.set_ylabel(y_label, fontweight='bold', fontsize='medium', 
+                   labelpad=5.5)
+        if table_bool == True:
+            ax.text(15.6, 28, 'Top 10', fontweight='bold', fontsize='medium')
+            table = ax.table(cellText=table_df.values, cellLoc='center',
+                             colLabels=['Date', 'Songs Released'], bbox=(1.1, 0.15, 0.4, 0.7))
         
-        for (row, col), cell in table.get_celld().items():
-            if (row == 0):
-                cell.set_text_props(fontproperties=FontProperties(weight='bold'))
-            if (row % 2 == 0):
-                cell.set_color('#FEB23F')
-                cell.set_edgecolor('#A03704')
-            else:
-                cell.set_edgecolor('#A03704')
+            for (row, col), cell in table.get_celld().items():
+                if (row == 0):
+                    cell.set_text_props(fontproperties=FontProperties(weight='bold'))
+                if (row % 2 == 0):
+                    cell.set_color('#FEB23F')
+                    cell.set_edgecolor('#A03704')
+                else:
+                    cell.set_edgecolor('#A03704')
         
-    if save_png == True:
-        plt.savefig('figures/charts/{}'.format(png_name), bbox_inches='tight')
+        if save_png == True:
+            output = 'figures/charts/{}'.format(png_name)
+        save_figure(fig, output)
 
     return fig, ax
 
 def views_plots(custom_params, bar_df, barx_values, bary_values, hist_df, histx_values, suptitle, title1, title2,
-                 x1_label, x2_label, y1_label, y2_label, colors_list, edgecolors_list, save_png=False, png_name=None):
+                 x1_label, x2_label, y1_label, y2_label, colors_list, edgecolors_list, save_png=False, png_name=None, output=None):
     """Build three release histograms based on given arguments.
 
        Args:
@@ -297,38 +354,40 @@ def views_plots(custom_params, bar_df, barx_values, bary_values, hist_df, histx_
            edgecolors_list: list, edgecolors for two subplots
            save_png: bool, default False, saves chart to png
            png_name: str, default None, image name (must include .png)
+           output: default None, file path or buffer to save chart to (see save_figure)
     """
-    sns.set_theme(style='white', rc=custom_params)
-    fig, ax = plt.subplots(1, 2, figsize=(17, 6), gridspec_kw={'width_ratios': [1.5, 1]})
-    fig.patch.set_facecolor('#EDECE8')
-    fig.suptitle(suptitle, fontweight='bold', fontsize='x-large')
-    sns.barplot(bar_df, y=bary_values, x=barx_values, errorbar=None, ax=ax[0], color=colors_list[0], edgecolor=edgecolors_list[0])
-    ax[0].xaxis.set_major_formatter(ticker.FuncFormatter(lambda x, pos: '{:.0f}M'.format(x/1000000)))
-    for c in ax[0].containers:
-        labels0 = ['{:.2f}M'.format(x/1000000) for x in c.datavalues] 
-        ax[0].bar_label(c, labels=labels0, fontweight='bold', fontsize=8, padding= 2, label_type='edge')
-    ax[0].set_title(title1, fontweight='bold', fontsize='medium')
-    ax[0].set_xlabel(x1_label, fontweight='bold', fontsize='medium',
-               labelpad=5.5)
-    ax[0].set_ylabel(y1_label, fontweight='bold', fontsize='medium')
-    ax[0].margins(x=0.1)
+    with render_context(custom_params):
+        fig, ax = new_figure(1, 2, figsize=(17, 6), gridspec_kw={'width_ratios': [1.5, 1]})
+        fig.patch.set_facecolor('#EDECE8')
+        fig.suptitle(suptitle, fontweight='bold', fontsize='x-large')
+        sns.barplot(bar_df, y=bary_values, x=barx_values, errorbar=None, ax=ax[0], color=colors_list[0], edgecolor=edgecolors_list[0])
+        ax[0].xaxis.set_major_formatter(ticker.FuncFormatter(lambda x, pos: '{:.0f}M'.format(x/1000000)))
+        for c in ax[0].containers:
+            labels0 = ['{:.2f}M'.format(x/1000000) for x in c.datavalues] 
+            ax[0].bar_label(c, labels=labels0, fontweight='bold', fontsize=8, padding= 2, label_type='edge')
+        ax[0].set_title(title1, fontweight='bold', fontsize='medium')
+        ax[0].set_xlabel(x1_label, fontweight='bold', fontsize='medium',
+                   labelpad=5.5)
+        ax[0].set_ylabel(y1_label, fontweight='bold', fontsize='medium')
+        ax[0].margins(x=0.1)
     
-    sns.histplot(hist_df, x=histx_values, ax=ax[1], color=colors_list[1], edgecolor=edgecolors_list[1], shrink=0.8)
-    ax[1].xaxis.set_major_formatter(ticker.FuncFormatter(lambda x, pos: '{:.0f}M'.format(x/1000000)))
-    for c in ax[1].containers:
-        labels1 = [v if v > 0 else '' for v in c.datavalues] 
-        ax[1].bar_label(c, labels=labels1, fontweight='bold', fontsize=6)
-    ax[1].set_title(title2, fontweight='bold', fontsize='medium')
-    ax[1].set_xlabel(x2_label, fontweight='bold', fontsize='medium',
-               labelpad=5.5)
-    ax[1].set_ylabel(y2_label, fontweight='bold', fontsize='medium')
+        sns.histplot(hist_df, x=histx_values, ax=ax[1], color=colors_list[1], edgecolor=edgecolors_list[1], shrink=0.8)
+        ax[1].xaxis.set_major_formatter(ticker.FuncFormatter(lambda x, pos: '{:.0f}M'.format(x/1000000)))
+        for c in ax[1].containers:
+            labels1 = [v if v > 0 else '' for v in c.datavalues] 
+            ax[1].bar_label(c, labels=labels1, fontweight='bold', fontsize=6)
+        ax[1].set_title(title2, fontweight='bold', fontsize='medium')
+        ax[1].set_xlabel(x2_label, fontweight='bold', fontsize='medium',
+                   labelpad=5.5)
+        ax[1].set_ylabel(y2_label, fontweight='bold', fontsize='medium')
     
-    if save_png == True:
-        plt.savefig('figures/charts/{}'.format(png_name), bbox_inches='tight')
+        if save_png == True:
+            output = 'figures/charts/{}'.format(png_name)
+        save_figure(fig, output)
 
     return fig, ax
 
-def views_box(custom_params, df, x_values, y_values, title, x_label, y_label, boxcolor, linecolor, save_png=False, png_name=None):
+def views_box(custom_params, df, x_values, y_values, title, x_label, y_label, boxcolor, linecolor, save_png=False, png_name=None, output=None):
     """Build three release histograms based on given arguments.
 
        Args:
@@ -343,22 +402,72 @@ def views_box(custom_params, df, x_values, y_values, title, x_label, y_label, bo
            linecolor: str, color for lines
            save_png: bool, default False, saves chart to png
            png_name: str, default None, image name (must include .png)
+           output: default None, file path or buffer to save chart to (see save_figure)
     """
-    sns.set_theme(style='white', rc=custom_params)
-    fig, ax = plt.subplots(figsize=(17, 7))
-    fig.patch.set_facecolor('#EDECE8')
-    sns.boxplot(df, y=y_values, x=x_values, linecolor=linecolor, showmeans=True, 
-                boxprops= {'facecolor': boxcolor}, flierprops={'marker': 'd', 'markerfacecolor': linecolor, 'markersize': 3},
-                meanprops={'marker':'8', 'markerfacecolor': fig.get_facecolor(), 'markeredgecolor': linecolor})
-    ax.xaxis.set_major_formatter(ticker.FuncFormatter(lambda x, pos: '{:.0f}M'.format(x/1000000)))
-    ax.set_title(title, fontweight='bold', fontsize='medium')
-    ax.set_xlabel(x_label, fontweight='bold', fontsize='medium',
-               labelpad=5.5)
-    ax.set_ylabel(y_label, fontweight='bold', fontsize='medium')
-    
-    if save_png == True:
-        plt.savefig('figures/charts/{}'.format(png_name), bbox_inches='tight')
-    
+    with render_context(custom_params):
+        fig, ax = new_figure(figsize=(17, 7))
+        fig.patch.set_facecolor('#EDECE8')
+        sns.boxplot(df, y=y_values, x=x_values, linecolor=linecolor, showmeans=True, 
+                    boxprops= {'facecolor': boxcolor}, flierprops={'marker': 'd', 'markerfacecolor': linecolor, 'markersize': 3},
+                    meanprops={'marker':'8', 'markerfacecolor': fig.get_facecolor(), 'markeredgecolor': linecolor}, ax=ax)
+        ax.xaxis.set_major_formatter(ticker.FuncFormatter(lambda x, pos: '{:.0f}M'.format(x/1000000)))
+        ax.set_title(title, fontweight='bold', fontsize='medium')
+        ax.set_xlabel(x_label, fontweight='bold', fontsize='medium',
+                   labelpad=5.5)
+        ax.set_ylabel(y_label, fontweight='bold', fontsize='medium')
     
+        if save_png == True:
+            output = 'figures/charts/{}'.format(png_name)
+        save_figure(fig, output)
+
+    return fig, ax
+
+def collab_network(custom_params, nodes_df, edges_df, node_labels, node_values, edge_values, title,
+                   node_color, edge_color, save_png=False, png_name=None, output=None):
+    """Build collaborator network chart based on given arguments.
 
-    return fig, ax
\ No newline at end of file
+       Args:
+           custom_params: dict, matplotlib custom params
+           nodes_df: pandas dataframe of nodes with x and y columns
+           edges_df: pandas dataframe of edges with x, y, x2, and y2 columns
+           node_labels: str, column name in nodes_df
+           node_values: str, column name in nodes_df, sets node sizes
+           edge_values: str, column name in edges_df, sets edge widths
+           title: str, chart title
+           node_color: str, color for nodes
+           edge_color: str, color for edges
+           save_png: bool, default False, saves chart to png
+           png_name: str, default None, image name (must include .png)
+           output: default None, file path or buffer to save chart to (see save_figure)
+    """
+    with render_context(custom_params):
+        fig, ax = new_figure(figsize=(12, 12))
+        fig.patch.set_facecolor('#EDECE8')
+
+        if len(edges_df) > 0:
+            segments = edges_df[['x', 'y', 'x2', 'y2']].to_numpy().reshape(-1, 2, 2)
+            widths = 0.5 + 7 * edges_df[edge_values] / edges_df[edge_values].max()
+            ax.add_collection(LineCollection(segments, linewidths=widths, colors=edge_color, alpha=0.45, zorder=1))
+            for row in edges_df.itertuples():
+                ax.text((row.x + row.x2) / 2, (row.y + row.y2) / 2, getattr(row, edge_values), 
+                        fontsize='x-small', ha='center', va='center', color=edge_color, zorder=2)
+
+        sizes = 200 + 2800 * nodes_df[node_values] / nodes_df[node_values].max()
+        ax.scatter(nodes_df['x'], nodes_df['y'], s=sizes, color=node_color, edgecolor='#2c0735', zorder=3)
+        # Labels sit further out for bigger nodes
+        offsets = 1.12 + 0.12 * nodes_df[node_values] / nodes_df[node_values].max()
+        for row, offset in zip(nodes_df.itertuples(), offsets):
+            ax.text(row.x * offset, row.y * offset, '{}\n({})'.format(getattr(row, node_labels), getattr(row, node_values)),
+                    fontweight='bold', fontsize='small', ha='center', va='center')
+
+        ax.set_title(title, fontweight='bold', fontsize='x-large')
+        ax.set_xlim(-1.4, 1.4)
+        ax.set_ylim(-1.35, 1.35)
+        ax.set_aspect('equal')
+        ax.axis('off')
+
+        if save_png == True:
+            output = 'figures/charts/{}'.format(png_name)
+        save_figure(fig, output)
+
+    return fig, ax
@@ -0,0 +1,286 @@
+"""In-memory graph of the musicians credited on the discography's songs.
+
+   Built once from the writers, producers, and artists tables. Every role
+   gets a sparse collaborator x song incidence matrix, and every song an
+   era and the artist of its catalog, so the graph can be limited to any
+   roles, eras, and catalogs. Two collaborators are connected by the
+   number of songs they both worked on (the adjacency matrix, B @ B.T of
+   the incidence matrix B), which is what top-k, pair, degree, and
+   centrality queries read. It is computed once per role, and for all
+   roles, when the graph is built.
+
+   Like collaborators_per_song in sql/collab_tables.sql, a collaborator
+   counts once per song no matter how many roles they had on it, and like
+   collaborators_per_era, rankings leave out every catalog's own artist
+   unless exclude says otherwise.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse import linalg
+
+from . import toolkit
+
+roles = ['writer', 'producer', 'artist']
+
+def build_graph(credits):
+    """Builds collaborator graph from a dataframe of credits.
+
+       Args:
+           credits: dataframe with song_id, artist, era, collaborator,
+                    and role columns, one row per credit (see
+                    sql/collab_credits.sql)
+
+       Returns dictionary:
+           names: array, collaborator name of every node
+           song_ids: array, song_id of every song index
+           song_era: array, era index of every song index
+           eras: array, era names, sorted
+           song_artist: array, catalog index of every song index
+           artists: array, catalog artists, sorted
+           incidence: dict, {'role': sparse collaborator x song matrix}
+           adjacency: dict, {(roles): collaborator x collaborator matrix},
+                      for every single role and all roles together
+    """
+    credits = credits.dropna(subset=['collaborator'])
+    node, names = pd.factorize(credits['collaborator'], sort=True)
+    song, song_ids = pd.factorize(credits['song_id'], sort=True)
+    eras = np.asarray(sorted(credits['era'].unique()), dtype=str)
+    artists = np.asarray(sorted(credits['artist'].unique()), dtype=str)
+
+    song_era = np.zeros(len(song_ids), dtype=np.int32)
+    song_era[song] = pd.Categorical(credits['era'], eras).codes
+    song_artist = np.zeros(len(song_ids), dtype=np.int32)
+    song_artist[song] = pd.Categorical(credits['artist'], artists).codes
+
+    shape = (len(names), len(song_ids))
+    incidence = {}
+    for role in roles:
+        mask = (credits['role'] == role).to_numpy()
+        matrix = sparse.csr_matrix((np.ones(mask.sum(), dtype=np.int32), (node[mask], song[mask])), shape=shape)
+        # Duplicate credits in one role count once
+        incidence[role] = (matrix > 0).astype(np.int32)
+
+    return _with_adjacency({'names': np.asarray(names, dtype=str),
+                            'song_ids': np.asarray(song_ids, dtype=np.int64),
+                            'song_era': song_era,
+                            'eras': eras,
+                            'song_artist': song_artist,
+                            'artists': artists,
+                            'incidence': incidence})
+
+def _role_key(graph, roles):
+    return tuple(role for role in graph['incidence'] if roles is None or role in roles)
+
+def _shared_songs(matrix):
+    shared = (matrix @ matrix.T).tolil()
+    shared.setdiag(0)
+    shared = shared.tocsr()
+    shared.eliminate_zeros()
+    return shared
+
+def _with_adjacency(graph):
+    # Role combinations the queries use, so they don't recompute B @ B.T
+    keys = [(role,) for role in graph['incidence']] + [_role_key(graph, None)]
+    graph['adjacency'] = {key: _shared_songs(song_matrix(graph, key)) for key in keys}
+    return graph
+
+def load_graph(read_sql):
+    """Builds collaborator graph from the database.
+
+       Args:
+           read_sql: function taking sql_text and returning a dataframe,
+                     e.g. app_data.read_sql
+    """
+    return build_graph(read_sql(toolkit.sql_to_string('collab_credits.sql')))
+
+def song_matrix(graph, roles=None, eras=None):
+    """Returns binary collaborator x song matrix for given roles and eras.
+
+       Args:
+           graph: dict, from build_graph
+           roles: list, default None (all roles)
+           eras: list, default None (all eras); songs of other eras get
+                 empty columns so indexes stay the same
+    """
+    roles = list(graph['incidence'].keys()) if roles is None else roles
+    matrix = sum(graph['incidence'][role] for role in roles)
+    matrix = (matrix > 0).astype(np.int32)
+    if eras is not None:
+        keep = np.isin(graph['eras'][graph['song_era']], eras).astype(np.int32)
+        matrix = matrix @ sparse.diags(keep, dtype=np.int32)
+    return sparse.csr_matrix(matrix)
+
+def adjacency(graph, roles=None, eras=None):
+    """Returns collaborator x collaborator matrix of songs worked on together.
+
+       The diagonal is left empty; see song_counts for songs per collaborator.
+       Matrices built with the graph are returned as they are (don't modify
+       them); other role and era combinations are computed.
+    """
+    key = _role_key(graph, roles)
+    if eras is None and key in graph['adjacency']:
+        return graph['adjacency'][key]
+    return _shared_songs(song_matrix(graph, roles, eras))
+
+def song_counts(graph, roles=None, eras=None):
+    """Returns array of the number of songs each collaborator worked on."""
+    return np.asarray(song_matrix(graph, roles, eras).sum(axis=1)).ravel()
+
+def _keep(graph, exclude):
+    # exclude None leaves out the catalog artists of the graph
+    return ~np.isin(graph['names'], graph['artists'] if exclude is None else list(exclude))
+
+def top_collaborators(graph, k=10, roles=None, eras=None, exclude=None):
+    """Returns dataframe of the k collaborators with the most songs.
+
+       Columns are collaborator and songs, most songs first (ties by name).
+       exclude lists names left out, default None (the graph's catalog
+       artists, see catalog for one artist's graph).
+    """
+    counts = song_counts(graph, roles, eras)
+    nodes = np.flatnonzero(_keep(graph, exclude) & (counts > 0))
+    nodes = nodes[np.argsort(-counts[nodes], kind='stable')][:k]
+    return pd.DataFrame({'collaborator': graph['names'][nodes], 'songs': counts[nodes]})
+
+def collaborators_of(graph, name, k=10, roles=None, eras=None):
+    """Returns dataframe of who worked with given collaborator the most.
+
+       Columns are collaborator and shared_songs, most shared songs first.
+    """
+    nodes = np.flatnonzero(graph['names'] == name)
+    if len(nodes) == 0:
+        raise KeyError('Unknown collaborator: {}'.format(name))
+    row = adjacency(graph, roles, eras)[nodes[0]]
+    order = np.argsort(-row.data, kind='stable')[:k]
+    return pd.DataFrame({'collaborator': graph['names'][row.indices[order]],
+                         'shared_songs': row.data[order]})
+
+def top_pairs(graph, k=10, roles=None, eras=None, exclude=None):
+    """Returns dataframe of the k pairs of collaborators with the most shared songs.
+
+       Columns are collaborator_1, collaborator_2, and shared_songs.
+    """
+    keep = sparse.diags(_keep(graph, exclude).astype(np.int32), dtype=np.int32)
+    shared = sparse.csr_matrix(keep @ adjacency(graph, roles, eras) @ keep)
+    shared.eliminate_zeros()
+    pairs = sparse.triu(shared, k=1).tocoo()
+    order = np.argsort(-pairs.data, kind='stable')[:k]
+    return pd.DataFrame({'collaborator_1': graph['names'][pairs.row[order]],
+                         'collaborator_2': graph['names'][pairs.col[order]],
+                         'shared_songs': pairs.data[order]})
+
+def eigenvector_centrality(matrix):
+    """Returns eigenvector centrality of given symmetric adjacency matrix, scaled to a maximum of 1."""
+    matrix = sparse.csr_matrix(matrix, dtype=np.float64)
+    if matrix.shape[0] == 0 or matrix.nnz == 0:
+        return np.zeros(matrix.shape[0])
+    if matrix.shape[0] < 3:
+        values, vectors = np.linalg.eigh(matrix.toarray())
+    else:
+        values, vectors = linalg.eigsh(matrix, k=1, which='LA')
+    vector = np.abs(vectors[:, -1])
+    return vector / vector.max()
+
+def centrality(graph, roles=None, eras=None, exclude=None):
+    """Returns dataframe of degree and centrality of every collaborator.
+
+       Columns are collaborator, songs, degree (number of collaborators
+       worked with), weighted_degree (shared songs with all of them), and
+       eigenvector (eigenvector centrality, 1 for the most central);
+       sorted by eigenvector centrality.
+    """
+    keep = _keep(graph, exclude)
+    shared = adjacency(graph, roles, eras)
+    keep_matrix = sparse.diags(keep.astype(np.int32), dtype=np.int32)
+    shared = sparse.csr_matrix(keep_matrix @ shared @ keep_matrix)
+    shared.eliminate_zeros()
+    df = pd.DataFrame({'collaborator': graph['names'],
+                       'songs': song_counts(graph, roles, eras),
+                       'degree': shared.getnnz(axis=1),
+                       'weighted_degree': np.asarray(shared.sum(axis=1)).ravel(),
+                       'eigenvector': eigenvector_centrality(shared)})
+    df = df[keep & (df['songs'] > 0)]
+    return df.sort_values(['eigenvector', 'collaborator'], ascending=[False, True]).reset_index(drop=True)
+
+def _song_subgraph(graph, songs):
+    incidence = {role: matrix[:, songs] for role, matrix in graph['incidence'].items()}
+    nodes = np.flatnonzero(sum(np.asarray(matrix.sum(axis=1)).ravel() for matrix in incidence.values()) > 0)
+    era_index, song_era = np.unique(graph['song_era'][songs], return_inverse=True)
+    artist_index, song_artist = np.unique(graph['song_artist'][songs], return_inverse=True)
+    return _with_adjacency({'names': graph['names'][nodes],
+                            'song_ids': graph['song_ids'][songs],
+                            'song_era': song_era.astype(np.int32),
+                            'eras': graph['eras'][era_index],
+                            'song_artist': song_artist.astype(np.int32),
+                            'artists': graph['artists'][artist_index],
+                            'incidence': {role: matrix[nodes] for role, matrix in incidence.items()}})
+
+def subgraph(graph, eras):
+    """Returns graph limited to the songs of given eras (and their collaborators)."""
+    return _song_subgraph(graph, np.flatnonzero(np.isin(graph['eras'][graph['song_era']], eras)))
+
+def catalog(graph, artist):
+    """Returns graph limited to the songs of given artist's catalog (and their collaborators)."""
+    return _song_subgraph(graph, np.flatnonzero(graph['artists'][graph['song_artist']] == artist))
+
+def era_counts(graph, roles=None, exclude=None):
+    """Returns dataframe of songs per catalog and era for every collaborator.
+
+       Same rows as the collaborators_per_era table: artist, era,
+       collaborator, songs, and total_songs (songs in all of the catalog's
+       eras). exclude lists names left out, default None (every catalog's
+       own artist, in that catalog only).
+    """
+    matrix = song_matrix(graph, roles)
+    n_songs = len(graph['song_ids'])
+    n_eras = len(graph['eras'])
+    groups, song_group = np.unique(graph['song_artist'].astype(np.int64) * n_eras + graph['song_era'],
+                                   return_inverse=True)
+    group_songs = sparse.csr_matrix((np.ones(n_songs, dtype=np.int32), (np.arange(n_songs), song_group)),
+                                    shape=(n_songs, len(groups)))
+    counts = (matrix @ group_songs).tocoo()
+    df = pd.DataFrame({'artist': graph['artists'][groups[counts.col] // n_eras],
+                       'era': graph['eras'][groups[counts.col] % n_eras],
+                       'collaborator': graph['names'][counts.row],
+                       'songs': counts.data})
+    df['total_songs'] = df.groupby(['artist', 'collaborator'])['songs'].transform('sum')
+    if exclude is None:
+        df = df[df['collaborator'] != df['artist']]
+    else:
+        df = df[~df['collaborator'].isin(list(exclude))]
+    return df.sort_values(['artist', 'era', 'collaborator']).reset_index(drop=True)
+
+def most_frequent(graph, max_rank=9, roles=None, exclude=None):
+    """Returns era_counts of the collaborators ranked up to max_rank.
+
+       Collaborators are dense ranked by total songs within their catalog,
+       like sql/most_frequent_collaborators.sql, and a rank column is added.
+    """
+    df = era_counts(graph, roles, exclude)
+    df['rank'] = df.groupby('artist')['total_songs'].rank(method='dense', ascending=False).astype(int)
+    return df[df['rank'] <= max_rank].reset_index(drop=True)
+
+def network(graph, k=15, roles=None, eras=None, exclude=None):
+    """Returns node and edge dataframes of the k most frequent collaborators.
+
+       Nodes are placed on a circle, most songs first, for charts.collab_network.
+       nodes columns: collaborator, songs, x, y
+       edges columns: source, target, shared_songs, x, y, x2, y2
+    """
+    nodes = top_collaborators(graph, k, roles, eras, exclude)
+    angles = np.pi / 2 - 2 * np.pi * np.arange(len(nodes)) / max(len(nodes), 1)
+    nodes['x'] = np.cos(angles)
+    nodes['y'] = np.sin(angles)
+
+    index = pd.Index(graph['names']).get_indexer(nodes['collaborator'])
+    shared = sparse.triu(adjacency(graph, roles, eras)[index][:, index], k=1).tocoo()
+    edges = pd.DataFrame({'source': nodes['collaborator'].to_numpy()[shared.row],
+                          'target': nodes['collaborator'].to_numpy()[shared.col],
+                          'shared_songs': shared.data,
+                          'x': nodes['x'].to_numpy()[shared.row],
+                          'y': nodes['y'].to_numpy()[shared.row],
+                          'x2': nodes['x'].to_numpy()[shared.col],
+                          'y2': nodes['y'].to_numpy()[shared.col]})
+    return nodes, edges.sort_values('shared_songs').reset_index(drop=True)
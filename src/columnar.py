@@ -0,0 +1,119 @@
+"""Saves and loads discography dataframes in columnar formats.
+
+   Replaces the pickled dataframes with Parquet ('.parquet') or Arrow IPC
+   ('.arrow') files. The list columns are stored as native list<string>
+   arrays instead of pickled Python objects, and loads can be limited to
+   the columns an analysis needs, so reading page views or release dates
+   never decodes a single lyric line. Arrow IPC files are written
+   uncompressed so they can be memory-mapped without copying.
+"""
+
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+list_columns = ['song_artists',
+                'song_lyrics',
+                'song_writers',
+                'song_producers',
+                'song_tags']
+
+schema = pa.schema([('album_title', pa.string()),
+                    ('album_url', pa.string()),
+                    ('category', pa.string()),
+                    ('album_track_number', pa.string()),
+                    ('song_title', pa.string()),
+                    ('song_url', pa.string()),
+                    ('song_artists', pa.list_(pa.string())),
+                    ('song_release_date', pa.timestamp('ns')),
+                    ('song_page_views', pa.int64()),
+                    ('song_lyrics', pa.list_(pa.string())),
+                    ('song_writers', pa.list_(pa.string())),
+                    ('song_producers', pa.list_(pa.string())),
+                    ('song_tags', pa.list_(pa.string()))])
+
+def _file_format(file_name):
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension == '.parquet':
+        return 'parquet'
+    if extension in ['.arrow', '.feather']:
+        return 'arrow'
+    raise ValueError('Unknown columnar file extension: {}'.format(extension))
+
+def to_table(df):
+    """Converts discography dataframe to an Arrow table with the discography schema.
+
+       Track numbers are stored as text (like in the database) and list cells
+       that aren't lists (e.g. NaN) are stored as nulls.
+    """
+    df = df.reindex(columns=schema.names).copy()
+    for field in schema:
+        if pa.types.is_string(field.type):
+            df[field.name] = df[field.name].map(lambda value: None if pd.isna(value) else str(value))
+        elif pa.types.is_list(field.type):
+            df[field.name] = df[field.name].map(lambda value: value if isinstance(value, list) else None)
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+def to_df(table):
+    """Converts Arrow table back to a dataframe with Python list cells."""
+    df = table.drop_columns([name for name in table.column_names if name in list_columns]).to_pandas()
+    for name in table.column_names:
+        if name in list_columns:
+            df[name] = table.column(name).to_pylist()
+    return df[table.column_names]
+
+def save_columnar(df, file_name, compression='zstd'):
+    """Saves discography dataframe to a Parquet or Arrow IPC file.
+
+       Args:
+           df: discography pandas dataframe
+           file_name: str, path ending in '.parquet' or '.arrow'
+           compression: str, default 'zstd', Parquet compression codec
+                        (Arrow IPC files are always uncompressed)
+    """
+    file_format = _file_format(file_name)
+    table = to_table(df)
+    temp_name = '{}.tmp'.format(file_name)
+    try:
+        if file_format == 'parquet':
+            pq.write_table(table, temp_name, compression=compression)
+        else:
+            with pa.OSFile(temp_name, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        os.replace(temp_name, file_name)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+
+def read_table(file_name, columns=None, memory_map=True):
+    """Reads Parquet or Arrow IPC file as an Arrow table.
+
+       Args:
+           file_name: str, path ending in '.parquet' or '.arrow'
+           columns: list, default None, columns to read (all if None);
+                    other columns are never decoded
+           memory_map: bool, default True, memory-maps the file instead of
+                       reading it into memory (Arrow IPC columns are then
+                       zero-copy views of the file)
+    """
+    if _file_format(file_name) == 'parquet':
+        return pq.read_table(file_name, columns=columns, memory_map=memory_map)
+    source = pa.memory_map(file_name, 'r') if memory_map == True else pa.OSFile(file_name, 'rb')
+    table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    return table
+
+def read_columnar(file_name, columns=None, memory_map=True):
+    """Loads discography dataframe from a Parquet or Arrow IPC file.
+
+       Args as in read_table. List columns come back as Python lists, like
+       the dataframes built by genius_scrape. Track numbers come back as
+       text whatever type they were saved as, so a dataframe with integer
+       track numbers only equals its round trip once they are strings.
+    """
+    return to_df(read_table(file_name, columns, memory_map))
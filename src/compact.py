@@ -0,0 +1,180 @@
+"""Compact in-memory representation of the discography dataframe.
+
+   The discography dataframe repeats album titles, album URLs, and eras as
+   separate Python strings on every song, and keeps every credit name, tag,
+   and lyric line inside lists of lists. Here the album, era, and track
+   number columns are categoricals, and every list column is stored as two
+   NumPy arrays: integer codes into a dictionary of unique strings, and
+   offsets marking where each song's codes start and end (song i owns
+   codes[offsets[i]:offsets[i + 1]]). Artists, writers, and producers
+   share one name dictionary, so a collaborator has the same code in every
+   role and counts can be computed on the codes alone.
+
+   Dictionaries, song titles, and song URLs are Arrow string arrays (one
+   UTF-8 buffer plus offsets) rather than Python strings, which matters
+   most for the lyrics, where nearly every line is unique.
+
+   to_compact and to_df convert to and from the usual dataframe.
+"""
+
+import sys
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from . import columnar
+
+categorical_columns = ['album_title', 'album_url', 'category', 'album_track_number']
+
+# Unique per song, stored as Arrow strings
+string_columns = ['song_title', 'song_url']
+
+# {'list column': dictionary it's coded with}
+list_dictionaries = {'song_artists': 'names',
+                     'song_writers': 'names',
+                     'song_producers': 'names',
+                     'song_tags': 'tags',
+                     'song_lyrics': 'lyrics'}
+
+def _encode_lists(series):
+    lengths = np.fromiter((len(value) if isinstance(value, list) else 0 for value in series),
+                          dtype=np.int64, count=len(series))
+    offsets = np.zeros(len(series) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    values = np.fromiter(chain.from_iterable(value for value in series if isinstance(value, list)),
+                         dtype=object, count=offsets[-1])
+    return offsets, values
+
+def to_compact(df):
+    """Converts discography dataframe to the compact representation.
+
+       Returns dictionary:
+           songs: dataframe of the scalar columns, with album_title,
+                  album_url, category, and album_track_number as
+                  categoricals (categories in order of first appearance)
+                  and song_title and song_url as Arrow strings
+           dictionaries: dict, {'names'/'tags'/'lyrics': Arrow string
+                         array of unique strings}
+           lists: dict, {'list column': {'offsets': int64 array,
+                  'codes': int32 array}}
+           columns: list, column order of df
+    """
+    df = df.reset_index(drop=True)
+    list_columns = [column for column in df.columns if column in list_dictionaries]
+    songs = df.drop(columns=list_columns)
+    for column in categorical_columns:
+        if column in songs.columns:
+            songs[column] = pd.Categorical(songs[column], categories=pd.unique(songs[column].dropna()))
+    for column in string_columns:
+        if column in songs.columns:
+            songs[column] = songs[column].astype(pd.ArrowDtype(pa.string()))
+
+    encoded = {column: _encode_lists(df[column]) for column in list_columns}
+    dictionaries = {}
+    lists = {}
+    for dictionary in dict.fromkeys(list_dictionaries[column] for column in list_columns):
+        coded = [column for column in list_columns if list_dictionaries[column] == dictionary]
+        # One factorize over every column sharing the dictionary
+        codes, uniques = pd.factorize(np.concatenate([encoded[column][1] for column in coded]))
+        dictionaries[dictionary] = pa.array(uniques, type=pa.string())
+        start = 0
+        for column in coded:
+            offsets = encoded[column][0]
+            lists[column] = {'offsets': offsets,
+                             'codes': codes[start:start + offsets[-1]].astype(np.int32)}
+            start += offsets[-1]
+    return {'songs': songs, 'dictionaries': dictionaries, 'lists': lists, 'columns': list(df.columns)}
+
+def read_compact(file_name, columns=None):
+    """Loads a columnar dataset (see columnar.read_columnar) in the compact representation."""
+    return to_compact(columnar.read_columnar(file_name, columns))
+
+def decode(dictionary, codes):
+    """Returns object array of the strings of given codes in an Arrow dictionary."""
+    return dictionary.take(pa.array(codes)).to_numpy(zero_copy_only=False)
+
+def list_values(compact, column):
+    """Returns list column as an object array of strings, one per credit/tag/line."""
+    return decode(compact['dictionaries'][list_dictionaries[column]], compact['lists'][column]['codes'])
+
+def to_df(compact):
+    """Converts compact representation back to the discography dataframe.
+
+       Categoricals and Arrow strings become object columns again and list
+       columns lists of strings, in the original column order.
+    """
+    df = compact['songs'].copy()
+    for column in categorical_columns + string_columns:
+        if column in df.columns:
+            values = df[column].astype(object)
+            df[column] = values.where(values.notna(), None)
+    for column, arrays in compact['lists'].items():
+        values = list_values(compact, column)
+        offsets = arrays['offsets']
+        df[column] = [values[start:end].tolist() for start, end in zip(offsets[:-1], offsets[1:])]
+    return df[compact['columns']]
+
+def song_index(compact, column):
+    """Returns int64 array of the song (row) every code of the list column belongs to."""
+    offsets = compact['lists'][column]['offsets']
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+def credit_counts(compact, columns, by=None):
+    """Returns dataframe of the number of songs per name, optionally per group.
+
+       Counted on integer codes only: every (song, name) pair counts once,
+       even when a name is credited in several of the columns (e.g. as
+       writer and producer), and names are decoded once at the end.
+
+       Args:
+           compact: dict, from to_compact
+           columns: str or list, list columns coded with the same
+                    dictionary, e.g. ['song_artists', 'song_writers',
+                    'song_producers']
+           by: str, default None, categorical column of songs to group by,
+               e.g. 'category' for songs per era
+
+       Columns are by (if given), name, and songs; most songs first.
+    """
+    columns = [columns] if isinstance(columns, str) else list(columns)
+    dictionary = compact['dictionaries'][list_dictionaries[columns[0]]]
+    song = np.concatenate([song_index(compact, column) for column in columns])
+    code = np.concatenate([compact['lists'][column]['codes'] for column in columns]).astype(np.int64)
+    pairs = np.unique(song * len(dictionary) + code)
+    song, code = pairs // len(dictionary), pairs % len(dictionary)
+
+    if by is None:
+        counts = np.bincount(code, minlength=len(dictionary))
+        names = np.flatnonzero(counts)
+        df = pd.DataFrame({'name': decode(dictionary, names), 'songs': counts[names]})
+        return df.sort_values(['songs', 'name'], ascending=[False, True], ignore_index=True)
+
+    groups = compact['songs'][by].cat
+    group = groups.codes.to_numpy().astype(np.int64)[song]
+    keep = group >= 0
+    keys, counts = np.unique(group[keep] * len(dictionary) + code[keep], return_counts=True)
+    df = pd.DataFrame({by: pd.Categorical.from_codes(keys // len(dictionary), groups.categories),
+                       'name': decode(dictionary, keys % len(dictionary)),
+                       'songs': counts})
+    return df.sort_values([by, 'songs', 'name'], ascending=[True, False, True], ignore_index=True)
+
+def _list_size(value):
+    return sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value) if isinstance(value, list) else 0
+
+def memory_usage(data):
+    """Returns approximate bytes held by a discography dataframe or compact representation.
+
+       Strings inside list cells are counted too, which
+       DataFrame.memory_usage(deep=True) leaves out.
+    """
+    if isinstance(data, pd.DataFrame):
+        list_columns = [column for column in data.columns if column in list_dictionaries]
+        total = data.drop(columns=list_columns).memory_usage(index=False, deep=True).sum()
+        total += sum(_list_size(value) for column in list_columns for value in data[column])
+        return int(total)
+    total = data['songs'].memory_usage(index=False, deep=True).sum()
+    total += sum(dictionary.nbytes for dictionary in data['dictionaries'].values())
+    total += sum(array.nbytes for arrays in data['lists'].values() for array in arrays.values())
+    return int(total)
@@ -0,0 +1,51 @@
+"""Reads discography dataframes back from the SQLite database.
+
+   Needs only pandas and sqlite3, so the app and pandas_analytics can
+   rebuild the discography without importing the scraping modules.
+"""
+
+import pandas as pd
+import sqlite3 as sql
+
+from . import columnar
+
+def read_db(db_name, artist=None, with_artist=False):
+    """Rebuilds discography dataframe from a SQLite database.
+
+       Reverses convert_to_db by collecting the artists, writers, producers,
+       tags, and lyrics tables back into list columns per song. Categories
+       come from the albums table and track numbers come back as text.
+
+       Args:
+           db_name: str, SQLite database file
+           artist: str, default None (every catalog), only read songs of
+                   this artist's catalog
+           with_artist: bool, default False, keep an artist column
+    """
+    connection = sql.connect(db_name)
+    where = '' if artist is None else 'WHERE c.artist = ?'
+    df = pd.read_sql(
+        """SELECT s.song_id, c.artist, a.album_title, a.album_url, a.category, s.album_track_number, s.song_title,
+                  s.song_url, s.song_release_date, s.song_page_views
+           FROM songs s
+           JOIN albums a ON s.album_id = a.album_id
+           JOIN catalogs c ON a.catalog_id = c.catalog_id
+           {}
+           ORDER BY s.song_id""".format(where), connection, params=None if artist is None else (artist,),
+        parse_dates=['song_release_date'])
+
+    list_tables = [('artists', 'song_artist', 'song_artists'),
+                   ('writers', 'song_writer', 'song_writers'),
+                   ('producers', 'song_producer', 'song_producers'),
+                   ('tags', 'song_tag', 'song_tags'),
+                   ('lyrics', 'song_lyric', 'song_lyrics')]
+    for table, column, list_column in list_tables:
+        values = pd.read_sql('SELECT song_id, {} FROM {} ORDER BY rowid'.format(column, table), connection)
+        grouped = values.dropna().groupby('song_id', sort=False)[column].agg(list)
+        df[list_column] = df['song_id'].map(grouped)
+        df[list_column] = df[list_column].apply(lambda value: value if isinstance(value, list) else [])
+    connection.close()
+
+    columns = columnar.schema.names
+    df = df.reindex(columns=['artist'] + columns if with_artist == True else columns)
+    return df
@@ -4,14 +4,27 @@
 """
 
 import csv
+import hashlib
+import os
 import re
+from datetime import datetime
 
 import pandas as pd
-import requests
 import sqlite3 as sql
-from parsel import Selector
 
+from . import fetcher
 from . import genius_scrape
+from . import page_cache
+from . import toolkit
+
+# Catalog of dataframes without an artist column (the single-artist pipeline)
+default_artist = toolkit.default_artist
+
+# Actions of the rules in a cleaning rules file, see read_cleaning_rules
+cleaning_actions = ['drop_duplicates', 'drop', 'drop_file', 'add_file', 'rename', 'merge']
+
+# Derived tables read by the app pages, built once per database
+analytics_scripts = ['collab_tables.sql', 'release_table.sql', 'views_table.sql', 'lyrics_index.sql']
 
 def drop_song(df, song_name, drop_duplicates=True):
     """Removes rows for given songs from discography dataframe.
@@ -25,37 +38,40 @@ def drop_song(df, song_name, drop_duplicates=True):
     df = df[df['song_title'] != song_name]
     return df
 
-def drop_songs_from_file(df, csv_name, drop_duplicates=True):
+def drop_songs_from_file(df, csv_name, drop_duplicates=True, key='song_title'):
     """Drops multiple songs at once from given CSV file.
 
        By default, this function will also remove rows with duplicate
-       song titles from dataframe (e.g. rereleases on EPs).
+       song titles from dataframe (e.g. rereleases on EPs). Songs are matched
+       on key: one column name ('song_title' or 'song_url') or a list of
+       column names, e.g. ['song_title', 'album_title']. The CSV needs a
+       header for each key column.
     """
     if drop_duplicates == True:
         df = df.drop_duplicates(subset=['song_title'])
-        
-    with open(csv_name, 'r') as csv_file:
-        csv_reader = csv.DictReader(csv_file)
-        for row in csv_reader:
-            song_title = row['song_title']
-            df = drop_song(df, song_title, False)
+
+    drop_df = pd.read_csv(csv_name, dtype=str, keep_default_na=False)
+    if isinstance(key, str):
+        dropped = df[key].isin(drop_df[key])
+    else:
+        key = list(key)
+        song_keys = pd.MultiIndex.from_frame(df[key])
+        dropped = song_keys.isin(pd.MultiIndex.from_frame(drop_df[key]))
+    df = df[~dropped]
     return df
 
-def add_song(df, album_url, category, song_url):
-    """Adds new song to discography dataframe.
+def song_get_row(album_url, category, song_url):
+    """Returns new discography row for given song as a list.
 
        Data is collected using the given variables (album_url, category, and song_url),
-       added to a temporary new dataframe before being concatenated to the original. This is
-       also used to add songs without albums (e.g. promo singles).
+       fetching and parsing the album and song pages once each. An empty
+       album_url is used for songs without albums (e.g. promo singles).
     """
     album_checker = True if album_url == '' else False
     album_url_checker = 'NA' if album_checker == True else album_url
     
-    album_page = 'NA' if album_checker == True else requests.get(album_url).text
-    album_selector = 'NA' if album_checker == True else Selector(text=album_page)
-
-    song_page = requests.get(song_url).text
-    song_selector = Selector(text=song_page)
+    album_selector = 'NA' if album_checker == True else genius_scrape.get_page(album_url)
+    song_selector = genius_scrape.get_page(song_url)
 
     album_title = 'NA' if album_url == '' else album_selector.xpath('//h1[contains(@class, "header_with_cover_art")]//text()').get()
     song_title = song_selector.xpath('//h1[contains(@class, "SongHeaderdesktop")]//text()').get()
@@ -63,27 +79,88 @@ def add_song(df, album_url, category, song_url):
     number_string = 'NA' if album_checker == True else song_selector.xpath('//div[contains(@class, "HeaderArtistAndTracklist")]/text()').get()
     number = 0 if album_checker == True else int(re.sub(r'\D','', number_string))
 
-    artists = genius_scrape.song_get_artists(song_url)
-    release_date, page_views = genius_scrape.song_get_metadata(song_url)
-    lyrics = genius_scrape.song_get_lyrics(song_url)
-    writers = genius_scrape.song_get_credits(song_url, 'writers')
-    producers = genius_scrape.song_get_credits(song_url, 'producers')
-    tags = genius_scrape.song_get_tags(song_url)
+    song = genius_scrape.parse_song(song_selector)
+
+    new_row = [album_title, album_url_checker, category, number, song_title, song_url, song['song_artists'], 
+               song['song_release_date'], song['song_page_views'], song['song_lyrics'], song['song_writers'], 
+               song['song_producers'], song['song_tags']]
+    return new_row
+
+def add_song(df, album_url, category, song_url):
+    """Adds new song to discography dataframe.
 
-    new_row = [album_title, album_url_checker, category, number, song_title, song_url, artists, release_date, page_views, lyrics, writers, producers, tags]
+       Data is collected using the given variables (album_url, category, and song_url),
+       added to a temporary new dataframe before being concatenated to the original. This is
+       also used to add songs without albums (e.g. promo singles).
+    """
+    new_row = song_get_row(album_url, category, song_url)
     new_df = pd.DataFrame([new_row], columns=df.columns)
     df = pd.concat([df, new_df], ignore_index=True)
     return df
 
-def add_songs_from_file(df, csv_name):
-    """Adds multiple songs at once from given CSV file."""
+def add_songs_from_file(df, csv_name, max_workers=1):
+    """Adds multiple songs at once from given CSV file.
+
+       Song pages are fetched in a thread pool of max_workers threads and
+       all new rows are concatenated to the dataframe in one go, in the
+       same order as the CSV.
+    """
+    return add_songs(df, read_song_rows(csv_name), max_workers)
+
+def read_song_rows(csv_name):
+    """Returns list of (album_url, category, song_url) tuples from given CSV file."""
     with open(csv_name, 'r') as csv_file:
         csv_reader = csv.DictReader(csv_file)
-        for row in csv_reader:
-            album_url = row['album_url']
-            category = row['category']
-            song_url = row['song_url']
-            df = add_song(df, album_url, category, song_url)
+        rows = [(row['album_url'], row['category'], row['song_url']) for row in csv_reader]
+    return rows
+
+def add_songs(df, rows, max_workers=1):
+    """Adds a song for every (album_url, category, song_url) tuple in rows, see add_songs_from_file."""
+    new_rows = fetcher.fetch_all(lambda row: song_get_row(*row), rows, max_workers)
+    if new_rows == []:
+        return df
+    new_df = pd.DataFrame(new_rows, columns=df.columns)
+    df = pd.concat([df, new_df], ignore_index=True)
+    return df
+
+def update_discography(df, artist=None, albums_dict=None, song_urls=None, max_age=None, 
+                       fields=None, max_workers=1):
+    """Re-scrapes only new, stale, or listed songs and merges them into df.
+
+       Songs are re-scraped if their URL is in song_urls, or, when max_age
+       (in seconds) is given, if their page in page_cache is older than
+       max_age or not cached at all. Only the columns in fields are
+       overwritten (default: every scraped song column), so e.g.
+       fields=['song_page_views'] refreshes page views while keeping earlier
+       credit name changes. If artist and albums_dict are given, songs on
+       those albums that aren't in df yet are scraped and appended; those
+       new rows still need the usual cleaning steps.
+    """
+    refresh_urls = set(song_urls or [])
+    if max_age is not None:
+        for url in df['song_url']:
+            entry = page_cache.read_entry(url)
+            if entry is None or page_cache.age(entry) > max_age:
+                refresh_urls.add(url)
+    # Songs on several albums share a URL, but each page is fetched once
+    refresh_urls = list(pd.unique(df['song_url'][df['song_url'].isin(refresh_urls)]))
+
+    if refresh_urls != []:
+        song_data = fetcher.fetch_all(lambda url: genius_scrape.song_get_data(url, refresh=True), 
+                                      refresh_urls, max_workers)
+        refreshed = pd.DataFrame(song_data, index=refresh_urls)
+        fields = list(refreshed.columns) if fields is None else fields
+        is_refreshed = df['song_url'].isin(refresh_urls)
+        df = df.copy()
+        for field in fields:
+            new_values = df['song_url'].map(refreshed[field])
+            df[field] = new_values.where(is_refreshed, df[field]).astype(df[field].dtype)
+
+    if artist is not None and albums_dict is not None:
+        known_songs = set(df['song_url']) | set(df['song_title'])
+        new_df = genius_scrape.create_discography(artist, albums_dict, max_workers, skip_songs=known_songs)
+        if len(new_df) > 0:
+            df = pd.concat([df, new_df], ignore_index=True)
     return df
 
 def change_credit_name(series, old_name, new_name):
@@ -92,49 +169,287 @@ def change_credit_name(series, old_name, new_name):
        Can only be done in song_artists, song_writers, or song_producers
        since this function assumes a list value in series.
     """
-    series = series.apply(lambda list: [new_name if string == old_name else string for string in list])
-    return series
+    return rename_credits(series, {old_name: new_name})
 
-def convert_to_db(df, db_name):
-    """Converts discography dataframe to a SQLite database.
+def rename_credits(series, names, merged_names=None):
+    """Changes names of individuals in song credits in one pass.
 
-       By default makes six tables (albums, songs, artists, writers,
-       producers, tags), replacing them if they already exist.
+       Every name in the list column is looked up in names, a dictionary of
+       {'old name': 'new name'}, after exploding the lists into one long
+       series, and the lists are then put back together in their original
+       order. Names not in names (and NaN) are kept as they are, and so
+       are cells that aren't lists. A name in merged_names is kept once per
+       song, so merging two spellings of one person doesn't credit them
+       twice.
     """
-    connection = sql.connect(db_name)
+    if names == {} and not merged_names:
+        return series
+    values = series.reset_index(drop=True)
+    has_credits = values.map(lambda value: isinstance(value, list) and len(value) > 0)
+    credits = values[has_credits].explode()
+    renamed = credits.map(names)
+    credits = renamed.where(renamed.notna(), credits)
+
+    if merged_names:
+        pairs = pd.DataFrame({'song': credits.index, 'name': credits.to_numpy()})
+        repeated = pairs.duplicated() & pairs['name'].isin(merged_names)
+        credits = credits[~repeated.to_numpy()]
+
+    lists = credits.groupby(level=0, sort=False).agg(list).to_dict()
+    cells = [lists.get(position, value) for position, value in enumerate(values)]
+    return pd.Series(cells, index=series.index, name=series.name, dtype=object)
+
+def read_cleaning_rules(csv_name):
+    """Returns dataframe of cleaning rules from given CSV file.
+
+       The CSV has one rule per row and the columns action, column, value,
+       and new_value:
+           drop_duplicates: drops songs repeating a column value (e.g.
+                            song_title), keeping the first
+           drop: drops songs whose column is value
+           drop_file: drops songs whose column is in the CSV file value,
+                      like drop_songs_from_file
+           add_file: adds the songs in the CSV file value, like
+                     add_songs_from_file
+           rename: changes value to new_value in list column column
+           merge: like rename, but the new name is kept once per song
+    """
+    rules = pd.read_csv(csv_name, dtype=str, keep_default_na=False)
+    rules = rules.reindex(columns=['action', 'column', 'value', 'new_value'], fill_value='')
+    unknown = rules.loc[~rules['action'].isin(cleaning_actions), 'action']
+    if len(unknown) > 0:
+        raise ValueError('Unknown cleaning rule in {}: {}'.format(csv_name, ', '.join(unknown.unique())))
+    return rules
+
+def _final_name(name, names):
+    seen = set()
+    while name in names:
+        if name in seen:
+            raise ValueError('Cleaning rules rename {} in a cycle'.format(name))
+        seen.add(name)
+        name = names[name]
+    return name
+
+def compile_cleaning_rules(rules):
+    """Compiles cleaning rules into the lookups apply_cleaning_rules runs.
 
-    albums = df[['album_title','album_url', 'category']].drop_duplicates(subset=['album_title','album_url'])
+       Drops from every rule and file are collected into one set of values
+       per column, and renames into one dictionary per column, with chains
+       (a to b, b to c) resolved to their final name.
+
+       Args:
+           rules: str (rules CSV) or dataframe from read_cleaning_rules
+    """
+    if isinstance(rules, str):
+        rules = read_cleaning_rules(rules)
+    compiled = {'drop_duplicates': [], 'drops': {}, 'additions': [], 'renames': {}, 'merges': {}}
+    for rule in rules.itertuples(index=False):
+        match rule.action:
+            case 'drop_duplicates':
+                compiled['drop_duplicates'].append(rule.column)
+            case 'drop':
+                compiled['drops'].setdefault(rule.column, set()).add(rule.value)
+            case 'drop_file':
+                drop_df = pd.read_csv(rule.value, dtype=str, keep_default_na=False)
+                compiled['drops'].setdefault(rule.column, set()).update(drop_df[rule.column])
+            case 'add_file':
+                compiled['additions'].extend(read_song_rows(rule.value))
+            case 'rename' | 'merge':
+                compiled['renames'].setdefault(rule.column, {})[rule.value] = rule.new_value
+                if rule.action == 'merge':
+                    compiled['merges'].setdefault(rule.column, set()).add(rule.new_value)
+
+    for column, names in compiled['renames'].items():
+        compiled['renames'][column] = {old_name: _final_name(old_name, names) for old_name in names}
+        merged = compiled['merges'].get(column, set())
+        compiled['merges'][column] = {_final_name(name, names) for name in merged}
+    return compiled
+
+def apply_cleaning_rules(df, rules, max_workers=1):
+    """Cleans discography dataframe with a rules file (see read_cleaning_rules).
+
+       Rules run in the same stages as the data collection notebook, not in
+       file order: duplicates are dropped, then every listed song in one
+       pass, then the added songs are scraped (in a thread pool of
+       max_workers threads) and appended, and finally every rename and
+       merge of a column is applied with one rename_credits call.
+
+       Args:
+           df: discography dataframe
+           rules: str (rules CSV), dataframe from read_cleaning_rules, or
+                  dictionary from compile_cleaning_rules
+    """
+    compiled = rules if isinstance(rules, dict) else compile_cleaning_rules(rules)
+    for column in compiled['drop_duplicates']:
+        df = df.drop_duplicates(subset=[column])
+
+    dropped = pd.Series(False, index=df.index)
+    for column, values in compiled['drops'].items():
+        dropped |= df[column].isin(values)
+    df = df[~dropped]
+
+    df = add_songs(df, compiled['additions'], max_workers)
+
+    df = df.copy()
+    for column, names in compiled['renames'].items():
+        df[column] = rename_credits(df[column], names, compiled['merges'].get(column))
+    return df
+
+def db_tables(df, artist=None):
+    """Splits discography dataframe into the tables of the database.
+
+       Songs are grouped into catalogs by the dataframe's artist column
+       (see catalogs.ingest_catalogs); without one, every song belongs to
+       artist (default_artist if None). Returns dictionary of
+       {'table name': dataframe} in the order the tables have to be
+       loaded, with catalog_id/album_id/song_id keys assigned.
+    """
+    df = df.reset_index(drop=True)
+    if 'artist' not in df.columns:
+        df['artist'] = default_artist if artist is None else artist
+
+    catalogs = pd.DataFrame({'artist': df['artist'].unique()})
+    catalogs.insert(0, 'catalog_id', catalogs.index + 1)
+    df['catalog_id'] = df['artist'].map(catalogs.set_index('artist')['catalog_id'])
+
+    album_keys = ['catalog_id', 'album_title', 'album_url']
+    albums = df[album_keys + ['category']].drop_duplicates(subset=album_keys)
     albums.reset_index(inplace=True, drop=True)
-    albums.to_sql('albums', connection, if_exists='replace', index=False)
+    albums.insert(0, 'album_id', albums.index + 1)
     
-    songs = df[['song_title','album_title', 'album_track_number', 'song_url', 'song_release_date', 'song_page_views']]
-    songs.reset_index(inplace=True, drop=True)
-    songs.to_sql('songs', connection, if_exists='replace', index=False)
+    songs = df[['catalog_id', 'song_title','album_title', 'album_url', 'album_track_number', 'song_url', 
+                'song_release_date', 'song_page_views']]
+    songs = songs.merge(albums[['album_id'] + album_keys], how='left', on=album_keys)
+    songs.insert(0, 'song_id', songs.index + 1)
+    songs = songs[['song_id', 'album_id', 'song_title', 'album_title', 'album_track_number', 'song_url', 
+                   'song_release_date', 'song_page_views']]
+
+    df.insert(0, 'song_id', songs['song_id'])
 
-    artists = df[['song_title', 'song_artists']].explode(['song_artists'])
+    artists = df[['song_id', 'song_title', 'song_artists']].explode(['song_artists'])
     artists.rename(columns={'song_artists': 'song_artist'}, inplace=True)
-    artists.reset_index(inplace=True, drop=True)
-    artists.to_sql('artists', connection, if_exists='replace', index=False)
     
-    writers = df[['song_title', 'song_writers']].explode(['song_writers'])
+    writers = df[['song_id', 'song_title', 'song_writers']].explode(['song_writers'])
     writers.rename(columns={'song_writers': 'song_writer'}, inplace=True)
-    writers.reset_index(inplace=True, drop=True)
-    writers.to_sql('writers', connection, if_exists='replace', index=False)
     
-    producers = df[['song_title', 'song_producers']].explode(['song_producers'])
+    producers = df[['song_id', 'song_title', 'song_producers']].explode(['song_producers'])
     producers.rename(columns={'song_producers': 'song_producer'}, inplace=True)
-    producers.reset_index(inplace=True, drop=True)
-    producers.to_sql('producers', connection, if_exists='replace', index=False)
     
-    tags = df[['song_title', 'song_tags']].explode(['song_tags'])
+    tags = df[['song_id', 'song_title', 'song_tags']].explode(['song_tags'])
     tags.rename(columns={'song_tags': 'song_tag'}, inplace=True)
-    tags.reset_index(inplace=True, drop=True)
-    tags.to_sql('tags', connection, if_exists='replace', index=False)
 
-    lyrics = df[['song_title', 'song_lyrics']].copy()
+    lyrics = df[['song_id', 'song_title', 'song_lyrics']].copy()
     lyrics['lyric_order'] = df['song_lyrics'].apply(lambda lyrics: [index + 1 for index, _ in enumerate(lyrics)])
     lyrics = lyrics.explode(['song_lyrics', 'lyric_order'])
     lyrics.rename(columns={'song_lyrics': 'song_lyric'}, inplace=True)
-    lyrics.reset_index(inplace=True, drop=True)
-    lyrics.to_sql('lyrics', connection, if_exists='replace', index=False)
-    connection.close()
\ No newline at end of file
+
+    tables = {'catalogs': catalogs,
+              'albums': albums,
+              'songs': songs,
+              'artists': artists,
+              'writers': writers,
+              'producers': producers,
+              'tags': tags,
+              'lyrics': lyrics}
+    return tables
+
+def db_rows(table_df):
+    """Returns rows of given table dataframe as tuples ready for sqlite3.
+
+       Timestamps are written in the same text format as DataFrame.to_sql
+       and missing values become NULL.
+    """
+    table_df = table_df.copy()
+    for column in table_df.select_dtypes(include='datetime').columns:
+        table_df[column] = table_df[column].dt.strftime('%Y-%m-%d %H:%M:%S')
+    table_df = table_df.astype(object).where(table_df.notna(), None)
+    return list(table_df.itertuples(index=False, name=None))
+
+def insert_rows(connection, table_name, table_df):
+    """Inserts all rows of given dataframe into table with one executemany."""
+    columns = ', '.join(table_df.columns)
+    placeholders = ', '.join(['?'] * len(table_df.columns))
+    query = 'INSERT INTO {} ({}) VALUES ({})'.format(table_name, columns, placeholders)
+    connection.executemany(query, db_rows(table_df))
+
+def compute_data_version(connection):
+    """Returns SHA-256 hash of every row in the discography tables.
+
+       Identifies the data in a database regardless of when it was built.
+    """
+    data_hash = hashlib.sha256()
+    for table_name in ['catalogs', 'albums', 'songs', 'artists', 'writers', 'producers', 'tags', 'lyrics']:
+        for row in connection.execute('SELECT * FROM {} ORDER BY rowid'.format(table_name)):
+            data_hash.update(repr(row).encode('utf-8'))
+    return data_hash.hexdigest()
+
+def materialize_analytics(connection):
+    """Builds the derived tables the app pages read into the database.
+
+       Runs every script in analytics_scripts, then stamps build_info with
+       toolkit.analytics_version, the data version, and the build time.
+    """
+    for script in analytics_scripts:
+        connection.executescript(toolkit.sql_to_string(script))
+
+    connection.execute('CREATE TABLE IF NOT EXISTS build_info (key TEXT PRIMARY KEY, value TEXT)')
+    build_info = [('analytics_version', toolkit.analytics_version),
+                  ('data_version', compute_data_version(connection)),
+                  ('built_at', datetime.now().isoformat(timespec='seconds'))]
+    connection.executemany('INSERT OR REPLACE INTO build_info (key, value) VALUES (?, ?)', build_info)
+    connection.commit()
+
+def build_analytics(db_name):
+    """Materializes the app's derived tables into an existing database."""
+    connection = sql.connect(db_name)
+    materialize_analytics(connection)
+    connection.close()
+
+def convert_to_db(df, db_name, artist=None):
+    """Converts discography dataframe to a SQLite database.
+
+       By default makes eight tables (catalogs, albums, songs, artists,
+       writers, producers, tags, lyrics), replacing them if they already
+       exist. The schema comes from sql/create_schema.sql: catalogs, albums,
+       and songs get integer keys (catalog_id, album_id, song_id) that the
+       other tables reference, and the join columns are indexed. Every
+       album belongs to the catalog of one artist, see db_tables for the
+       artist argument.
+
+       The derived tables read by the app, including the lyrics_fts
+       full-text index, are materialized as well (see
+       materialize_analytics). The database is built in a temporary file
+       next to db_name, loaded in a single transaction with bulk-load
+       pragmas, and then swapped in with os.replace, so readers only ever
+       see a complete database.
+    """
+    tables = db_tables(df, artist)
+    temp_name = '{}.tmp'.format(db_name)
+    if os.path.exists(temp_name):
+        os.remove(temp_name)
+
+    connection = sql.connect(temp_name, isolation_level=None)
+    try:
+        connection.execute('PRAGMA journal_mode = MEMORY')
+        connection.execute('PRAGMA synchronous = OFF')
+        connection.execute('PRAGMA foreign_keys = ON')
+        connection.executescript(toolkit.sql_to_string('create_schema.sql'))
+
+        connection.execute('BEGIN')
+        for table_name, table_df in tables.items():
+            insert_rows(connection, table_name, table_df)
+        connection.execute('COMMIT')
+
+        materialize_analytics(connection)
+        connection.execute('ANALYZE')
+        connection.execute('PRAGMA journal_mode = DELETE')
+        connection.close()
+    except BaseException:
+        connection.close()
+        os.remove(temp_name)
+        raise
+
+    # Making sure the finished file is on disk before replacing the old one
+    with open(temp_name, 'rb') as db_file:
+        os.fsync(db_file.fileno())
+    os.replace(temp_name, db_name)
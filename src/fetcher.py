@@ -0,0 +1,216 @@
+"""Functions handling the HTTP requests made during the webscraping process."""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import page_cache
+
+settings = {'timeout': 15,
+            'retries': 4,
+            'backoff': 0.5,
+            'pool_size': 16}
+
+retry_statuses = [429, 500, 502, 503, 504]
+
+# One pooled session shared by every thread
+_session = None
+_session_lock = threading.Lock()
+
+_stats = {'requests': 0, 'bytes': 0, 'retries': 0}
+_stats_lock = threading.Lock()
+
+# Per-host rate limiting, shared by every thread
+_rate_lock = threading.Lock()
+_next_slot = {}
+_min_interval = 0.1
+
+def configure(**options):
+    """Updates HTTP settings and starts a new session on the next request.
+
+       Options:
+           timeout: float, seconds to wait for a connection or response
+           retries: int, extra attempts after a 429/5xx or network error
+           backoff: float, base seconds for exponential backoff
+           pool_size: int, keep-alive connections kept per host
+    """
+    global _session
+    for option, value in options.items():
+        if option not in settings:
+            raise KeyError('Unknown HTTP setting: {}'.format(option))
+        settings[option] = value
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+def get_session():
+    """Returns the shared requests session with pooled keep-alive connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            adapter = HTTPAdapter(pool_connections=settings['pool_size'], 
+                                  pool_maxsize=settings['pool_size'])
+            _session = requests.Session()
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
+
+def _count(stat, amount=1):
+    with _stats_lock:
+        _stats[stat] += amount
+
+def stats():
+    """Returns counts of requests sent, bytes received, and retries made."""
+    with _stats_lock:
+        return dict(_stats)
+
+def reset_stats():
+    """Sets all request counters back to zero."""
+    with _stats_lock:
+        for stat in _stats:
+            _stats[stat] = 0
+
+def _retry_delay(attempt, response=None):
+    retry_after = None if response is None else response.headers.get('Retry-After')
+    if retry_after is not None and retry_after.isdigit():
+        return int(retry_after)
+    delay = settings['backoff'] * 2 ** attempt
+    return delay + random.uniform(0, settings['backoff'])
+
+def get(url, headers=None):
+    """Sends GET request for given URL through the shared session.
+
+       429 and 5xx responses, timeouts, and connection errors are retried
+       with exponential backoff (honouring Retry-After) up to
+       settings['retries'] times, and a requests.HTTPError is raised if the
+       last attempt still gets one. Every attempt waits for the rate limit.
+    """
+    for attempt in range(settings['retries'] + 1):
+        last_attempt = attempt == settings['retries']
+        wait_for_host(url)
+        _count('requests')
+        try:
+            response = get_session().get(url, headers=headers, timeout=settings['timeout'])
+        except (requests.ConnectionError, requests.Timeout):
+            if last_attempt:
+                raise
+            _count('retries')
+            time.sleep(_retry_delay(attempt))
+            continue
+
+        _count('bytes', len(response.content))
+        if response.status_code in retry_statuses:
+            if last_attempt:
+                response.raise_for_status()
+            _count('retries')
+            time.sleep(_retry_delay(attempt, response))
+            continue
+        return response
+
+def set_rate_limit(requests_per_second):
+    """Sets the maximum number of requests per second sent to one host.
+
+       Defaults to 10 requests per second; None or 0 removes the limit.
+    """
+    global _min_interval
+    _min_interval = 1 / requests_per_second if requests_per_second else 0
+
+@contextmanager
+def rate_limited(requests_per_second):
+    """Applies set_rate_limit inside a with block, restoring the previous limit after it."""
+    global _min_interval
+    previous = _min_interval
+    set_rate_limit(requests_per_second)
+    try:
+        yield
+    finally:
+        _min_interval = previous
+
+def wait_for_host(url):
+    """Blocks until the rate limit allows another request to the URL's host."""
+    if _min_interval == 0:
+        return
+    host = urlsplit(url).netloc
+    with _rate_lock:
+        now = time.monotonic()
+        slot = max(now, _next_slot.get(host, now))
+        _next_slot[host] = slot + _min_interval
+    if slot > now:
+        time.sleep(slot - now)
+
+def fetch_text(url, refresh=False):
+    """Returns the HTML text of given URL.
+
+       Pages are served from page_cache while they are younger than its TTL
+       (unless refresh is True); expired pages are revalidated with their
+       ETag/Last-Modified headers. In offline mode only cached pages are
+       returned and a LookupError is raised for anything else. Responses
+       other than 200 (or 304 for a cached page) raise requests.HTTPError.
+    """
+    use_cache = page_cache.settings['enabled']
+    entry = page_cache.read_entry(url) if use_cache else None
+
+    if entry is not None and page_cache.settings['offline']:
+        return page_cache.read_text(entry)
+    if page_cache.settings['offline']:
+        raise LookupError('{} is not cached and offline mode is on'.format(url))
+    if entry is not None and refresh == False and page_cache.is_fresh(entry):
+        return page_cache.read_text(entry)
+
+    headers = {}
+    if entry is not None and page_cache.settings['revalidate']:
+        headers = page_cache.validators(entry)
+
+    response = get(url, headers)
+
+    if response.status_code == 304 and entry is not None:
+        page_cache.touch(entry)
+        return page_cache.read_text(entry)
+    if response.status_code != 200:
+        raise requests.HTTPError('{} {} for url: {}'.format(response.status_code, response.reason, url),
+                                 response=response)
+    page = response.text
+    if use_cache:
+        page_cache.store(url, page, response.headers)
+    return page
+
+def fetch_all(func, items, max_workers=1):
+    """Applies func to every item in a bounded thread pool.
+
+       Results are returned in the same order as items. With max_workers
+       set to 1, items are processed one after another in this thread.
+    """
+    if max_workers <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(func, items))
+    return results
+
+def fetch_iter(func, items, max_workers=1):
+    """Yields func(item) for every item, in the same order as items.
+
+       Like fetch_all, but items are consumed lazily and each result is
+       yielded as soon as it and the ones before it are done, with at most
+       2 * max_workers items in flight. With max_workers set to 1, items
+       are processed one after another in this thread.
+    """
+    if max_workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
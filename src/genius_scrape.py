@@ -5,9 +5,14 @@ import re
 from datetime import datetime
 
 import pandas as pd
-import requests
 from parsel import Selector
 
+from . import fetcher
+
+discography_columns = ['album_title', 'album_url', 'category', 'album_track_number', 'song_title', 
+                       'song_url', 'song_artists', 'song_release_date', 'song_page_views', 
+                       'song_lyrics', 'song_writers', 'song_producers', 'song_tags']
+
 def create_dict_from_file(csv_name):
     """Creates album dictionary from given CSV file.
 
@@ -35,14 +40,24 @@ def album_clean_titles(album_list):
         cleaned.append(title)
     return cleaned
 
+def get_page(url, refresh=False):
+    """Returns parsel Selector of given Genius URL.
+
+       Each page is fetched and parsed once here so every field can be
+       pulled from the same tree. With refresh, a cached copy of the page
+       is not used without checking Genius first.
+    """
+    page = fetcher.fetch_text(url, refresh)
+    selector = Selector(text=page)
+    return selector
+
 def album_get_tracklist(album_url):
     """Returns tracklist of given Genius album URL.
 
       Includes track number, song title, and link to the lyrics page
       for each song.
    """
-    album_page = requests.get(album_url).text
-    selector = Selector(text=album_page)
+    selector = get_page(album_url)
     
     number = selector.xpath(
         '//div[@class="chart_row-number_container chart_row-number_container--align_left"]/span/span/text()'
@@ -63,15 +78,12 @@ def album_get_tracklist(album_url):
             'song_url': url} for number, title, url in zip(number, clean_track, url)]
     return tracklist
 
-def song_get_artists(song_url):
-    """Returns artist(s)/performer(s) of given Genius song URL.
+def parse_artists(selector):
+    """Returns artist(s)/performer(s) from parsed Genius song page.
 
        Also checks if there's a feature on the song; if yes, the featured
        artist/performer is included.
     """
-    song_page = requests.get(song_url).text
-    selector = Selector(text=song_page)
-
     raw_artists = selector.xpath('//div[@class="HeaderArtistAndTracklistdesktop__Container-sc-4vdeb8-0 hjExsS"]/span/span//text()').get()
     artists = re.split(r',\s|\s&\s', raw_artists)
 
@@ -83,10 +95,8 @@ def song_get_artists(song_url):
         artists.extend(feat)
     return artists
 
-def song_get_metadata(song_url):
-    """Returns song release date and page views of Given song URL."""
-    song_page = requests.get(song_url).text
-    selector = Selector(text=song_page)
+def parse_metadata(selector):
+    """Returns song release date and page views from parsed Genius song page."""
     metadata = selector.xpath('//div[contains(@class,"MetadataStats__Container")]/span/span/text()').getall()
 
     date_check = len(metadata) >= 1 and 'viewer' not in metadata[0]
@@ -114,27 +124,21 @@ def song_get_metadata(song_url):
         views = 0
     return date, views
 
-def song_get_lyrics(song_url):
-    """Returns list of lyrics of given Genius song URL."""
-    song_page = requests.get(song_url).text
-    selector = Selector(text=song_page)
-
+def parse_lyrics(selector):
+    """Returns list of lyrics from parsed Genius song page."""
     raw_lyrics = selector.xpath('//div[@data-lyrics-container="true"]//text()').getall()
     lyrics_list = [re.sub(r'\u2005', ' ', lyric) for lyric in raw_lyrics]
     brackets = re.compile(r'\[.*?\]')
     lyrics = [lyric for lyric in lyrics_list if bool(brackets.match(lyric)) == False]
     return lyrics
 
-def song_get_tags(song_url):
-    """Returns genre tags of given Genius song URL."""
-    song_page = requests.get(song_url).text
-    selector = Selector(text=song_page)
-
+def parse_tags(selector):
+    """Returns genre tags from parsed Genius song page."""
     tags = selector.xpath('//div[@class="SongTags__Container-xixwg3-1 bZsZHM"]//text()').getall()
     return tags
 
-def song_get_credits(song_url, credit):
-    """Returns list of writers/producers of given Genius song URL.
+def parse_credits(selector, credit):
+    """Returns list of writers/producers from parsed Genius song page.
 
        Variable 'credit' has to be either 'producers' or 'writers' and will
        return list of names.
@@ -144,8 +148,6 @@ def song_get_credits(song_url, credit):
     if credit == 'producers':
         query = ['Producer', 'Producers']
     
-    song_page = requests.get(song_url).text
-    selector = Selector(text=song_page)
     div_path = '//div[contains(@class,"SongInfo__Credit")]/div[preceding-sibling::div[contains(@class,"SongInfo__Label") and text()="{}"]]//text()'
     
     raw_list = selector.xpath(div_path.format(query[0])).getall()
@@ -156,51 +158,95 @@ def song_get_credits(song_url, credit):
     credits = [name for name in raw_list if name not in dropped]
     return credits
 
-def create_discography(artist, albums_dict):
-    """Compiles all webscraping data into one discography dataframe."""
+def parse_song(selector):
+    """Returns dictionary of every song field from parsed Genius song page.
+
+       Keys match the song columns of the discography dataframe.
+    """
+    release_date, page_views = parse_metadata(selector)
+    song = {'song_artists': parse_artists(selector),
+            'song_release_date': release_date,
+            'song_page_views': page_views,
+            'song_lyrics': parse_lyrics(selector),
+            'song_writers': parse_credits(selector, 'writers'),
+            'song_producers': parse_credits(selector, 'producers'),
+            'song_tags': parse_tags(selector)}
+    return song
+
+def song_get_data(song_url, refresh=False):
+    """Returns every song field of given Genius song URL from one request."""
+    return parse_song(get_page(song_url, refresh))
+
+def song_get_artists(song_url):
+    """Returns artist(s)/performer(s) of given Genius song URL.
+
+       Also checks if there's a feature on the song; if yes, the featured
+       artist/performer is included.
+    """
+    return parse_artists(get_page(song_url))
+
+def song_get_metadata(song_url):
+    """Returns song release date and page views of Given song URL."""
+    return parse_metadata(get_page(song_url))
+
+def song_get_lyrics(song_url):
+    """Returns list of lyrics of given Genius song URL."""
+    return parse_lyrics(get_page(song_url))
+
+def song_get_tags(song_url):
+    """Returns genre tags of given Genius song URL."""
+    return parse_tags(get_page(song_url))
+
+def song_get_credits(song_url, credit):
+    """Returns list of writers/producers of given Genius song URL.
+
+       Variable 'credit' has to be either 'producers' or 'writers' and will
+       return list of names.
+    """
+    return parse_credits(get_page(song_url), credit)
+
+def iter_discography(artist, albums_dict, max_workers=1, skip_songs=None):
+    """Yields one discography record (dict) per song, in album and track order.
+
+       Album tracklists and song pages are fetched lazily in a thread pool
+       of max_workers threads (see fetcher.fetch_iter), so the first songs
+       are yielded while the rest are still being scraped and only a few
+       pages are held in memory at once. Record keys are
+       discography_columns. Tracks whose song URL or title is in skip_songs
+       are left out without fetching their pages.
+    """
     albums = list(albums_dict.keys())
     eras = list(albums_dict.values())
     cleaned_albums = album_clean_titles(albums)
     cleaned_artist = artist_clean_name(artist)
     album_urls = ['https://genius.com/albums/{}/{}'.format(cleaned_artist, title) for title in cleaned_albums]
 
-    tracklists = [album_get_tracklist(url) for url in album_urls]
-
-    song_urls = [track['song_url'] for list in tracklists for track in list]
-
-    song_artists = [song_get_artists(song) for song in song_urls]
-    song_metadata = [song_get_metadata(song) for song in song_urls]
-    song_release_date, song_page_views = [list(field) for field in list(zip(*song_metadata))]
-    song_lyrics = [song_get_lyrics(song) for song in song_urls]
-    song_writers = [song_get_credits(song, 'writers') for song in song_urls]
-    song_producers = [song_get_credits(song, 'producers') for song in song_urls]
-    song_tags = [song_get_tags(song) for song in song_urls]
-
-    list_index = 0
-
-    for album in tracklists:
-        for track in album:
-            track.update({'song_artists':song_artists[list_index],
-                          'song_release_date':song_release_date[list_index],
-                          'song_page_views':song_page_views[list_index], 
-                          'song_lyrics':song_lyrics[list_index], 
-                          'song_writers': song_writers[list_index], 
-                          'song_producers': song_producers[list_index], 
-                          'song_tags': song_tags[list_index]})
-            list_index += 1
-        
-    collection = [{'album_title': album,
-                   'album_url': url,
-                   'category': era,
-                   'album_tracklist': list} for album, url, era, list in zip(albums, 
-                                                                                   album_urls, 
-                                                                                   eras, 
-                                                                                   tracklists)]
-    raw_df = pd.json_normalize(data=collection, record_path='album_tracklist', meta=['album_title', 
-                                                                           'album_url', 
-                                                                           'category'])
-    
-    df = raw_df.reindex(columns=['album_title', 'album_url', 'category', 'album_track_number', 'song_title', 
-                                 'song_url', 'song_artists', 'song_release_date', 'song_page_views', 
-                                 'song_lyrics', 'song_writers', 'song_producers', 'song_tags'])
-    return df
\ No newline at end of file
+    tracklists = fetcher.fetch_iter(album_get_tracklist, album_urls, max_workers)
+
+    def tracks():
+        for album, url, era, tracklist in zip(albums, album_urls, eras, tracklists):
+            for track in tracklist:
+                if skip_songs is not None and (track['song_url'] in skip_songs or track['song_title'] in skip_songs):
+                    continue
+                yield {'album_title': album, 'album_url': url, 'category': era, **track}
+
+    # Each song page is fetched and parsed once for all fields
+    def scrape(track):
+        track.update(song_get_data(track['song_url']))
+        return {column: track.get(column) for column in discography_columns}
+
+    yield from fetcher.fetch_iter(scrape, tracks(), max_workers)
+
+def create_discography(artist, albums_dict, max_workers=1, skip_songs=None):
+    """Compiles all webscraping data into one discography dataframe.
+
+       Pages are fetched in a thread pool of max_workers threads (default 1,
+       one page at a time). Requests per host are capped by
+       fetcher.set_rate_limit, and the resulting dataframe is the same
+       regardless of max_workers. Tracks whose song URL or title is in
+       skip_songs are left out without fetching their pages. See
+       iter_discography for the song records.
+    """
+    records = iter_discography(artist, albums_dict, max_workers, skip_songs)
+    df = pd.DataFrame(list(records), columns=discography_columns)
+    return df
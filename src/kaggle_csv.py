@@ -0,0 +1,114 @@
+"""Imports and exports the discography CSV released on Kaggle.
+
+   data/kaggle/ts_discography_released.csv is the clean discography
+   written with DataFrame.to_csv, so its list columns hold Python reprs
+   like "['Taylor Swift']". Instead of running ast.literal_eval on every
+   cell, list cells are split by one compiled regular expression and only
+   items with backslash escapes are decoded. The CSV is read in chunks,
+   and the lyrics, by far the largest column, can be left as raw text
+   until they're needed (see load_lyrics).
+
+   read_csv returns the same dataframe as the scraping notebook (text
+   track numbers, parsed release dates, list cells), so it can be passed
+   straight to discog_mods.convert_to_db.
+"""
+
+import os
+import re
+
+import pandas as pd
+
+from . import columnar
+from . import discog_mods
+from . import genius_scrape
+
+default_csv = 'data/kaggle/ts_discography_released.csv'
+
+# One quoted item of a list repr; repr quotes with ' unless the text has a ' and no "
+_item_pattern = re.compile(r"""'((?:[^'\\]|\\.)*)'|"((?:[^"\\]|\\.)*)\"""", re.DOTALL)
+_escape_pattern = re.compile(r"\\(x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|.)", re.DOTALL)
+_escapes = {'n': '\n', 't': '\t', 'r': '\r', '\\': '\\', "'": "'", '"': '"'}
+
+def _unescape(match):
+    escape = match.group(1)
+    if len(escape) > 1:
+        return chr(int(escape[1:], 16))
+    return _escapes.get(escape, match.group(0))
+
+def parse_list(cell):
+    """Returns list of strings from the repr of a list of strings.
+
+       Empty cells and NaN give an empty list.
+    """
+    if not isinstance(cell, str):
+        return []
+    items = [single or double for single, double in _item_pattern.findall(cell)]
+    if '\\' in cell:
+        items = [_escape_pattern.sub(_unescape, item) if '\\' in item else item for item in items]
+    return items
+
+def format_list(values):
+    """Returns the repr of a list of strings, as written by DataFrame.to_csv."""
+    return repr(list(values)) if isinstance(values, list) else '[]'
+
+def _parse_chunk(chunk, lazy_lyrics):
+    for column in columnar.list_columns:
+        if column in chunk.columns and (column != 'song_lyrics' or lazy_lyrics == False):
+            chunk[column] = chunk[column].map(parse_list)
+    if 'song_release_date' in chunk.columns:
+        chunk['song_release_date'] = pd.to_datetime(chunk['song_release_date'].replace('', None))
+    if 'song_page_views' in chunk.columns:
+        chunk['song_page_views'] = pd.to_numeric(chunk['song_page_views']).astype('int64')
+    return chunk
+
+def read_chunks(csv_name=default_csv, chunksize=100, columns=None, lazy_lyrics=False):
+    """Yields the CSV as discography dataframes of chunksize rows.
+
+       Args:
+           csv_name: str, default the Kaggle release
+           chunksize: int, default 100, rows per dataframe
+           columns: list, default None (all columns), columns to read
+           lazy_lyrics: bool, default False, keep song_lyrics as the raw
+                        repr text (see load_lyrics)
+    """
+    # Every cell is read as text, so 'NA' album titles and track numbers stay as they were written
+    reader = pd.read_csv(csv_name, dtype=str, keep_default_na=False, usecols=columns, chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            yield _parse_chunk(chunk, lazy_lyrics)
+
+def read_csv(csv_name=default_csv, chunksize=100, columns=None, lazy_lyrics=False):
+    """Reads the CSV into one discography dataframe, see read_chunks for the arguments."""
+    chunks = list(read_chunks(csv_name, chunksize, columns, lazy_lyrics))
+    if chunks == []:
+        return pd.DataFrame(columns=columns or genius_scrape.discography_columns)
+    return pd.concat(chunks, ignore_index=True)
+
+def load_lyrics(df):
+    """Returns df with song_lyrics parsed into lists, after read_csv(lazy_lyrics=True)."""
+    df = df.copy()
+    df['song_lyrics'] = df['song_lyrics'].map(lambda cell: cell if isinstance(cell, list) else parse_list(cell))
+    return df
+
+def write_csv(df, csv_name, chunksize=100):
+    """Writes discography dataframe to CSV in the format of the Kaggle release.
+
+       List cells are written as reprs and release dates as YYYY-MM-DD, so
+       read_csv gives back the same dataframe. The file is written next to
+       csv_name and then swapped in, chunksize rows at a time.
+    """
+    df = df.reindex(columns=genius_scrape.discography_columns)
+    temp_name = '{}.tmp'.format(csv_name)
+    with open(temp_name, 'w', newline='') as csv_file:
+        for start in range(0, max(len(df), 1), chunksize):
+            chunk = df.iloc[start:start + chunksize].copy()
+            for column in columnar.list_columns:
+                chunk[column] = chunk[column].map(format_list)
+            chunk.to_csv(csv_file, index=False, header=start == 0, date_format='%Y-%m-%d')
+    os.replace(temp_name, csv_name)
+
+def convert_csv_to_db(db_name, csv_name=default_csv, chunksize=100):
+    """Builds the discography database from the CSV instead of scraping Genius."""
+    df = read_csv(csv_name, chunksize)
+    discog_mods.convert_to_db(df, db_name)
+    return df
@@ -0,0 +1,261 @@
+"""Text analytics over the lyrics in the discography database.
+
+   All lyrics are tokenized once into a corpus of integer-coded tokens
+   (one code per vocabulary word, with the song and line each token came
+   from). Term-document matrices per song and per era are built from it as
+   SciPy sparse matrices, and word frequencies, n-grams, TF-IDF, and
+   era-to-era similarity are computed with vectorized NumPy/SciPy
+   operations.
+
+   The corpus and the reports are cached under cache_dir, keyed by the
+   database's data version (build_info) and cache_version, so they are
+   only recomputed when the data or this module's output changes.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import sqlite3 as sql
+from scipy import sparse
+
+from . import columnar
+from . import toolkit
+
+cache_dir = 'data/cache/lyric_analytics'
+
+# Bump whenever tokenization or the reports change, so old caches are ignored
+cache_version = '2'
+
+token_pattern = r"[a-z0-9]+(?:'[a-z]+)?"
+
+# Common English words left out of word frequencies and n-grams by default
+stop_words = ['a', 'about', 'all', 'am', 'an', 'and', 'are', 'as', 'at', 'be', 'been', 'but', 'by',
+              'can', 'could', 'did', 'do', 'for', 'from', 'had', 'has', 'have', 'he', 'her', 'him',
+              'his', 'how', 'i', "i'd", "i'll", "i'm", "i've", 'if', 'in', 'into', 'is', 'it', "it's",
+              'just', 'me', 'my', 'of', 'oh', 'on', 'or', 'our', 'over', 'she', 'so', 'that', "that's",
+              'the', 'their', 'them', 'then', 'there', 'they', 'this', 'to', 'up', 'us', 'was', 'we',
+              'were', 'what', 'when', 'where', 'who', 'will', 'with', 'would', 'you', "you'd", "you'll",
+              "you're", 'your']
+
+def era_names(categories):
+    """Returns era names of given categories (TTPD abbreviated, like the charts)."""
+    return pd.Series(categories).replace('The Tortured Poets Department', 'TTPD')
+
+def build_corpus(lines):
+    """Tokenizes lyric lines into an integer-coded corpus.
+
+       Args:
+           lines: dataframe with song_id, era, and song_lyric columns, one
+                  row per lyric line in song order
+
+       Returns dictionary of NumPy arrays:
+           tokens: int32, vocabulary code of every token
+           song: int32, song index of every token
+           line: int32, line index of every token
+           vocabulary: str, word of every code
+           song_ids: int64, song_id of every song index
+           song_era: int32, era index of every song index
+           eras: str, era of every era index (in toolkit.eras_order)
+    """
+    lines = lines.reset_index(drop=True)
+    song_index, song_ids = pd.factorize(lines['song_id'])
+
+    eras = era_names(lines['era'])
+    present = set(eras)
+    era_order = [era for era in toolkit.eras_order() if era in present]
+    era_order += sorted(present - set(era_order))
+    line_era = pd.Categorical(eras, era_order).codes
+
+    words = lines['song_lyric'].fillna('').str.lower().str.replace('\u2019', "'").str.findall(token_pattern)
+    words = words.explode().dropna()
+    tokens, vocabulary = pd.factorize(words, sort=True)
+    line_index = words.index.to_numpy()
+
+    song_era = np.zeros(len(song_ids), dtype=np.int32)
+    song_era[song_index] = line_era
+
+    return {'tokens': tokens.astype(np.int32),
+            'song': song_index[line_index].astype(np.int32),
+            'line': line_index.astype(np.int32),
+            'vocabulary': np.asarray(vocabulary, dtype=str),
+            'song_ids': np.asarray(song_ids, dtype=np.int64),
+            'song_era': song_era,
+            'eras': np.asarray(era_order, dtype=str)}
+
+def read_lines(connection):
+    """Reads every lyric line with its song_id and era from the database."""
+    return pd.read_sql(
+        """SELECT l.song_id, a.category AS era, l.song_lyric
+           FROM lyrics l
+           JOIN songs s ON s.song_id = l.song_id
+           JOIN albums a ON a.album_id = s.album_id
+           ORDER BY s.song_id, l.lyric_order""", connection)
+
+def corpus_from_dataset(file_name):
+    """Builds corpus from a columnar dataset (see columnar.save_columnar).
+
+       Only the category and song_lyrics columns are read.
+    """
+    df = columnar.read_columnar(file_name, ['category', 'song_lyrics'])
+    lines = df.rename(columns={'category': 'era', 'song_lyrics': 'song_lyric'})
+    lines['song_id'] = lines.index + 1
+    lines = lines.explode('song_lyric')
+    return build_corpus(lines[['song_id', 'era', 'song_lyric']])
+
+def data_version(db_name):
+    """Returns data version of given database from its build_info table."""
+    connection = sql.connect(db_name)
+    try:
+        version = toolkit.db_build_info(connection).get('data_version')
+    finally:
+        connection.close()
+    if version is None:
+        raise LookupError('{} has no data version; rebuild it with discog_mods.convert_to_db'.format(db_name))
+    return version
+
+def _cache_path(version, name):
+    return os.path.join(cache_dir, '{}-v{}'.format(version[:16], cache_version), name)
+
+def load_corpus(db_name, refresh=False):
+    """Returns corpus of given database, cached on disk per data version."""
+    path = _cache_path(data_version(db_name), 'corpus.npz')
+    if os.path.exists(path) and refresh == False:
+        with np.load(path, allow_pickle=False) as arrays:
+            return {name: arrays[name] for name in arrays.files}
+
+    connection = sql.connect(db_name)
+    try:
+        corpus = build_corpus(read_lines(connection))
+    finally:
+        connection.close()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + '.tmp.npz'
+    np.savez_compressed(temp_path, **corpus)
+    os.replace(temp_path, path)
+    return corpus
+
+def song_matrix(corpus):
+    """Returns sparse song x term matrix of token counts."""
+    ones = np.ones(len(corpus['tokens']), dtype=np.int32)
+    shape = (len(corpus['song_ids']), len(corpus['vocabulary']))
+    return sparse.csr_matrix((ones, (corpus['song'], corpus['tokens'])), shape=shape)
+
+def era_matrix(corpus):
+    """Returns sparse era x term matrix of token counts.
+
+       Made by multiplying an era x song indicator matrix with song_matrix.
+    """
+    n_songs = len(corpus['song_ids'])
+    indicator = sparse.csr_matrix((np.ones(n_songs, dtype=np.int32), (corpus['song_era'], np.arange(n_songs))),
+                                  shape=(len(corpus['eras']), n_songs))
+    return indicator @ song_matrix(corpus)
+
+def _stop_mask(corpus):
+    return np.isin(corpus['vocabulary'], stop_words)
+
+def word_frequencies(corpus, top=None, exclude_stop_words=True):
+    """Returns dataframe of words and their counts, most frequent first.
+
+       Columns are word, count, and songs (number of songs using the word).
+    """
+    matrix = song_matrix(corpus)
+    counts = np.asarray(matrix.sum(axis=0)).ravel()
+    songs = matrix.getnnz(axis=0)
+    keep = ~_stop_mask(corpus) if exclude_stop_words == True else np.ones(len(counts), dtype=bool)
+
+    order = np.argsort(-counts[keep], kind='stable')[:top]
+    codes = np.flatnonzero(keep)[order]
+    return pd.DataFrame({'word': corpus['vocabulary'][codes],
+                         'count': counts[codes],
+                         'songs': songs[codes]})
+
+def ngrams(corpus, n=2, top=25, exclude_stop_words=True):
+    """Returns dataframe of the most frequent n-grams and their counts.
+
+       N-grams are runs of n tokens within one lyric line. With
+       exclude_stop_words, n-grams made only of stop words are dropped.
+    """
+    tokens, lines = corpus['tokens'], corpus['line']
+    if len(tokens) < n:
+        return pd.DataFrame(columns=['ngram', 'count'])
+    starts = np.arange(len(tokens) - n + 1)
+    same_line = lines[starts] == lines[starts + n - 1]
+    grams = np.stack([tokens[starts + offset] for offset in range(n)], axis=1)[same_line]
+    if exclude_stop_words == True:
+        grams = grams[~_stop_mask(corpus)[grams].all(axis=1)]
+
+    unique, counts = np.unique(grams, axis=0, return_counts=True)
+    order = np.argsort(-counts, kind='stable')[:top]
+    words = corpus['vocabulary'][unique[order]]
+    return pd.DataFrame({'ngram': [' '.join(gram) for gram in words],
+                         'count': counts[order]})
+
+def tf_idf(matrix):
+    """Returns TF-IDF weights of given sparse document x term count matrix.
+
+       Term frequencies are sublinear, 1 + log(count), and IDF is
+       unsmoothed, log(documents / document frequency), so words found in
+       every document weigh 0. Every row is scaled to unit length.
+    """
+    matrix = sparse.csr_matrix(matrix, dtype=np.float64)
+    matrix.eliminate_zeros()
+    n_docs = matrix.shape[0]
+    doc_freq = np.maximum(matrix.getnnz(axis=0), 1)
+    idf = np.log(n_docs / doc_freq)
+    matrix.data = 1 + np.log(matrix.data)
+    weights = matrix @ sparse.diags(idf)
+    norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ weights
+
+def era_top_terms(corpus, top=10, exclude_stop_words=True):
+    """Returns dataframe of the highest TF-IDF words per era.
+
+       Columns are era, rank, word, and tf_idf; eras are the documents, so
+       words that are frequent in one era but rare in the others rank first.
+    """
+    weights = tf_idf(era_matrix(corpus)).toarray()
+    if exclude_stop_words == True:
+        weights[:, _stop_mask(corpus)] = 0
+    order = np.argsort(-weights, axis=1, kind='stable')[:, :top]
+    rows = np.repeat(np.arange(weights.shape[0]), order.shape[1])
+    return pd.DataFrame({'era': corpus['eras'][rows],
+                         'rank': np.tile(np.arange(1, order.shape[1] + 1), weights.shape[0]),
+                         'word': corpus['vocabulary'][order.ravel()],
+                         'tf_idf': weights[rows, order.ravel()]})
+
+def era_similarity(corpus):
+    """Returns era x era dataframe of cosine similarity of TF-IDF vectors."""
+    weights = tf_idf(era_matrix(corpus))
+    similarity = (weights @ weights.T).toarray()
+    return pd.DataFrame(similarity, index=corpus['eras'], columns=corpus['eras'])
+
+def compute_reports(corpus, top=25):
+    """Returns dictionary of {'report name': dataframe} for given corpus."""
+    similarity = era_similarity(corpus)
+    similarity.index.name = 'era'
+    return {'word_frequencies': word_frequencies(corpus, top),
+            'bigrams': ngrams(corpus, 2, top),
+            'trigrams': ngrams(corpus, 3, top),
+            'era_top_terms': era_top_terms(corpus),
+            'era_similarity': similarity.reset_index()}
+
+def load_reports(db_name, top=25, refresh=False):
+    """Returns lyric reports of given database, cached on disk per data version.
+
+       Reports are saved as Parquet files next to the cached corpus, see
+       compute_reports for the report names.
+    """
+    report_dir = _cache_path(data_version(db_name), 'reports_top{}'.format(top))
+    names = ['word_frequencies', 'bigrams', 'trigrams', 'era_top_terms', 'era_similarity']
+    if refresh == False and all(os.path.exists(os.path.join(report_dir, name + '.parquet')) for name in names):
+        return {name: pd.read_parquet(os.path.join(report_dir, name + '.parquet')) for name in names}
+
+    reports = compute_reports(load_corpus(db_name, refresh), top)
+    os.makedirs(report_dir, exist_ok=True)
+    for name, report in reports.items():
+        path = os.path.join(report_dir, name + '.parquet')
+        report.to_parquet(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+    return reports
@@ -0,0 +1,79 @@
+"""Full-text search over lyric lines.
+
+   Queries the lyrics_fts FTS5 index that convert_to_db builds over the
+   lyrics table (sql/lyrics_index.sql). Searches are by phrase, word
+   prefix, or proximity of words, and return the song, album, era, and
+   line number of every matching line.
+"""
+
+import re
+
+import pandas as pd
+import sqlite3 as sql
+
+from . import toolkit
+
+search_modes = ['phrase', 'prefix', 'near']
+
+result_columns = ['song_title', 'album_title', 'era', 'line_number', 'song_lyric']
+
+def query_terms(text):
+    """Splits search text into words, dropping punctuation and FTS5 syntax."""
+    return re.findall(r"[\w']+", text.lower())
+
+def match_expression(text, mode='phrase', distance=10):
+    """Builds FTS5 MATCH expression for given search text.
+
+       Args:
+           text: str, words to search for
+           mode: str, default 'phrase'
+                 'phrase': the words in this order, next to each other
+                 'prefix': every word, each also matching longer words
+                           starting with it (e.g. 'danc' matches 'dancing')
+                 'near': every word, at most distance words apart
+           distance: int, default 10, maximum distance for 'near'
+
+       Returns None if text has no words to search for.
+    """
+    terms = ['"{}"'.format(term) for term in query_terms(text)]
+    if len(terms) == 0:
+        return None
+    match mode:
+        case 'phrase':
+            return '"{}"'.format(' '.join(term.strip('"') for term in terms))
+        case 'prefix':
+            return ' AND '.join('{}*'.format(term) for term in terms)
+        case 'near':
+            if len(terms) == 1:
+                return terms[0]
+            return 'NEAR({}, {})'.format(' '.join(terms), int(distance))
+    raise ValueError('Unknown search mode: {}'.format(mode))
+
+def search(read_sql, text, mode='phrase', distance=10, limit=100):
+    """Returns dataframe of lyric lines matching given search text.
+
+       Args:
+           read_sql: function taking sql_text and a params keyword and
+                     returning a dataframe, e.g. app_data.read_sql
+           text: str, words to search for
+           mode: str, default 'phrase', see match_expression
+           distance: int, default 10, maximum distance for 'near'
+           limit: int, default 100, maximum number of lines returned
+
+       Columns are song_title, album_title, era, line_number, and
+       song_lyric, best matches first.
+    """
+    expression = match_expression(text, mode, distance)
+    if expression is None:
+        return pd.DataFrame(columns=result_columns)
+    return read_sql(toolkit.sql_to_string('lyrics_search.sql'), params=(expression, limit))
+
+def search_db(db_name, text, mode='phrase', distance=10, limit=100):
+    """Runs search against given SQLite database file."""
+    connection = sql.connect(db_name)
+    try:
+        results = search(lambda sql_text, params: pd.read_sql(sql_text, connection, params=params),
+                         text, mode, distance, limit)
+    finally:
+        connection.close()
+    return results
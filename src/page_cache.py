@@ -0,0 +1,183 @@
+"""On-disk cache for the Genius pages downloaded during webscraping.
+
+   Page bodies are stored content-addressed under 'objects/' (named by the
+   SHA-256 of the HTML) and each URL gets a small JSON entry under 'index/'
+   pointing to its body, along with when it was fetched and the ETag and
+   Last-Modified headers needed for revalidation.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+settings = {'enabled': True,
+            'directory': 'data/cache/pages',
+            'ttl': 7 * 24 * 60 * 60,
+            'max_bytes': 512 * 1024 * 1024,
+            'revalidate': True,
+            'offline': False}
+
+_lock = threading.Lock()
+_total_bytes = None
+
+def configure(**options):
+    """Updates cache settings.
+
+       Options:
+           enabled: bool, use the cache at all
+           directory: str, cache root folder
+           ttl: int, seconds a page is served without contacting Genius
+           max_bytes: int, size limit for stored pages before eviction
+           revalidate: bool, send ETag/If-Modified-Since for expired pages
+           offline: bool, only serve cached pages, never use the network
+    """
+    global _total_bytes
+    for option, value in options.items():
+        if option not in settings:
+            raise KeyError('Unknown cache setting: {}'.format(option))
+        settings[option] = value
+    _total_bytes = None
+
+def _url_key(url):
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+def _index_path(url):
+    key = _url_key(url)
+    return os.path.join(settings['directory'], 'index', key[:2], key + '.json')
+
+def _object_path(digest):
+    return os.path.join(settings['directory'], 'objects', digest[:2], digest + '.html')
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = '{}.{}.{}.tmp'.format(path, os.getpid(), threading.get_ident())
+    with open(temp_path, 'wb') as file:
+        file.write(data)
+    os.replace(temp_path, path)
+
+def read_entry(url):
+    """Returns index entry of given URL, or None if it isn't cached."""
+    try:
+        with open(_index_path(url), 'r') as file:
+            entry = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if not os.path.exists(_object_path(entry['sha256'])):
+        return None
+    return entry
+
+def read_text(entry):
+    """Returns cached HTML for given index entry and marks it as recently used."""
+    with open(_object_path(entry['sha256']), 'r', encoding='utf-8') as file:
+        text = file.read()
+    try:
+        os.utime(_index_path(entry['url']))
+    except FileNotFoundError:
+        pass
+    return text
+
+def age(entry):
+    """Returns seconds since the page in given index entry was fetched."""
+    return time.time() - entry['fetched_at']
+
+def is_fresh(entry):
+    """Checks if given index entry is younger than the TTL."""
+    return age(entry) < settings['ttl']
+
+def validators(entry):
+    """Returns conditional request headers for given index entry."""
+    headers = {}
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+def store(url, text, headers=None):
+    """Saves HTML of given URL to the cache and returns its index entry."""
+    global _total_bytes
+    headers = headers or {}
+    data = text.encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()
+    object_path = _object_path(digest)
+    is_new = not os.path.exists(object_path)
+    if is_new:
+        _write_atomic(object_path, data)
+
+    entry = {'url': url,
+             'sha256': digest,
+             'size': len(data),
+             'fetched_at': time.time(),
+             'etag': headers.get('ETag'),
+             'last_modified': headers.get('Last-Modified')}
+    _write_atomic(_index_path(url), json.dumps(entry).encode('utf-8'))
+
+    with _lock:
+        if _total_bytes is not None and is_new:
+            _total_bytes += len(data)
+        over_limit = _total_bytes is None or _total_bytes > settings['max_bytes']
+    if over_limit:
+        evict()
+    return entry
+
+def touch(entry):
+    """Marks given index entry as fetched now (e.g. after a 304 response)."""
+    entry = dict(entry, fetched_at=time.time())
+    _write_atomic(_index_path(entry['url']), json.dumps(entry).encode('utf-8'))
+    return entry
+
+def _list_entries():
+    entries = []
+    index_dir = os.path.join(settings['directory'], 'index')
+    for root, _, files in os.walk(index_dir):
+        for name in files:
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(root, name)
+            try:
+                with open(path, 'r') as file:
+                    entry = json.load(file)
+                entries.append((os.path.getmtime(path), path, entry))
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+    return entries
+
+def evict(max_bytes=None, drop_expired=False):
+    """Removes cached pages until the cache fits in max_bytes.
+
+       Least recently used pages go first. With drop_expired, pages older
+       than the TTL are removed as well, even if the cache is under the
+       limit. Returns the number of bytes left in the cache.
+    """
+    global _total_bytes
+    max_bytes = settings['max_bytes'] if max_bytes is None else max_bytes
+    with _lock:
+        entries = sorted(_list_entries(), key=lambda item: item[0])
+        references = {}
+        sizes = {}
+        for _, _, entry in entries:
+            references[entry['sha256']] = references.get(entry['sha256'], 0) + 1
+            sizes[entry['sha256']] = entry['size']
+        total = sum(sizes.values())
+
+        for _, path, entry in entries:
+            expired = drop_expired and not is_fresh(entry)
+            if total <= max_bytes and not expired:
+                continue
+            os.remove(path)
+            references[entry['sha256']] -= 1
+            if references[entry['sha256']] == 0:
+                total -= sizes[entry['sha256']]
+
+        # Deleting page bodies no index entry points to anymore
+        objects_dir = os.path.join(settings['directory'], 'objects')
+        for root, _, files in os.walk(objects_dir):
+            for name in files:
+                if not name.endswith('.html'):
+                    continue
+                if references.get(name[:-len('.html')], 0) == 0:
+                    os.remove(os.path.join(root, name))
+        _total_bytes = total
+    return total
@@ -0,0 +1,367 @@
+"""The app's SQL reports computed with pandas from the discography dataframe.
+
+   Every derived table built by the analytics scripts (release_info,
+   song_views, unique_credits_per_era, credit_counts_per_song,
+   credit_counts_per_era, collaborators_per_song, collaborators_per_era)
+   and every report query read by app_charts has a function here that
+   returns the same dataframe, computed with vectorized group-bys on the
+   discography dataframe instead of SQLite. The reports drawn for one
+   catalog (catalog_reports) take its artist, the query parameter of
+   their SQL. Rows come in the order SQLite returns them: GROUP BY and
+   UNION results sorted by their columns, and joins through catalogs in
+   catalog, album, and song order, so charts come out the same.
+
+   sql_reader wraps a discography dataframe in a function with the same
+   signature as app_data.read_sql, so app_charts can draw from memory
+   without a database, and check_parity compares both engines on a
+   database, timing each one.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import sqlite3 as sql
+
+from . import db_storage
+from . import toolkit
+
+rerecorded_eras = ['Fearless (TV)', 'Red (TV)', 'Speak Now (TV)', '1989 (TV)']
+
+# {'role': list column of the discography}, in the order of the SQL reports
+credit_columns = {'writer': 'song_writers',
+                  'producer': 'song_producers',
+                  'artist': 'song_artists'}
+
+def songs(df):
+    """Returns dataframe of the songs table with the artist and era of every song's album.
+
+       Songs get the song_id convert_to_db gives them (their position in
+       df, from 1). Like the albums table, an album is one (artist,
+       album_title, album_url) and its era is the category of its first
+       song, which is the era the SQL reports join on. Catalogs are
+       numbered in order of first appearance, like the catalogs table.
+       Without an artist column, every song is in the catalog of
+       toolkit.default_artist.
+    """
+    df = df.reset_index(drop=True)
+    album_keys = [column for column in ['artist', 'album_title', 'album_url'] if column in df.columns]
+    albums = df.groupby(album_keys, sort=False, dropna=False)
+    if 'artist' in df.columns:
+        artist = df['artist']
+        catalog_id = pd.factorize(df['artist'])[0] + 1
+    else:
+        artist = toolkit.default_artist
+        catalog_id = 1
+    return pd.DataFrame({'song_id': df.index + 1,
+                         'album_id': albums.ngroup().to_numpy() + 1,
+                         'catalog_id': catalog_id,
+                         'artist': artist,
+                         'era': albums['category'].transform('first'),
+                         'song_title': df['song_title'],
+                         'song_release_date': pd.to_datetime(df['song_release_date']),
+                         'song_page_views': df['song_page_views']})
+
+def credits(df, role):
+    """Returns dataframe of song_id and name, one row per credit of given role.
+
+       Songs without credits get one row with a missing name, like the
+       NULL rows of the writers, producers, and artists tables.
+    """
+    names = df[credit_columns[role]].reset_index(drop=True).explode()
+    return pd.DataFrame({'song_id': names.index + 1, 'name': names.to_numpy()})
+
+def _whole_numbers(series):
+    # SQLite integers come back as int64 unless the column has NULLs
+    return series.astype('int64') if series.notna().all() else series
+
+def release_info(df):
+    """Returns the release_info table (sql/release_table.sql)."""
+    song_df = songs(df)
+    dates = song_df['song_release_date']
+    classification = np.select([song_df['era'].isin(rerecorded_eras),
+                                song_df['era'] == 'Other Artist Songs',
+                                song_df['era'] == 'Non-Album Songs'],
+                               ["Rerecorded Albums", "Other Artists' Albums", 'Other Release Formats'],
+                               'Studio Albums')
+    return pd.DataFrame({'artist': song_df['artist'],
+                         'era': song_df['era'],
+                         'song_title': song_df['song_title'],
+                         'classification': classification,
+                         'release_month': _whole_numbers(dates.dt.month),
+                         'release_day': _whole_numbers(dates.dt.day),
+                         'release_year': _whole_numbers(dates.dt.year)})
+
+def song_views(df):
+    """Returns the song_views table (sql/views_table.sql), songs in catalog and album order."""
+    # The join scans catalogs first, then their albums
+    song_df = songs(df).sort_values(['catalog_id', 'album_id', 'song_id'], kind='stable')
+    return pd.DataFrame({'artist': song_df['artist'],
+                         'era': song_df['era'],
+                         'song_title': song_df['song_title'],
+                         'views': song_df['song_page_views']}).reset_index(drop=True)
+
+def unique_credits_per_era(df):
+    """Returns the unique_credits_per_era table (sql/collab_tables.sql)."""
+    song_df = songs(df)
+    counts = {}
+    for role in credit_columns:
+        role_df = credits(df, role)
+        for column in ['artist', 'era']:
+            role_df[column] = song_df[column].to_numpy()[role_df['song_id'] - 1]
+        counts['unique_{}s'.format(role)] = role_df.groupby(['artist', 'era'])['name'].nunique()
+    catalog_eras = song_df[['artist', 'era']].drop_duplicates().sort_values(['artist', 'era'])
+    table = pd.DataFrame(counts).reindex(pd.MultiIndex.from_frame(catalog_eras), fill_value=0)
+    return table.reset_index()
+
+def credit_counts_per_song(df):
+    """Returns the credit_counts_per_song table (sql/collab_tables.sql)."""
+    song_df = songs(df)
+    table = pd.DataFrame({'album_id': song_df['album_id'], 'song_title': song_df['song_title']})
+    for role in credit_columns:
+        counts = credits(df, role).groupby('song_id')['name'].nunique()
+        table['{}s'.format(role)] = counts.reindex(song_df['song_id'], fill_value=0).to_numpy()
+    return table
+
+def credit_counts_per_era(df):
+    """Returns the credit_counts_per_era table (sql/collab_tables.sql).
+
+       Like the SQL version, total_songs counts distinct song titles.
+    """
+    table = credit_counts_per_song(df)
+    song_df = songs(df)
+    table['artist'] = song_df['artist']
+    table['era'] = song_df['era']
+    grouped = table.groupby(['artist', 'era'])
+    return pd.DataFrame({'total_songs': grouped['song_title'].nunique(),
+                         'total_writers': grouped['writers'].sum(),
+                         'total_producers': grouped['producers'].sum(),
+                         'total_artists': grouped['artists'].sum()}).reset_index()
+
+def collaborators_per_song(df):
+    """Returns the collaborators_per_song table (sql/collab_tables.sql)."""
+    song_df = songs(df)
+    collaborators = pd.concat([credits(df, role) for role in credit_columns], ignore_index=True)
+    collaborators = collaborators.drop_duplicates(['song_id', 'name'])
+    for column in ['artist', 'era', 'song_title']:
+        collaborators[column] = song_df[column].to_numpy()[collaborators['song_id'] - 1]
+    collaborators = collaborators.sort_values(['artist', 'era', 'song_id', 'name'], na_position='first',
+                                              kind='stable')
+    return pd.DataFrame({'artist': collaborators['artist'],
+                         'era': collaborators['era'],
+                         'song_title': collaborators['song_title'],
+                         'collaborator': collaborators['name'],
+                         'songs_worked_on': 1}).reset_index(drop=True)
+
+def collaborators_per_era(df):
+    """Returns the collaborators_per_era table (sql/collab_tables.sql).
+
+       Every catalog's own artist is left out of its collaborators.
+    """
+    collaborators = collaborators_per_song(df)
+    collaborators = collaborators[collaborators['collaborator'].notna() &
+                                  (collaborators['collaborator'] != collaborators['artist'])]
+    table = collaborators.groupby(['artist', 'era', 'collaborator'])['songs_worked_on'].sum().rename('songs')
+    table = table.reset_index()
+    table['total_songs'] = table.groupby(['artist', 'collaborator'])['songs'].transform('sum')
+    # Rows come out of the window function by artist and collaborator
+    return table.sort_values(['artist', 'collaborator', 'era'], ignore_index=True)
+
+def collab_credits(df):
+    """Returns sql/collab_credits.sql, every credit with its song_id, catalog artist, era, and role.
+
+       Credits come in catalog, album, and song order, like the join.
+    """
+    song_df = songs(df)
+    frames = []
+    for role in credit_columns:
+        role_df = credits(df, role)
+        for column in ['catalog_id', 'album_id', 'artist', 'era']:
+            role_df[column] = song_df[column].to_numpy()[role_df['song_id'] - 1]
+        role_df = role_df.sort_values(['catalog_id', 'album_id', 'song_id', 'name'], na_position='first',
+                                      kind='stable')
+        frames.append(pd.DataFrame({'song_id': role_df['song_id'],
+                                    'artist': role_df['artist'],
+                                    'era': role_df['era'],
+                                    'collaborator': role_df['name'],
+                                    'role': role}))
+    return pd.concat(frames, ignore_index=True)
+
+def _catalog(table, artist):
+    # Rows of one catalog without the artist column, like the reports' WHERE artist = ?
+    return table[table['artist'] == artist].drop(columns='artist').reset_index(drop=True)
+
+def _catalog_releases(df, artist):
+    info = _catalog(release_info(df), artist)
+    for column in ['release_month', 'release_day', 'release_year']:
+        info[column] = _whole_numbers(info[column])
+    return info
+
+def release_formats(df, artist=toolkit.default_artist):
+    """Returns sql/release_formats.sql, songs per release classification in the artist's catalog."""
+    counts = _catalog_releases(df, artist).groupby('classification').size()
+    return counts.rename('total_songs').reset_index()
+
+def release_dates_split(df, artist=toolkit.default_artist):
+    """Returns sql/release_dates_split.sql, release dates of the artist's songs split into columns."""
+    info = _catalog_releases(df, artist)
+    return pd.DataFrame({'song_title': info['song_title'],
+                         'year': info['release_year'],
+                         'month': info['release_month'],
+                         'day': info['release_day']})
+
+def month_day_distribution(df, artist=toolkit.default_artist):
+    """Returns sql/month_day_distribution.sql, the artist's songs released on every month/day."""
+    info = _catalog_releases(df, artist)
+    # Songs without a release date make one group, first like SQLite's NULLs
+    counts = info.groupby(['release_month', 'release_day'], dropna=False).size().rename('count').reset_index()
+    counts = counts.rename(columns={'release_month': 'month', 'release_day': 'day'})
+    counts = counts.sort_values(['month', 'day'], na_position='first', ignore_index=True)
+    dates = counts['month'].astype('Int64').astype(str) + '/' + counts['day'].astype('Int64').astype(str)
+    counts.insert(2, 'date', dates.where(counts['month'].notna(), None))
+    return counts
+
+def _by_type(table, columns, value_name):
+    # Long format of the per-role columns, deduplicated and sorted like a SQL UNION
+    long = table.melt(id_vars='era', value_vars=list(columns.values()), var_name='type', value_name=value_name)
+    long['type'] = long['type'].map({column: role for role, column in columns.items()})
+    return long.drop_duplicates().sort_values(['era', 'type', value_name], ignore_index=True)
+
+def unique_credit_per_era(df, artist=toolkit.default_artist):
+    """Returns sql/unique_credit_per_era.sql, unique collaborators per era and role in the artist's catalog."""
+    columns = {role: 'unique_{}s'.format(role) for role in credit_columns}
+    return _by_type(_catalog(unique_credits_per_era(df), artist), columns, 'unique_count')
+
+def _round(values, digits):
+    # SQLite's ROUND rounds halves away from zero
+    scale = 10 ** digits
+    return np.sign(values) * np.floor(np.abs(values) * scale + 0.5) / scale
+
+def avg_credit_per_song(df, artist=toolkit.default_artist):
+    """Returns sql/avg_credit_per_song.sql, average collaborators per song by era and role in the artist's catalog."""
+    table = _catalog(credit_counts_per_era(df), artist)
+    averages = pd.DataFrame({'era': table['era']})
+    for role in credit_columns:
+        averages[role] = _round(table['total_{}s'.format(role)] / table['total_songs'], 2)
+    return _by_type(averages, {role: role for role in credit_columns}, 'avg_per_song')
+
+def most_frequent_collaborators(df, artist=toolkit.default_artist, max_rank=9):
+    """Returns sql/most_frequent_collaborators.sql, the artist's collaborators ranked up to max_rank.
+
+       Sorted by total songs, most first (ties by collaborator and era).
+    """
+    table = _catalog(collaborators_per_era(df), artist)
+    table['rank'] = table['total_songs'].rank(method='dense', ascending=False).astype('int64')
+    table = table[table['rank'] <= max_rank]
+    return table.sort_values('total_songs', ascending=False, kind='stable', ignore_index=True)
+
+def views_per_song(df, artist=toolkit.default_artist):
+    """Returns sql/views_per_song.sql, page views of every song in the artist's catalog."""
+    return _catalog(song_views(df), artist)
+
+def views_totals(df, artist=toolkit.default_artist):
+    """Returns sql/views_totals.sql, page views per era in the artist's catalog."""
+    return views_per_song(df, artist).groupby('era')['views'].sum().rename('total_views').reset_index()
+
+# {'SQL file in sql/': function returning the same results for one catalog},
+# reports whose only query parameter is the catalog's artist
+catalog_reports = {'release_formats.sql': release_formats,
+                   'release_dates_split.sql': release_dates_split,
+                   'month_day_distribution.sql': month_day_distribution,
+                   'unique_credit_per_era.sql': unique_credit_per_era,
+                   'avg_credit_per_song.sql': avg_credit_per_song,
+                   'most_frequent_collaborators.sql': most_frequent_collaborators,
+                   'views_per_song.sql': views_per_song,
+                   'views_totals.sql': views_totals}
+
+# {'SQL file in sql/': function returning the same results}
+sql_reports = {**catalog_reports,
+               'collab_credits.sql': collab_credits}
+
+# {'derived table': function returning its rows}
+tables = {'release_info': release_info,
+          'song_views': song_views,
+          'unique_credits_per_era': unique_credits_per_era,
+          'credit_counts_per_song': credit_counts_per_song,
+          'credit_counts_per_era': credit_counts_per_era,
+          'collaborators_per_song': collaborators_per_song,
+          'collaborators_per_era': collaborators_per_era}
+
+def sql_reader(df):
+    """Returns function answering the app's queries from given discography dataframe.
+
+       It takes the same arguments as app_data.read_sql, but only knows
+       the SQL files in sql_reports and 'SELECT * FROM <table>' for the
+       tables in tables; anything else raises a KeyError. params go to the
+       report function after df (the artist of catalog_reports). Results
+       are computed once per query and parameters and copied on every call.
+    """
+    queries = {toolkit.sql_to_string(file_name): report for file_name, report in sql_reports.items()}
+    queries.update({'SELECT * FROM {}'.format(table_name): table for table_name, table in tables.items()})
+    results = {}
+
+    def read_sql(sql_text, params=None):
+        if sql_text not in queries:
+            raise KeyError('No pandas version of query: {}'.format(sql_text.strip()[:80]))
+        key = (sql_text, tuple(params or ()))
+        if key not in results:
+            results[key] = queries[sql_text](df, *key[1])
+        return results[key].copy()
+    return read_sql
+
+def _sorted(result):
+    return result.sort_values(list(result.columns), ignore_index=True, na_position='first')
+
+def check_parity(db_name, df=None):
+    """Compares every report and derived table of both engines on given database.
+
+       Args:
+           db_name: str, SQLite database built by convert_to_db
+           df: discography dataframe the database was built from, default
+               None (rebuilt from the database with db_storage.read_db)
+
+       Returns dataframe with one row per query: name, artist (the
+       catalog of catalog_reports, None for the others), rows, matches
+       (same values, dtypes aside), same_order (rows also in the same
+       order), and sql_seconds/pandas_seconds, the time each engine took.
+    """
+    if df is None:
+        df = db_storage.read_db(db_name, with_artist=True)
+    connection = sql.connect(db_name)
+    artists = [artist for (artist,) in connection.execute('SELECT artist FROM catalogs ORDER BY catalog_id')]
+
+    queries = []
+    for file_name, report in sql_reports.items():
+        sql_text = toolkit.sql_to_string(file_name)
+        catalogs = artists if file_name in catalog_reports else [None]
+        queries.extend([(file_name, artist, sql_text, report) for artist in catalogs])
+    queries.extend([(table_name, None, 'SELECT * FROM {}'.format(table_name), table)
+                    for table_name, table in tables.items()])
+
+    rows = []
+    for name, artist, sql_text, report in queries:
+        params = () if artist is None else (artist,)
+        start = time.perf_counter()
+        expected = pd.read_sql(sql_text, connection, params=params)
+        sql_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        result = report(df, *params)
+        pandas_seconds = time.perf_counter() - start
+
+        result = result.reset_index(drop=True)
+        same_columns = list(result.columns) == list(expected.columns) and len(result) == len(expected)
+        matches = same_columns and _sorted(result).astype(object).equals(_sorted(expected).astype(object))
+        same_order = same_columns and result.astype(object).equals(expected.astype(object))
+        rows.append({'name': name,
+                     'artist': artist,
+                     'rows': len(expected),
+                     'matches': matches,
+                     'same_order': same_order,
+                     'sql_seconds': sql_seconds,
+                     'pandas_seconds': pandas_seconds})
+    connection.close()
+    return pd.DataFrame(rows)
+
+if __name__ == '__main__':
+    parity = check_parity('data/taylor_swift.db')
+    print(parity.to_string(index=False))
@@ -0,0 +1,238 @@
+"""Streams scraped songs through the cleaning steps into the database.
+
+   Every step takes and yields discography records (one dict per song,
+   keyed by genius_scrape.discography_columns), so songs flow one at a time
+   from genius_scrape.iter_discography through the same cleaning steps as
+   the data collection notebook (drop_songs, add_songs,
+   change_credit_name) into load_records, which inserts them in batches.
+   Only a batch of songs is held in memory at once, whatever the size of
+   the catalog, and every batch is committed as soon as it's full.
+
+   load_records builds the same tables as discog_mods.convert_to_db for
+   the same songs, keys included.
+"""
+
+import csv
+import os
+from datetime import datetime
+from itertools import islice
+
+import pandas as pd
+import sqlite3 as sql
+
+from . import discog_mods
+from . import fetcher
+from . import genius_scrape
+from . import toolkit
+
+# Columns of every table in the order the tables have to be loaded (see sql/create_schema.sql)
+table_columns = {'catalogs': ['catalog_id', 'artist'],
+                 'albums': ['album_id', 'catalog_id', 'album_title', 'album_url', 'category'],
+                 'songs': ['song_id', 'album_id', 'song_title', 'album_title', 'album_track_number', 'song_url',
+                           'song_release_date', 'song_page_views'],
+                 'artists': ['song_id', 'song_title', 'song_artist'],
+                 'writers': ['song_id', 'song_title', 'song_writer'],
+                 'producers': ['song_id', 'song_title', 'song_producer'],
+                 'tags': ['song_id', 'song_title', 'song_tag'],
+                 'lyrics': ['song_id', 'song_title', 'song_lyric', 'lyric_order']}
+
+# {'table name': list column of the discography} for the one-row-per-item tables
+list_tables = {'artists': 'song_artists',
+               'writers': 'song_writers',
+               'producers': 'song_producers',
+               'tags': 'song_tags'}
+
+def drop_songs(records, song_names, drop_duplicates=True, key='song_title'):
+    """Yields records except the given songs.
+
+       Streaming version of discog_mods.drop_songs_from_file: by default,
+       songs whose title was already yielded are dropped as well (e.g.
+       rereleases on EPs). Songs are matched on key, one column name or a
+       list of column names; with a list, song_names holds tuples.
+    """
+    dropped = set(song_names)
+    seen_titles = set()
+    for record in records:
+        if drop_duplicates == True:
+            if record['song_title'] in seen_titles:
+                continue
+            seen_titles.add(record['song_title'])
+        song_key = record[key] if isinstance(key, str) else tuple(record[column] for column in key)
+        if song_key not in dropped:
+            yield record
+
+def drop_songs_from_file(records, csv_name, drop_duplicates=True, key='song_title'):
+    """Yields records except the songs in given CSV file, see drop_songs."""
+    drop_df = pd.read_csv(csv_name, dtype=str, keep_default_na=False)
+    if isinstance(key, str):
+        song_names = drop_df[key]
+    else:
+        song_names = drop_df[list(key)].itertuples(index=False, name=None)
+    return drop_songs(records, song_names, drop_duplicates, key)
+
+def add_songs(records, rows, max_workers=1):
+    """Yields records, then a new record for every (album_url, category, song_url) in rows.
+
+       New songs are scraped with discog_mods.song_get_row once records
+       run out, in a thread pool of max_workers threads.
+    """
+    yield from records
+    new_rows = fetcher.fetch_iter(lambda row: discog_mods.song_get_row(*row), rows, max_workers)
+    for new_row in new_rows:
+        yield dict(zip(genius_scrape.discography_columns, new_row))
+
+def add_songs_from_file(records, csv_name, max_workers=1):
+    """Yields records followed by the songs in given CSV file, see add_songs."""
+    with open(csv_name, 'r') as csv_file:
+        rows = [(row['album_url'], row['category'], row['song_url']) for row in csv.DictReader(csv_file)]
+    return add_songs(records, rows, max_workers)
+
+def change_credit_name(records, old_name, new_name, columns=None):
+    """Yields records with old_name replaced by new_name in given credit columns.
+
+       Columns default to song_writers and song_producers, like the data
+       collection notebook.
+    """
+    columns = ['song_writers', 'song_producers'] if columns is None else columns
+    for record in records:
+        for column in columns:
+            record[column] = [new_name if name == old_name else name for name in record[column]]
+        yield record
+
+def batches(records, batch_size):
+    """Yields lists of up to batch_size records."""
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if batch == []:
+            return
+        yield batch
+
+def _db_value(value):
+    if not isinstance(value, (list, str)) and pd.isna(value):
+        return None
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return value
+
+def _list_rows(song_id, song_title, values):
+    # Empty lists still get one NULL row, like DataFrame.explode in discog_mods.db_tables
+    values = values if isinstance(values, list) and values != [] else [None]
+    return [(song_id, song_title, value) for value in values]
+
+def batch_rows(batch, keys, artist=None):
+    """Returns dictionary of {'table name': list of row tuples} for a batch of records.
+
+       Args:
+           batch: list of records
+           keys: dict, catalog_id/album_id/song_id keys already assigned,
+                 updated in place ({'catalogs': {}, 'albums': {}, 'songs': 0}
+                 for an empty database)
+           artist: str, default None, artist of records without an artist
+                   key (discog_mods.default_artist if None)
+    """
+    rows = {table_name: [] for table_name in table_columns}
+    for record in batch:
+        catalog = record.get('artist') or artist or discog_mods.default_artist
+        if catalog not in keys['catalogs']:
+            keys['catalogs'][catalog] = len(keys['catalogs']) + 1
+            rows['catalogs'].append((keys['catalogs'][catalog], catalog))
+        catalog_id = keys['catalogs'][catalog]
+
+        album = (catalog_id, record['album_title'], record['album_url'])
+        if album not in keys['albums']:
+            keys['albums'][album] = len(keys['albums']) + 1
+            rows['albums'].append((keys['albums'][album], *album, record['category']))
+
+        keys['songs'] += 1
+        song_id = keys['songs']
+        song_title = record['song_title']
+        rows['songs'].append(tuple(_db_value(value) for value in
+                                   [song_id, keys['albums'][album], song_title, record['album_title'],
+                                    record['album_track_number'], record['song_url'],
+                                    record['song_release_date'], record['song_page_views']]))
+
+        for table_name, column in list_tables.items():
+            rows[table_name].extend(_list_rows(song_id, song_title, record[column]))
+        lyrics = _list_rows(song_id, song_title, record['song_lyrics'])
+        rows['lyrics'].extend([(*row, None if row[2] is None else order + 1) for order, row in enumerate(lyrics)])
+    return rows
+
+def insert_batch(connection, rows):
+    """Inserts the rows of one batch (see batch_rows) in a single transaction."""
+    connection.execute('BEGIN')
+    for table_name, columns in table_columns.items():
+        if rows[table_name] != []:
+            query = 'INSERT INTO {} ({}) VALUES ({})'.format(table_name, ', '.join(columns),
+                                                             ', '.join(['?'] * len(columns)))
+            connection.executemany(query, rows[table_name])
+    connection.execute('COMMIT')
+
+def load_records(records, db_name, batch_size=50, artist=None, in_place=False):
+    """Inserts discography records into a new SQLite database in batches.
+
+       Args:
+           records: iterable of discography records, e.g. a chain of the
+                    generators in this module
+           db_name: str, SQLite database file
+           batch_size: int, default 50, songs inserted per transaction
+           artist: str, default None, see batch_rows
+           in_place: bool, default False
+                     False: the database is built in a temporary file next
+                            to db_name and swapped in once every song is
+                            loaded, like convert_to_db
+                     True: db_name is replaced right away and every batch
+                           can be read as soon as it's committed
+
+       The app's derived tables are materialized once every song is
+       loaded. Returns the number of songs loaded.
+    """
+    build_name = db_name if in_place == True else '{}.tmp'.format(db_name)
+    if os.path.exists(build_name) and in_place == False:
+        os.remove(build_name)
+
+    connection = sql.connect(build_name, isolation_level=None)
+    keys = {'catalogs': {}, 'albums': {}, 'songs': 0}
+    try:
+        connection.execute('PRAGMA journal_mode = MEMORY')
+        connection.execute('PRAGMA synchronous = OFF')
+        connection.execute('PRAGMA foreign_keys = ON')
+        connection.executescript(toolkit.sql_to_string('create_schema.sql'))
+
+        for batch in batches(records, batch_size):
+            insert_batch(connection, batch_rows(batch, keys, artist))
+
+        discog_mods.materialize_analytics(connection)
+        connection.execute('ANALYZE')
+        connection.execute('PRAGMA journal_mode = DELETE')
+        connection.close()
+    except BaseException:
+        connection.close()
+        if in_place == False:
+            os.remove(build_name)
+        raise
+
+    if in_place == False:
+        with open(build_name, 'rb') as db_file:
+            os.fsync(db_file.fileno())
+        os.replace(build_name, db_name)
+    return keys['songs']
+
+def scrape_to_db(artist, albums_dict, db_name, songs_to_drop=None, songs_to_add=None, credit_names=None,
+                 max_workers=1, batch_size=50, in_place=False):
+    """Scrapes, cleans, and loads a discography into a SQLite database in one stream.
+
+       Runs the steps of the data collection notebook without building a
+       dataframe: drops the songs in the songs_to_drop CSV (and duplicate
+       titles), adds the songs in the songs_to_add CSV, and replaces credit
+       names in writers and producers with credit_names, a dictionary of
+       {'old name': 'new name'}. See load_records for the other arguments.
+    """
+    records = genius_scrape.iter_discography(artist, albums_dict, max_workers)
+    if songs_to_drop is not None:
+        records = drop_songs_from_file(records, songs_to_drop, drop_duplicates=True)
+    if songs_to_add is not None:
+        records = add_songs_from_file(records, songs_to_add, max_workers)
+    for old_name, new_name in (credit_names or {}).items():
+        records = change_credit_name(records, old_name, new_name)
+    return load_records(records, db_name, batch_size, artist, in_place)
@@ -1,7 +1,21 @@
 """Miscellanious functions used in the discography project."""
 
+import os
+import threading
+
 import matplotlib.font_manager as fm
 import pandas as pd
+import sqlite3 as sql
+
+# Project font folder, resolved from this file so it works from any directory
+font_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'fonts')
+font_extensions = ('.ttf', '.otf')
+
+_fonts_installed = False
+_fonts_lock = threading.Lock()
+
+# Catalog of dataframes without an artist column, and the catalog the app shows first
+default_artist = 'Taylor Swift'
 
 eras = ['Taylor Swift',
         'Fearless',
@@ -21,8 +35,23 @@ eras = ['Taylor Swift',
         'Non-Album Songs',
         'Other Artist Songs']
 
-def eras_order():
-    return eras
+# Bump whenever the scripts in discog_mods.analytics_scripts change
+analytics_version = '3'
+
+def eras_order(present=None):
+    """Returns era names in chart order.
+
+       Args:
+           present: eras of the data being charted, default None (all of
+                    eras); limits the order to them, with eras of other
+                    catalogs sorted by name before the non-album groups
+    """
+    if present is None:
+        return eras
+    present = set(present)
+    albums = [era for era in eras[:-2] if era in present]
+    others = sorted(era for era in present if era not in eras)
+    return albums + others + [era for era in eras[-2:] if era in present]
 
 def sql_to_string(sql_file_name):
     """Converts given SQL file contents to Python string."""
@@ -32,11 +61,43 @@ def sql_to_string(sql_file_name):
     sql_string = '''\n{}\n'''.format(sql_script)
     return sql_string
 
+def db_build_info(connection):
+    """Returns build_info table of given database connection as a dictionary.
+
+       Empty if the database was built before build_info existed.
+    """
+    try:
+        rows = connection.execute('SELECT key, value FROM build_info').fetchall()
+    except sql.OperationalError:
+        return {}
+    return dict(rows)
+
+def font_files():
+    """Returns paths of all fonts in the project 'assets/fonts' folder."""
+    if not os.path.isdir(font_dir):
+        return []
+    return sorted(os.path.join(font_dir, name) for name in os.listdir(font_dir)
+                  if name.lower().endswith(font_extensions))
+
 def install_fonts():
-    """Installs all fonts in the 'font' folder."""
-    font_dir = ['/assets/fonts']
-    for font in fm.findSystemFonts(font_dir):
-        fm.fontManager.addfont(font)
+    """Installs all fonts in the 'assets/fonts' folder, once per process.
+
+       Each font is added with fm.fontManager.addfont, leaving matplotlib's
+       own font cache to matplotlib; fonts the font manager already lists
+       are skipped. Returns the number of fonts added.
+    """
+    global _fonts_installed
+    with _fonts_lock:
+        if _fonts_installed == True:
+            return 0
+        known = {os.path.abspath(font.fname) for font in fm.fontManager.ttflist}
+        added = 0
+        for font in font_files():
+            if font not in known:
+                fm.fontManager.addfont(font)
+                added += 1
+        _fonts_installed = True
+    return added
 
 def sort_cat_column(df, column_name, cat_list):
     """Sorts categorical column by given list."""
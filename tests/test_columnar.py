@@ -0,0 +1,39 @@
+"""Checks that discography dataframes survive a columnar file round trip."""
+
+import pandas as pd
+import pytest
+
+from src import columnar
+
+discography = pd.DataFrame({
+    'album_title': ['Fearless', 'Fearless', 'Non-Album Songs'],
+    'album_url': ['https://genius.com/albums/Taylor-swift/Fearless'] * 2 + [None],
+    'category': ['Fearless', 'Fearless', 'Non-Album Songs'],
+    # The clean dataset mixes integer and text track numbers
+    'album_track_number': [1, '2', None],
+    'song_title': ['Fearless', 'Fifteen', 'Ronan'],
+    'song_url': ['https://genius.com/Taylor-swift-fearless-lyrics',
+                 'https://genius.com/Taylor-swift-fifteen-lyrics',
+                 'https://genius.com/Taylor-swift-ronan-lyrics'],
+    'song_artists': [['Taylor Swift'], ['Taylor Swift'], ['Taylor Swift']],
+    'song_release_date': pd.to_datetime(['2008-11-11', '2008-11-11', None]),
+    'song_page_views': [500, 300, 90],
+    'song_lyrics': [['First line', 'Second line'], [], ['Only line']],
+    'song_writers': [['Taylor Swift', 'Liz Rose'], ['Taylor Swift'], ['Taylor Swift', 'Maya Thompson']],
+    'song_producers': [['Nathan Chapman', 'Taylor Swift'], ['Nathan Chapman'], []],
+    'song_tags': [['Country'], ['Country'], ['Pop']]})
+
+@pytest.mark.parametrize('extension', ['parquet', 'arrow'])
+def test_round_trip_stores_track_numbers_as_text(tmp_path, extension):
+    file_name = str(tmp_path / 'discography.{}'.format(extension))
+    columnar.save_columnar(discography, file_name)
+    expected = discography.copy()
+    expected['album_track_number'] = ['1', '2', None]
+    pd.testing.assert_frame_equal(columnar.read_columnar(file_name), expected)
+
+def test_read_columnar_limits_columns(tmp_path):
+    file_name = str(tmp_path / 'discography.parquet')
+    columnar.save_columnar(discography, file_name)
+    df = columnar.read_columnar(file_name, ['song_title', 'song_writers'])
+    assert list(df.columns) == ['song_title', 'song_writers']
+    assert df['song_writers'][0] == ['Taylor Swift', 'Liz Rose']
@@ -0,0 +1,43 @@
+"""Checks the discog_mods cleaning helpers against their original implementations."""
+
+import numpy as np
+import pandas as pd
+
+from src import discog_mods
+
+def apply_rename(series, old_name, new_name):
+    # change_credit_name before rename_credits
+    return series.apply(lambda list: [new_name if string == old_name else string for string in list])
+
+credits = pd.Series([['Taylor Swift', 'Joe Alwyn'],
+                     ['Joe Alwyn', np.nan, 'Aaron Dessner'],
+                     [],
+                     ['Jack Antonoff'],
+                     [np.nan]],
+                    index=[10, 11, 12, 13, 14], name='song_writers')
+
+def test_change_credit_name_matches_apply():
+    result = discog_mods.change_credit_name(credits, 'Joe Alwyn', 'William Bowery')
+    expected = apply_rename(credits, 'Joe Alwyn', 'William Bowery')
+    pd.testing.assert_series_equal(result, expected)
+
+def test_rename_credits_matches_chained_apply():
+    names = {'Joe Alwyn': 'William Bowery', 'Jack Antonoff': 'Jack Michael Antonoff'}
+    expected = credits
+    for old_name, new_name in names.items():
+        expected = apply_rename(expected, old_name, new_name)
+    pd.testing.assert_series_equal(discog_mods.rename_credits(credits, names), expected)
+
+def test_rename_credits_keeps_cells_that_are_not_lists():
+    series = pd.Series([['Joe Alwyn'], np.nan, None, 'Joe Alwyn'])
+    result = discog_mods.rename_credits(series, {'Joe Alwyn': 'William Bowery'})
+    assert result[0] == ['William Bowery']
+    assert np.isnan(result[1])
+    assert result[2] is None
+    assert result[3] == 'Joe Alwyn'
+
+def test_merged_names_are_kept_once_per_song():
+    series = pd.Series([['Joe Alwyn', 'William Bowery', np.nan]])
+    result = discog_mods.rename_credits(series, {'Joe Alwyn': 'William Bowery'}, {'William Bowery'})
+    assert result[0][:1] == ['William Bowery']
+    assert len(result[0]) == 2 and np.isnan(result[0][1])
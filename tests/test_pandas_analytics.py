@@ -0,0 +1,105 @@
+"""Checks that pandas_analytics gives the same results as the SQL reports and derived tables."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from src import collab_graph
+from src import discog_mods
+from src import pandas_analytics
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def song(album_title, category, track, title, release_date, views, artists, writers, producers,
+         artist='Taylor Swift'):
+    slug = artist.replace(' ', '-').capitalize()
+    return {'artist': artist,
+            'album_title': album_title,
+            'album_url': 'https://genius.com/albums/{}/{}'.format(slug, album_title.replace(' ', '-')),
+            'category': category,
+            'album_track_number': track,
+            'song_title': title,
+            'song_url': 'https://genius.com/{}-{}-lyrics'.format(slug, title.replace(' ', '-')),
+            'song_artists': artists,
+            'song_release_date': pd.Timestamp(release_date) if release_date else pd.NaT,
+            'song_page_views': views,
+            'song_lyrics': ['First line of {}'.format(title), 'Second line'],
+            'song_writers': writers,
+            'song_producers': producers,
+            'song_tags': ['Pop']}
+
+# Covers every release classification, shared and repeated credits, songs
+# without producers or a release date, view counts with ties, and a second
+# catalog sharing an era name and crediting Taylor Swift as a collaborator
+discography = pd.DataFrame([
+    song('Fearless', 'Fearless', '1', 'Fearless', '2008-11-11', 500, ['Taylor Swift'],
+         ['Taylor Swift', 'Liz Rose', 'Hillary Lindsey'], ['Nathan Chapman', 'Taylor Swift']),
+    song('Fearless', 'Fearless', '2', 'Fifteen', '2008-11-11', 300, ['Taylor Swift'],
+         ['Taylor Swift'], ['Nathan Chapman', 'Taylor Swift']),
+    song('Fearless', 'Fearless', '3', 'Breathe', '2008-11-11', 300, ['Taylor Swift', 'Colbie Caillat'],
+         ['Taylor Swift', 'Colbie Caillat'], ['Nathan Chapman', 'Taylor Swift']),
+    song('Red', 'Red', '1', 'State of Grace', '2012-10-22', 400, ['Taylor Swift'],
+         ['Taylor Swift'], ['Nathan Chapman', 'Taylor Swift']),
+    song('Red', 'Red', '2', 'Everything Has Changed', '2012-10-22', 250, ['Taylor Swift', 'Ed Sheeran'],
+         ['Taylor Swift', 'Ed Sheeran'], ['Butch Walker']),
+    song("Fearless (Taylor's Version)", 'Fearless (TV)', '1', "Mr. Perfectly Fine (Taylor's Version)",
+         '2021-04-09', 700, ['Taylor Swift'], ['Taylor Swift'], ['Jack Antonoff', 'Taylor Swift']),
+    song("Fearless (Taylor's Version)", 'Fearless (TV)', '2', "You All Over Me (Taylor's Version)",
+         '2021-04-09', 250, ['Taylor Swift', 'Maren Morris'], ['Taylor Swift', 'Scooter Carusoe', 'Tom Douglas'],
+         ['Aaron Dessner', 'Taylor Swift']),
+    song('Two Is Better Than One', 'Other Artist Songs', '1', 'Two Is Better Than One', '2009-12-08', 150,
+         ['Boys Like Girls', 'Taylor Swift'], ['Martin Johnson', 'Taylor Swift'], ['Brian Howes']),
+    song('Non-Album Songs', 'Non-Album Songs', None, 'Ronan', None, 90, ['Taylor Swift'],
+         ['Taylor Swift', 'Maya Thompson'], []),
+    song('Non-Album Songs', 'Non-Album Songs', None, 'Beautiful Eyes', '2008-07-15', 60, ['Taylor Swift'],
+         ['Taylor Swift'], []),
+    song('Punisher', 'Punisher', '1', 'Kyoto', '2020-06-18', 200, ['Phoebe Bridgers'],
+         ['Phoebe Bridgers', 'Marshall Vore'], ['Tony Berg', 'Ethan Gruska'], artist='Phoebe Bridgers'),
+    song('Punisher', 'Punisher', '2', 'Garden Song', '2020-06-18', 150, ['Phoebe Bridgers'],
+         ['Phoebe Bridgers', 'Marshall Vore'], ['Tony Berg'], artist='Phoebe Bridgers'),
+    song('Non-Album Songs', 'Non-Album Songs', None, 'Nothing New', '2021-11-12', 90,
+         ['Phoebe Bridgers', 'Taylor Swift'], ['Taylor Swift'], ['Aaron Dessner', 'Taylor Swift'],
+         artist='Phoebe Bridgers'),
+])
+
+@pytest.fixture(scope='module')
+def parity(tmp_path_factory):
+    db_name = str(tmp_path_factory.mktemp('db') / 'discography.db')
+    # SQL files are read relative to the repository root
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(repo_root)
+        discog_mods.convert_to_db(discography, db_name)
+        return pandas_analytics.check_parity(db_name)
+
+@pytest.mark.parametrize('name', list(pandas_analytics.sql_reports) + list(pandas_analytics.tables))
+def test_parity(parity, name):
+    results = parity[parity['name'] == name]
+    # Catalog reports are checked once per artist
+    assert len(results) == (2 if name in pandas_analytics.catalog_reports else 1)
+    assert (results['rows'] > 0).all()
+    assert results['matches'].all()
+    assert results['same_order'].all()
+
+def test_catalog_reports_keep_catalogs_apart():
+    views = pandas_analytics.views_totals(discography, 'Phoebe Bridgers')
+    assert views.to_dict('list') == {'era': ['Non-Album Songs', 'Punisher'], 'total_views': [90, 350]}
+    unique = pandas_analytics.unique_credit_per_era(discography, 'Taylor Swift')
+    assert not unique.duplicated(['era', 'type']).any()
+
+def test_collaborators_exclude_own_artist():
+    table = pandas_analytics.collaborators_per_era(discography)
+    pairs = set(zip(table['artist'], table['collaborator']))
+    assert ('Phoebe Bridgers', 'Taylor Swift') in pairs
+    assert ('Taylor Swift', 'Taylor Swift') not in pairs
+    assert ('Phoebe Bridgers', 'Phoebe Bridgers') not in pairs
+
+def test_graph_counts_match_collaborators_per_era():
+    graph = collab_graph.build_graph(pandas_analytics.collab_credits(discography))
+    columns = ['artist', 'era', 'collaborator', 'songs', 'total_songs']
+    expected = pandas_analytics.collaborators_per_era(discography)[columns]
+    result = collab_graph.era_counts(graph)
+    assert sorted(map(tuple, result.to_numpy())) == sorted(map(tuple, expected.to_numpy()))
+    phoebe = collab_graph.top_collaborators(collab_graph.catalog(graph, 'Phoebe Bridgers'))
+    assert 'Taylor Swift' in set(phoebe['collaborator'])
+    assert 'Phoebe Bridgers' not in set(phoebe['collaborator'])